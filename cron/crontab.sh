@@ -7,8 +7,9 @@ touch /logs/crontab.log
 chmod a+x /src/collect.py
 
 # добавление правила периодического задания для cron
-# * * * * * – выполнение задания один раз в каждую минуту
-echo "* * * * * /usr/local/bin/python /src/collect.py >> /logs/crontab.log 2>&1" > /etc/crontab
+# * * * * * – выполнение задания один раз в каждую минуту,
+# flock пропускает запуск, если предыдущий еще не завершен
+echo "* * * * * /usr/bin/flock -n /tmp/collect.lock /usr/local/bin/python /src/collect.py >> /logs/crontab.log 2>&1" > /etc/crontab
 
 # сохранение текущих значений переменных окружения в файле для cron
 printenv >> /etc/environment
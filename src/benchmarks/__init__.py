@@ -0,0 +1,3 @@
+"""
+Воспроизводимые замеры производительности приложения.
+"""
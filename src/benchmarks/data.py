@@ -0,0 +1,183 @@
+"""
+Генерация синтетических данных кэша для замеров производительности.
+"""
+
+import importlib
+import itertools
+import json
+import random
+import string
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+# модули, которые используют MEDIA_PATH
+MEDIA_MODULES = ("collectors.collector", "search", "rates")
+
+# буквы для кодов стран: заглавные латинские буквы (включая расширенную латиницу),
+# которые однозначно переводятся в строчные и обратно
+CODE_LETTERS = "".join(
+    letter
+    for letter in map(chr, range(ord("A"), 0x250))
+    if letter.isupper()
+    and len(letter.lower()) == 1
+    and letter.lower() != letter
+    and letter.lower().upper() == letter
+)
+
+
+def _word(rnd: random.Random, length: int) -> str:
+    return "".join(rnd.choice(string.ascii_lowercase) for _ in range(length)).title()
+
+
+def generate_codes(count: int) -> list[str]:
+    """
+    Генерация уникальных двухбуквенных кодов стран.
+    Кэш стран хранится по коду страны, поэтому коды не должны повторяться.
+    Первые 676 кодов состоят из букв A-Z, для больших кэшей используются
+    буквы расширенной латиницы (не больше ``len(CODE_LETTERS) ** 2`` кодов).
+
+    :param count: Количество кодов
+    :return:
+    """
+
+    if count > len(CODE_LETTERS) ** 2:
+        raise ValueError(f"Не больше {len(CODE_LETTERS) ** 2} уникальных кодов")
+
+    # пары упорядочены по старшей букве, поэтому сначала идут коды из A-Z
+    pairs = sorted(itertools.product(range(len(CODE_LETTERS)), repeat=2), key=max)
+
+    return [
+        f"{CODE_LETTERS[first]}{CODE_LETTERS[second]}"
+        for first, second in pairs[:count]
+    ]
+
+
+def generate_countries(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    """
+    Генерация данных о странах в формате ответа внешнего сервиса.
+
+    :param count: Количество стран
+    :param seed: Начальное значение генератора случайных чисел
+    :return:
+    """
+
+    rnd = random.Random(seed)
+    currencies = [f"C{i:02d}" for i in range(min(count, 150))]
+    result = []
+    for alpha2code in generate_codes(count):
+        name = _word(rnd, rnd.randint(5, 12))
+        result.append(
+            {
+                "capital": _word(rnd, rnd.randint(4, 10)),
+                "latitude": rnd.uniform(-90, 90),
+                "longitude": rnd.uniform(-180, 180),
+                "alpha2code": alpha2code,
+                "alt_spellings": [alpha2code, name, f"Republic of {name}"],
+                "currencies": [
+                    {"code": code, "name": code, "symbol": "$"}
+                    for code in rnd.sample(currencies, rnd.randint(1, 2))
+                ],
+                "flag": f"http://assets.promptapi.com/flags/{alpha2code}.svg",
+                "languages": [
+                    {"name": _word(rnd, 6), "native_name": _word(rnd, 6)}
+                    for _ in range(rnd.randint(1, 3))
+                ],
+                "name": name,
+                "area": rnd.uniform(1, 1e7),
+                "population": rnd.randint(1_000, 1_000_000_000),
+                "subregion": rnd.choice(["Northern Europe", "Western Europe"]),
+                "timezones": ["UTC+01:00"],
+            }
+        )
+
+    return result
+
+
+def generate_currency_rates(countries: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Генерация данных о курсах валют для валют стран.
+
+    :param countries: Данные о странах
+    :return:
+    """
+
+    rnd = random.Random(len(countries))
+    codes = sorted(
+        {currency["code"] for item in countries for currency in item["currencies"]}
+    )
+
+    return {
+        "success": True,
+        "base": "RUB",
+        "date": "2022-09-14",
+        "rates": {code: rnd.uniform(0.001, 100) for code in codes},
+    }
+
+
+def generate_weather(seed: int = 0) -> dict[str, Any]:
+    """
+    Генерация данных о погоде в формате ответа внешнего сервиса.
+
+    :param seed: Начальное значение генератора случайных чисел
+    :return:
+    """
+
+    rnd = random.Random(seed)
+
+    return {
+        "id": rnd.randint(1, 10_000_000),
+        "main": {
+            "temp": round(rnd.uniform(-30, 40), 2),
+            "pressure": rnd.randint(950, 1050),
+            "humidity": rnd.randint(0, 100),
+        },
+        "visibility": rnd.randint(0, 10000),
+        "wind": {"speed": round(rnd.uniform(0, 30), 2)},
+        "weather": [{"description": "scattered clouds"}],
+        "timezone": rnd.choice([0, 3600, 7200, -18000]),
+    }
+
+
+def write_media(media_path: Path, count: int) -> list[dict[str, Any]]:
+    """
+    Заполнение директории кэша синтетическими данными.
+
+    :param media_path: Директория кэша (аналог MEDIA_PATH)
+    :param count: Количество стран
+    :return: Данные о странах
+    """
+
+    countries = generate_countries(count)
+    (media_path / "country.json").write_text(json.dumps(countries))
+    (media_path / "currency_rates.json").write_text(
+        json.dumps(generate_currency_rates(countries))
+    )
+    (media_path / "weather").mkdir(exist_ok=True)
+    for position, item in enumerate(countries):
+        filename = f"{item['capital']}_{item['alpha2code']}".lower()
+        (media_path / "weather" / f"{filename}.json").write_text(
+            json.dumps(generate_weather(position))
+        )
+
+    return countries
+
+
+@contextmanager
+def use_media(media_path: Path) -> Iterator[None]:
+    """
+    Использование директории кэша вместо MEDIA_PATH в текущем процессе.
+
+    :param media_path: Директория кэша
+    :return:
+    """
+
+    modules = [importlib.import_module(name) for name in MEDIA_MODULES]
+    defaults = [module.MEDIA_PATH for module in modules]  # type: ignore[attr-defined]
+    for module in modules:
+        module.MEDIA_PATH = str(media_path)  # type: ignore[attr-defined]
+    try:
+        yield
+    finally:
+        for module, default in zip(modules, defaults):
+            module.MEDIA_PATH = default  # type: ignore[attr-defined]
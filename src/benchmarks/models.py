@@ -0,0 +1,124 @@
+"""
+Замер стоимости создания моделей данных из кэша: с валидацией и без нее.
+
+Пример запуска:
+
+.. code-block:: console
+
+    python -m benchmarks.models --count 250 --output models.json
+"""
+
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import asyncclick as click
+
+from benchmarks.data import generate_countries, generate_weather
+from collectors.collector import CountryCollector, WeatherCollector
+
+
+def measure(build: Callable[[], list[Any]], repeat: int) -> dict[str, float]:
+    """
+    Замер времени и памяти, необходимых для создания моделей.
+
+    :param build: Функция создания моделей
+    :param repeat: Количество повторений
+    :return: Время на одну запись (в микросекундах) и память на одну запись (в байтах)
+    """
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = build()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = len(result)
+    return {
+        "records": count,
+        "per_record_us": statistics.median(timings) / count * 1_000_000,
+        "per_record_bytes": size / count,
+        "peak_bytes": peak,
+    }
+
+
+def build_each(
+    build: Callable[[Any, bool], Any], items: list[Any], trusted: bool
+) -> list[Any]:
+    """
+    Создание моделей для нескольких записей кэша.
+
+    :param build: Функция создания модели из одной записи
+    :param items: Записи кэша
+    :param trusted: Создание моделей без валидации
+    :return:
+    """
+
+    return [build(item, trusted) for item in items]
+
+
+def run(repeat: int, count: int) -> dict[str, Any]:
+    """
+    Выполнение всех замеров.
+
+    :param repeat: Количество повторений
+    :param count: Количество стран
+    :return:
+    """
+
+    # замеряется создание моделей без разбора файлов,
+    # поэтому используются внутренние функции сборщиков
+    # pylint: disable=protected-access
+    countries = generate_countries(count)
+    weather = [generate_weather(position) for position in range(count)]
+
+    return {
+        "python": sys.version,
+        "repeat": repeat,
+        "country": {
+            mode: measure(partial(CountryCollector._build, countries, trusted), repeat)
+            for mode, trusted in (("validated", False), ("trusted", True))
+        },
+        "weather": {
+            mode: measure(
+                partial(build_each, WeatherCollector._build, weather, trusted), repeat
+            )
+            for mode, trusted in (("validated", False), ("trusted", True))
+        },
+    }
+
+
+@click.command()
+@click.option("--repeat", "-r", type=int, default=5, show_default=True)
+@click.option("--count", "-c", type=int, default=250, show_default=True)
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None)
+def main(repeat: int, count: int, output: Optional[str]) -> None:
+    """
+    Замер стоимости создания моделей данных на синтетических данных.
+
+    :param repeat: Количество повторений
+    :param count: Количество стран
+    :param output: Файл для сохранения результатов в формате JSON
+    """
+
+    content = json.dumps(run(repeat, count), indent=2)
+    if output:
+        Path(output).write_text(content, encoding="utf-8")
+    click.echo(content)
+
+
+if __name__ == "__main__":
+    # pylint: disable=E1120
+    main(_anyio_backend="asyncio")
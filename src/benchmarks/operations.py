@@ -0,0 +1,252 @@
+"""
+Замер времени основных операций чтения данных на синтетических кэшах разного размера.
+
+Пример запуска:
+
+.. code-block:: console
+
+    python -m benchmarks.operations --output operations.json
+    python -m benchmarks.operations --baseline operations.json --threshold 1.25
+"""
+
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+import asyncclick as click
+
+from benchmarks.data import use_media, write_media
+from clients.models import ResponseDTO
+from collectors.collector import CountryCollector
+from collectors.manifest import Manifest
+from reader import Reader
+from renderer import Renderer
+
+# количество стран в кэше: один регион, все страны мира и заведомо большой кэш
+SIZES = [30, 250, 10_000]
+# допустимое замедление операции относительно сохраненных результатов
+REGRESSION_THRESHOLD = 1.25
+# строка для поиска, которой нет в кэше
+MISSING_QUERY = "Qxzvbnmw"
+# радиус поиска столиц по координатам (в километрах)
+GEO_RADIUS = 500
+
+
+async def measure(
+    func: Callable[[], Awaitable[Any]], repeat: int, number: int = 10
+) -> dict[str, float]:
+    """
+    Замер времени выполнения асинхронной функции.
+
+    :param func: Функция
+    :param repeat: Количество серий замеров
+    :param number: Количество вызовов в серии
+    :return: Минимальное и медианное время одного вызова в миллисекундах
+    """
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        timings.append((time.perf_counter() - start) * 1000 / number)
+
+    return {"min_ms": min(timings), "median_ms": statistics.median(timings)}
+
+
+async def run_size(
+    media_path: Path, size: int, repeat: int, number: int
+) -> dict[str, Any]:
+    """
+    Выполнение замеров для кэша одного размера.
+
+    :param media_path: Директория кэша
+    :param size: Количество стран в кэше
+    :param repeat: Количество серий замеров
+    :param number: Количество вызовов в серии
+    :return:
+    """
+
+    countries = write_media(media_path, size)
+    capital = countries[-1]["capital"]
+    latitude, longitude = countries[-1]["latitude"], countries[-1]["longitude"]
+    reader = Reader(read_through=False)
+
+    async def read_cold() -> None:
+        CountryCollector.read_cache.clear()
+        await CountryCollector.read()
+
+    # для поиска и отображения используются уже прочитанные данные
+    location_info = await reader.find(capital)
+    if location_info is None:
+        raise ValueError(
+            f"Столица {capital} не найдена в синтетическом кэше {media_path}"
+        )
+    currencies = location_info.location.currencies
+    manifest = Manifest(str(media_path / "manifest.json"))
+    manifest.record_success(
+        await CountryCollector.get_resource("eu"), ResponseDTO(url="", status=200)
+    )
+    file_collector = CountryCollector()
+    manifest_collector = CountryCollector(manifest)
+
+    return {
+        "size": size,
+        "find_hit": await measure(lambda: reader.find(capital), repeat, number),
+        "find_miss": await measure(lambda: reader.find(MISSING_QUERY), repeat, number),
+        # опечатка в последней букве названия столицы
+        "find_fuzzy": await measure(
+            lambda: reader.find(f"{capital[:-1]}x"), repeat, number
+        ),
+        "find_nearest": await measure(
+            lambda: reader.find_nearest(latitude, longitude), repeat, number
+        ),
+        "find_within": await measure(
+            lambda: reader.find_within(latitude, longitude, GEO_RADIUS), repeat, number
+        ),
+        "country_read": await measure(CountryCollector.read, repeat, number),
+        "country_read_cold": await measure(read_cold, repeat, 1),
+        "currency_rates": await measure(
+            lambda: Reader.get_currency_rates(currencies), repeat, number
+        ),
+        "render": await measure(Renderer(location_info).render, repeat, number),
+        "cache_invalid": await measure(
+            lambda: file_collector.cache_invalid(bloc="eu"), repeat, number
+        ),
+        "cache_invalid_manifest": await measure(
+            lambda: manifest_collector.cache_invalid(bloc="eu"), repeat, number
+        ),
+    }
+
+
+async def run(repeat: int, sizes: list[int], number: int = 10) -> dict[str, Any]:
+    """
+    Выполнение всех замеров.
+
+    :param repeat: Количество серий замеров
+    :param sizes: Количество стран в кэше для каждой серии замеров
+    :param number: Количество вызовов в серии
+    :return:
+    """
+
+    result: dict[str, Any] = {"python": sys.version, "repeat": repeat, "results": []}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as media_path, use_media(Path(media_path)):
+            CountryCollector.read_cache.clear()
+            try:
+                result["results"].append(
+                    await run_size(Path(media_path), size, repeat, number)
+                )
+            finally:
+                CountryCollector.read_cache.clear()
+
+    return result
+
+
+def compare(
+    result: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = REGRESSION_THRESHOLD,
+) -> list[str]:
+    """
+    Сравнение результатов замеров с сохраненными ранее.
+    Сравниваются медианные значения операций для одинаковых размеров кэша.
+
+    :param result: Результаты замеров
+    :param baseline: Сохраненные результаты
+    :param threshold: Допустимое отношение нового времени к сохраненному
+    :return: Описания операций, выполнение которых замедлилось
+    """
+
+    previous = {item["size"]: item for item in baseline.get("results", [])}
+    regressions = []
+    for item in result["results"]:
+        if (base := previous.get(item["size"])) is None:
+            continue
+        for name, timings in item.items():
+            if not isinstance(timings, dict) or name not in base:
+                continue
+            before, after = base[name]["median_ms"], timings["median_ms"]
+            if before > 0 and after / before > threshold:
+                regressions.append(
+                    f"{name} ({item['size']}): {before:.3f} -> {after:.3f} ms"
+                    f" (x{after / before:.2f})"
+                )
+
+    return regressions
+
+
+@click.command()
+@click.option("--repeat", "-r", type=int, default=5, show_default=True)
+@click.option(
+    "--number",
+    "-n",
+    type=int,
+    default=10,
+    show_default=True,
+    help="Количество вызовов операции в одной серии замеров",
+)
+@click.option(
+    "--size",
+    "-s",
+    "sizes",
+    type=int,
+    multiple=True,
+    default=SIZES,
+    show_default=True,
+    help="Количество стран в кэше (можно указать несколько раз)",
+)
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None)
+@click.option(
+    "--baseline",
+    "-b",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Файл с результатами предыдущего запуска для поиска замедлений",
+)
+@click.option("--threshold", "-t", type=float, default=REGRESSION_THRESHOLD)
+async def main(
+    repeat: int,
+    number: int,
+    sizes: tuple[int, ...],
+    output: Optional[str],
+    baseline: Optional[str],
+    threshold: float,
+) -> None:
+    """
+    Замер времени основных операций на синтетических данных.
+    Если найдены замедления относительно сохраненных результатов,
+    то команда завершается с кодом 1.
+
+    :param repeat: Количество серий замеров
+    :param number: Количество вызовов операции в одной серии
+    :param sizes: Количество стран в кэше
+    :param output: Файл для сохранения результатов в формате JSON
+    :param baseline: Файл с результатами предыдущего запуска
+    :param threshold: Допустимое отношение нового времени к сохраненному
+    """
+
+    # сохраненные результаты читаются до замеров, так как файл может быть перезаписан
+    previous = json.loads(Path(baseline).read_text()) if baseline else None
+
+    result = await run(repeat, list(sizes), number)
+    content = json.dumps(result, indent=2)
+    if output:
+        Path(output).write_text(content)
+    click.echo(content)
+
+    if previous is not None:
+        regressions = compare(result, previous, threshold)
+        for line in regressions:
+            click.echo(f"Замедление: {line}", err=True)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    # pylint: disable=E1120
+    main(_anyio_backend="asyncio")
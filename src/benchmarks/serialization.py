@@ -0,0 +1,147 @@
+"""
+Сравнение библиотек сериализации JSON: разбор кэшей и построение моделей данных.
+
+Пример запуска:
+
+.. code-block:: console
+
+    python -m benchmarks.serialization --repeat 5 --output serialization.json
+"""
+
+import json
+import statistics
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import asyncclick as click
+
+from benchmarks.data import (
+    generate_countries,
+    generate_currency_rates,
+    generate_weather,
+)
+from collectors import serialization
+from collectors.collector import (
+    CountryCollector,
+    CurrencyRatesCollector,
+    WeatherCollector,
+)
+
+# количество стран в реалистичном кэше (около 250 стран и территорий)
+REALISTIC_SIZE = 250
+
+
+def measure(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """
+    Замер времени выполнения функции.
+
+    :param func: Функция
+    :param repeat: Количество повторений
+    :return: Минимальное и медианное время в миллисекундах
+    """
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {"min_ms": min(timings), "median_ms": statistics.median(timings)}
+
+
+def parse_each(parse: Callable[[bytes], Any], items: list[bytes]) -> list[Any]:
+    """
+    Разбор содержимого нескольких файлов кэша.
+
+    :param parse: Функция разбора содержимого файла
+    :param items: Содержимое файлов
+    :return:
+    """
+
+    return [parse(item) for item in items]
+
+
+def run(repeat: int, sizes: list[int]) -> dict[str, Any]:
+    """
+    Выполнение всех замеров для каждой доступной библиотеки сериализации.
+    Содержимое кэшей формируется стандартным модулем ``json``, как если бы оно было
+    записано предыдущей версией приложения.
+
+    :param repeat: Количество повторений
+    :param sizes: Количество стран в кэше для каждой серии замеров
+    :return:
+    """
+
+    # замеряется разбор содержимого кэша без чтения файлов,
+    # поэтому используются внутренние функции разбора сборщиков
+    # pylint: disable=protected-access
+    result: dict[str, Any] = {"python": sys.version, "repeat": repeat, "results": []}
+    for size in sizes:
+        countries = generate_countries(size)
+        country = serialization.JSONBackend.dumps(countries)
+        rates = serialization.JSONBackend.dumps(generate_currency_rates(countries))
+        weather = [
+            serialization.JSONBackend.dumps(generate_weather(position))
+            for position in range(size)
+        ]
+
+        for name, backend in serialization.get_backends().items():
+            default, serialization.backend = serialization.backend, backend
+            try:
+                result["results"].append(
+                    {
+                        "backend": name,
+                        "size": size,
+                        "country": measure(
+                            partial(CountryCollector._parse, country), repeat
+                        ),
+                        "currency_rates": measure(
+                            partial(CurrencyRatesCollector._parse, rates), repeat
+                        ),
+                        "weather": measure(
+                            partial(parse_each, WeatherCollector._parse, weather),
+                            repeat,
+                        ),
+                        "dumps": measure(partial(backend.dumps, countries), repeat),
+                    }
+                )
+            finally:
+                serialization.backend = default
+
+    return result
+
+
+@click.command()
+@click.option("--repeat", "-r", type=int, default=5, show_default=True)
+@click.option(
+    "--size",
+    "-s",
+    "sizes",
+    type=int,
+    multiple=True,
+    default=[REALISTIC_SIZE, REALISTIC_SIZE * 10],
+    show_default=True,
+    help="Количество стран в кэше (можно указать несколько раз)",
+)
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None)
+def main(repeat: int, sizes: tuple[int, ...], output: Optional[str]) -> None:
+    """
+    Сравнение библиотек сериализации JSON на синтетических данных.
+
+    :param repeat: Количество повторений
+    :param sizes: Количество стран в кэше
+    :param output: Файл для сохранения результатов в формате JSON
+    """
+
+    content = json.dumps(run(repeat, list(sizes)), indent=2)
+    if output:
+        Path(output).write_text(content, encoding="utf-8")
+    click.echo(content)
+
+
+if __name__ == "__main__":
+    # pylint: disable=E1120
+    main(_anyio_backend="asyncio")
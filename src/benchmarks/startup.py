@@ -0,0 +1,179 @@
+"""
+Замер времени запуска точек входа (импорт модулей и первый поиск).
+
+Пример запуска:
+
+.. code-block:: console
+
+    python -m benchmarks.startup --repeat 5 --output startup.json --check
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import asyncclick as click
+
+from benchmarks.data import write_media
+
+# директория с исходным кодом приложения
+SRC_PATH = Path(__file__).resolve().parent.parent
+
+# допустимое время (в секундах) импорта точки входа и выполнения первого поиска
+# сверх запуска пустого интерпретатора (``python -c pass``),
+# превышение проверяется командой с флагом ``--check``
+IMPORT_BUDGET = 0.4
+FIRST_QUERY_BUDGET = 0.5
+# модули сетевого клиента, которые не должны загружаться при поиске
+NETWORK_MODULES = (
+    "aiohttp",
+    "yarl",
+    "multidict",
+    "aiosignal",
+    "frozenlist",
+    "async_timeout",
+    "clients",
+    "logger",
+)
+
+
+def measure(
+    args: list[str], repeat: int, env: Optional[dict[str, str]] = None
+) -> dict[str, float]:
+    """
+    Замер времени выполнения команды в новом процессе интерпретатора.
+
+    :param args: Аргументы интерпретатора
+    :param repeat: Количество повторений
+    :param env: Дополнительные переменные окружения
+    :return: Минимальное, медианное и максимальное время в секундах
+    """
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args],
+            cwd=SRC_PATH,
+            env={**os.environ, "PYTHONPATH": str(SRC_PATH), **(env or {})},
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+    }
+
+
+def imported_modules(module: str) -> set[str]:
+    """
+    Получение модулей, загружаемых при импорте точки входа.
+
+    :param module: Имя модуля точки входа
+    :return:
+    """
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import json, sys, {module}; print(json.dumps(list(sys.modules)))",
+        ],
+        cwd=SRC_PATH,
+        env={**os.environ, "PYTHONPATH": str(SRC_PATH)},
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    return set(json.loads(result.stdout))
+
+
+def run(repeat: int, media_path: Path, query: str) -> dict[str, Any]:
+    """
+    Выполнение всех замеров.
+
+    :param repeat: Количество повторений
+    :param media_path: Директория кэша
+    :param query: Строка для первого поиска
+    :return:
+    """
+
+    return {
+        "python": sys.version,
+        "repeat": repeat,
+        "import_main": measure(["-c", "import main"], repeat),
+        "import_collect": measure(["-c", "import collect"], repeat),
+        "import_python": measure(["-c", "pass"], repeat),
+        "first_query": measure(
+            ["main.py", "--location", query, "--format", "jsonl"],
+            repeat,
+            env={"MEDIA_PATH": str(media_path)},
+        ),
+    }
+
+
+def over_budget(result: dict[str, Any]) -> list[str]:
+    """
+    Получение замеров, превысивших бюджет времени запуска.
+    Бюджет задан сверх медианного времени запуска пустого интерпретатора,
+    поэтому проверка не зависит от производительности машины.
+
+    :param result: Результаты замеров (см. :func:`run`)
+    :return: Названия замеров
+    """
+
+    baseline = result["import_python"]["median"]
+    budgets = {"import_main": IMPORT_BUDGET, "first_query": FIRST_QUERY_BUDGET}
+
+    return [
+        name
+        for name, budget in budgets.items()
+        if result[name]["median"] - baseline > budget
+    ]
+
+
+@click.command()
+@click.option("--repeat", "-r", type=int, default=5, show_default=True)
+@click.option("--count", "-c", type=int, default=250, show_default=True)
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None)
+@click.option(
+    "--check", is_flag=True, help="Завершение с ошибкой при превышении бюджета"
+)
+def main(repeat: int, count: int, output: Optional[str], check: bool) -> None:
+    """
+    Замер времени запуска на синтетических данных.
+
+    :param repeat: Количество повторений
+    :param count: Количество стран в синтетическом кэше
+    :param output: Файл для сохранения результатов в формате JSON
+    :param check: Проверить бюджет времени запуска
+    """
+
+    with tempfile.TemporaryDirectory() as media_path:
+        countries = write_media(Path(media_path), count)
+        result = run(repeat, Path(media_path), countries[-1]["capital"])
+
+    content = json.dumps(result, indent=2)
+    if output:
+        Path(output).write_text(content)
+    click.echo(content)
+
+    if check and (exceeded := over_budget(result)):
+        raise click.ClickException(
+            f"Превышен бюджет времени запуска: {', '.join(exceeded)}"
+        )
+
+
+if __name__ == "__main__":
+    # pylint: disable=E1120
+    main(_anyio_backend="asyncio")
@@ -2,15 +2,108 @@
 Базовые функции для клиентов внешних сервисов.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
+from http import HTTPStatus
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import aiohttp
+from aiohttp import hdrs
+
+from clients.models import ResponseDTO
+from clients.resilience import CircuitBreaker, RETRY_STATUSES, retry_delay
+from logger import record_error, trace_config
+from settings import (
+    HTTP_BREAKER_RESET,
+    HTTP_BREAKER_THRESHOLD,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_LIMIT,
+    HTTP_LIMIT_PER_HOST,
+    HTTP_READ_TIMEOUT,
+    HTTP_RETRIES,
+)
+
+# поддерживаемые способы сжатия ответов
+ACCEPT_ENCODING = "gzip, deflate"
+# параметры запроса, содержащие ключи доступа
+SECRET_PARAMS = frozenset({"appid", "apikey"})
 
 
 class BaseClient(ABC):
     """
     Базовый класс, реализующий интерфейс для клиентов.
+
+    Все клиенты используют одну общую HTTP-сессию с пулом соединений,
+    чтобы не устанавливать новое TCP/TLS-соединение на каждый запрос.
+
+    Запросы ограничены по времени, при ошибках сети и ответах 429/5xx повторяются
+    с задержкой, а к хосту, который несколько раз подряд не ответил,
+    запросы временно не выполняются (см. :class:`clients.resilience.CircuitBreaker`).
     """
 
+    # общая для всех клиентов сессия (создается при первом запросе)
+    _session: Optional[aiohttp.ClientSession] = None
+    # автоматические выключатели: хост -> выключатель
+    _breakers: dict[str, CircuitBreaker] = {}
+
+    @staticmethod
+    async def get_session() -> aiohttp.ClientSession:
+        """
+        Получение общей HTTP-сессии.
+        Если сессия еще не создана или уже закрыта, то создается новая.
+
+        :return:
+        """
+
+        if BaseClient._session is None or BaseClient._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_LIMIT,
+                limit_per_host=HTTP_LIMIT_PER_HOST,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            )
+            BaseClient._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT
+                ),
+                trace_configs=[trace_config],
+            )
+
+        return BaseClient._session
+
+    @staticmethod
+    async def close_session() -> None:
+        """
+        Закрытие общей HTTP-сессии и освобождение соединений.
+
+        :return:
+        """
+
+        if BaseClient._session is not None:
+            await BaseClient._session.close()
+            BaseClient._session = None
+
+    @staticmethod
+    def get_breaker(endpoint: str) -> CircuitBreaker:
+        """
+        Получение автоматического выключателя для хоста запроса.
+
+        :param endpoint: URL запроса
+        :return:
+        """
+
+        host = urlsplit(endpoint).netloc
+        if (breaker := BaseClient._breakers.get(host)) is None:
+            breaker = BaseClient._breakers.setdefault(
+                host, CircuitBreaker(HTTP_BREAKER_THRESHOLD, HTTP_BREAKER_RESET)
+            )
+
+        return breaker
+
     @abstractmethod
     async def get_base_url(self) -> str:
         """
@@ -20,10 +113,163 @@ class BaseClient(ABC):
         """
 
     @abstractmethod
-    async def _request(self, endpoint: str) -> Optional[dict]:
+    async def _request(self, endpoint: str, **kwargs: Any) -> ResponseDTO:
         """
         Формирование и выполнение запроса.
 
         :param endpoint:
         :return:
         """
+
+    async def _get(
+        self,
+        endpoint: str,
+        headers: Optional[dict[str, Optional[str]]] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> ResponseDTO:
+        """
+        Выполнение GET-запроса в общей HTTP-сессии.
+
+        Если переданы валидаторы ранее полученного ответа, то запрос выполняется как условный:
+        при неизменных данных сервис возвращает ``304 Not Modified`` без содержимого.
+        Ответ запрашивается в сжатом виде (gzip/deflate) и распаковывается автоматически.
+
+        :param endpoint: URL запроса
+        :param headers: Заголовки запроса
+        :param etag: Значение ETag ранее полученного ответа
+        :param last_modified: Значение Last-Modified ранее полученного ответа
+        :raises CircuitOpenError: Хост временно недоступен, запрос не выполнялся
+        :return: Ответ (содержимое разбирается только для успешных ответов)
+        """
+
+        request_headers = {
+            hdrs.ACCEPT_ENCODING: ACCEPT_ENCODING,
+            # заголовки без значения (например, не заданный ключ доступа) не передаются
+            **{
+                key: value
+                for key, value in (headers or {}).items()
+                if value is not None
+            },
+        }
+        if etag:
+            request_headers[hdrs.IF_NONE_MATCH] = etag
+        if last_modified:
+            request_headers[hdrs.IF_MODIFIED_SINCE] = last_modified
+
+        breaker = self.get_breaker(endpoint)
+        breaker.before_request()
+        try:
+            response = await self._get_with_retries(
+                endpoint, request_headers, etag, last_modified
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        if response.status in RETRY_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        return response
+
+    async def _get_with_retries(
+        self,
+        endpoint: str,
+        headers: dict[str, str],
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> ResponseDTO:
+        """
+        Выполнение GET-запроса с повторами при ошибках сети и ответах 429/5xx.
+
+        :param endpoint: URL запроса
+        :param headers: Заголовки запроса
+        :param etag: Значение ETag ранее полученного ответа
+        :param last_modified: Значение Last-Modified ранее полученного ответа
+        :return: Ответ последней попытки
+        """
+
+        session = await self.get_session()
+        attempt = 0
+        while True:
+            delay: Optional[float] = None
+            # имя клиента для меток метрик запросов (см. logger.py)
+            trace_request_ctx = {"client": type(self).__name__}
+            try:
+                async with session.get(
+                    endpoint, headers=headers, trace_request_ctx=trace_request_ctx
+                ) as response:
+                    if response.status in RETRY_STATUSES and attempt < HTTP_RETRIES:
+                        # если сервис просит подождать дольше допустимого,
+                        # то возвращается полученный ответ
+                        delay = retry_delay(
+                            attempt, response.headers.get(hdrs.RETRY_AFTER)
+                        )
+                    if delay is None:
+                        return await self._build_response(
+                            endpoint, response, etag, last_modified
+                        )
+                    # тело ответа дочитывается, чтобы соединение вернулось в пул
+                    await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # ошибка при чтении тела ответа учитывается в метриках запросов
+                record_error(trace_request_ctx)
+                if attempt >= HTTP_RETRIES:
+                    raise
+                delay = retry_delay(attempt)
+
+            await asyncio.sleep(delay or 0)
+            attempt += 1
+
+    async def _build_response(
+        self,
+        endpoint: str,
+        response: aiohttp.ClientResponse,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> ResponseDTO:
+        """
+        Формирование объекта ответа.
+
+        :param endpoint: URL запроса
+        :param response: Ответ сервиса
+        :param etag: Значение ETag ранее полученного ответа
+        :param last_modified: Значение Last-Modified ранее полученного ответа
+        :return:
+        """
+
+        content = await response.read()
+        data = await response.json() if response.status == HTTPStatus.OK else None
+
+        return ResponseDTO(
+            url=self._public_url(endpoint),
+            status=response.status,
+            data=data,
+            size=len(content),
+            # сервис может не повторять валидаторы в ответе 304
+            etag=response.headers.get(hdrs.ETAG, etag),
+            last_modified=response.headers.get(hdrs.LAST_MODIFIED, last_modified),
+        )
+
+    @staticmethod
+    def _public_url(endpoint: str) -> str:
+        """
+        Получение URL запроса без ключей доступа (для сохранения и логирования).
+
+        :param endpoint: URL запроса
+        :return:
+        """
+
+        parts = urlsplit(endpoint)
+        query = [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key.lower() not in SECRET_PARAMS
+        ]
+
+        return urlunsplit(parts._replace(query=urlencode(query)))
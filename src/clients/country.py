@@ -1,13 +1,10 @@
 """
 Функции для взаимодействия с внешним сервисом-провайдером данных о странах.
 """
-from http import HTTPStatus
-from typing import Optional
-
-import aiohttp
+from typing import Any
 
 from clients.base import BaseClient
-from logger import trace_config
+from clients.models import ResponseDTO
 from settings import API_KEY_APILAYER
 
 
@@ -19,19 +16,14 @@ class CountryClient(BaseClient):
     async def get_base_url(self) -> str:
         return "https://api.apilayer.com/geo/country"
 
-    async def _request(self, endpoint: str) -> Optional[dict]:
+    async def _request(self, endpoint: str, **kwargs: Any) -> ResponseDTO:
 
         # формирование заголовков запроса
         headers = {"apikey": API_KEY_APILAYER}
 
-        async with aiohttp.ClientSession(trace_configs=[trace_config]) as session:
-            async with session.get(endpoint, headers=headers) as response:
-                if response.status == HTTPStatus.OK:
-                    return await response.json()
-
-                return None
+        return await self._get(endpoint, headers=headers, **kwargs)
 
-    async def get_countries(self, bloc: str = "eu") -> Optional[dict]:
+    async def get_countries(self, bloc: str = "eu", **kwargs: Any) -> ResponseDTO:
         """
         Получение данных о странах.
 
@@ -39,4 +31,6 @@ class CountryClient(BaseClient):
         :return:
         """
 
-        return await self._request(f"{await self.get_base_url()}/regional_bloc/{bloc}")
+        return await self._request(
+            f"{await self.get_base_url()}/regional_bloc/{bloc}", **kwargs
+        )
@@ -0,0 +1,44 @@
+"""
+Описание моделей данных (DTO) для ответов внешних сервисов.
+"""
+from http import HTTPStatus
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+class ResponseDTO(BaseModel):
+    """
+    Модель ответа внешнего сервиса.
+
+    .. code-block::
+
+        ResponseDTO(
+            url="https://api.apilayer.com/fixer/latest?base=rub",
+            status=200,
+            data={"base": "RUB", "date": "2022-09-14", "rates": {"EUR": 0.016503}},
+            size=87,
+            etag='"5f3b1c"',
+            last_modified="Wed, 14 Sep 2022 00:00:00 GMT",
+        )
+    """
+
+    url: str
+    status: int
+    # разобранное содержимое ответа (только для ответов 200 OK)
+    data: Optional[Any] = None
+    # размер содержимого ответа (в байтах)
+    size: int = 0
+    # валидаторы для условных запросов
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        """
+        Данные не изменились с момента получения предыдущего ответа (304 Not Modified).
+
+        :return:
+        """
+
+        return self.status == HTTPStatus.NOT_MODIFIED
@@ -0,0 +1,156 @@
+"""
+Функции для устойчивого взаимодействия с внешними сервисами:
+повторные запросы с задержкой и автоматический выключатель (circuit breaker).
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import Optional
+
+from settings import HTTP_RETRY_BACKOFF, HTTP_RETRY_BACKOFF_MAX
+
+# статусы ответов, при которых запрос повторяется
+RETRY_STATUSES = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+
+
+class CircuitOpenError(Exception):
+    """
+    Запрос не выполнен, так как внешний сервис временно недоступен (выключатель разомкнут).
+    """
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Разбор заголовка Retry-After (количество секунд или дата в формате HTTP).
+
+    :param value: Значение заголовка
+    :return: Задержка в секундах или None, если заголовок отсутствует или некорректен
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def retry_delay(attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+    """
+    Получение задержки перед повторным запросом.
+
+    Задержка выбирается случайно в пределах экспоненциально растущего интервала
+    (full jitter), чтобы запросы разных клиентов не повторялись одновременно.
+    Если сервис указал время ожидания в заголовке Retry-After, то используется оно.
+
+    :param attempt: Номер неудачной попытки (начиная с 0)
+    :param retry_after: Значение заголовка Retry-After
+    :return: Задержка в секундах или None, если сервис просит подождать
+        дольше HTTP_RETRY_BACKOFF_MAX (запрос не повторяется)
+    """
+
+    if (delay := parse_retry_after(retry_after)) is not None:
+        return delay if delay <= HTTP_RETRY_BACKOFF_MAX else None
+
+    return random.uniform(
+        0, min(HTTP_RETRY_BACKOFF * 2**attempt, HTTP_RETRY_BACKOFF_MAX)
+    )
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель для запросов к одному хосту.
+
+    После ``threshold`` неудачных запросов подряд выключатель размыкается,
+    и запросы к хосту сразу завершаются ошибкой :class:`CircuitOpenError`.
+    Через ``reset_timeout`` секунд выполняется один пробный запрос:
+    при успехе выключатель замыкается, при неудаче – снова размыкается.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float) -> None:
+        """
+        Конструктор.
+
+        :param threshold: Количество неудач подряд для размыкания (0 – не размыкается)
+        :param reset_timeout: Время до пробного запроса (в секундах)
+        """
+
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        # время размыкания (по монотонным часам) или None, если выключатель замкнут
+        self.opened_at: Optional[float] = None
+        # выполняется пробный запрос
+        self.trial = False
+
+    @property
+    def closed(self) -> bool:
+        return self.opened_at is None
+
+    def before_request(self) -> None:
+        """
+        Проверка возможности выполнить запрос.
+
+        :return:
+        """
+
+        if self.opened_at is None:
+            return
+
+        if self.trial or time.monotonic() - self.opened_at < self.reset_timeout:
+            raise CircuitOpenError("Внешний сервис временно недоступен")
+
+        self.trial = True
+
+    def record_success(self) -> None:
+        """
+        Учет успешного запроса.
+
+        :return:
+        """
+
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def record_failure(self) -> None:
+        """
+        Учет неудачного запроса.
+
+        :return:
+        """
+
+        self.failures += 1
+        if self.trial or (self.threshold and self.failures >= self.threshold):
+            self.opened_at = time.monotonic()
+        self.trial = False
+
+    def release(self) -> None:
+        """
+        Завершение запроса без результата (например, при отмене задачи).
+
+        :return:
+        """
+
+        self.trial = False
@@ -1,13 +1,11 @@
 """
 Функции для взаимодействия с внешним сервисом-провайдером данных о погоде.
 """
-from http import HTTPStatus
-from typing import Optional
-
-import aiohttp
+from typing import Any, Iterable
+from urllib.parse import urlencode
 
 from clients.base import BaseClient
-from logger import trace_config
+from clients.models import ResponseDTO
 from settings import API_KEY_OPENWEATHER
 
 
@@ -17,18 +15,30 @@ class WeatherClient(BaseClient):
     """
 
     async def get_base_url(self) -> str:
-        return "https://api.openweathermap.org/data/2.5/weather?lang=ru"
+        return "https://api.openweathermap.org/data/2.5"
+
+    async def _request(self, endpoint: str, **kwargs: Any) -> ResponseDTO:
+
+        return await self._get(endpoint, **kwargs)
+
+    async def get_url(self, method: str, **params: Any) -> str:
+        """
+        Получение URL запроса к методу сервиса с общими параметрами
+        (язык, единицы измерения и ключ доступа).
 
-    async def _request(self, endpoint: str) -> Optional[dict]:
+        :param method: Метод сервиса (например, ``weather``)
+        :param params: Параметры запроса
+        :return:
+        """
 
-        async with aiohttp.ClientSession(trace_configs=[trace_config]) as session:
-            async with session.get(endpoint) as response:
-                if response.status == HTTPStatus.OK:
-                    return await response.json()
+        query = urlencode(
+            {"lang": "ru", "units": "metric", **params, "appid": API_KEY_OPENWEATHER},
+            safe=",",
+        )
 
-                return None
+        return f"{await self.get_base_url()}/{method}?{query}"
 
-    async def get_weather(self, location: str) -> Optional[dict]:
+    async def get_weather(self, location: str, **kwargs: Any) -> ResponseDTO:
         """
         Получение данных о погоде.
 
@@ -36,6 +46,34 @@ class WeatherClient(BaseClient):
         :return:
         """
 
+        return await self._request(await self.get_url("weather", q=location), **kwargs)
+
+    async def get_weather_by_coordinates(
+        self, latitude: float, longitude: float, **kwargs: Any
+    ) -> ResponseDTO:
+        """
+        Получение данных о погоде по географическим координатам
+        (без определения местоположения по названию на стороне сервиса).
+
+        :param latitude: Широта
+        :param longitude: Долгота
+        :return:
+        """
+
         return await self._request(
-            f"{await self.get_base_url()}&units=metric&q={location}&appid={API_KEY_OPENWEATHER}"
+            await self.get_url("weather", lat=latitude, lon=longitude), **kwargs
         )
+
+    async def get_weather_group(
+        self, city_ids: Iterable[int], **kwargs: Any
+    ) -> ResponseDTO:
+        """
+        Получение данных о погоде для нескольких городов одним запросом.
+
+        :param city_ids: Идентификаторы городов у сервиса (не более 20)
+        :return: Ответ с данными о погоде для городов в списке ``list``
+        """
+
+        ids = ",".join(str(city_id) for city_id in city_ids)
+
+        return await self._request(await self.get_url("group", id=ids), **kwargs)
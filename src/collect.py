@@ -1,13 +1,67 @@
 """
 Запуск приложения.
+
+По умолчанию выполняется один цикл сбора данных (например, по расписанию cron).
+С флагом ``--daemon`` сбор выполняется в режиме службы: процесс не завершается
+и обновляет данные по мере истечения сроков их актуальности.
 """
 import logging
+from typing import Optional
+
+import asyncclick as click
 
 from collectors.collector import Collectors
+from logging_setup import setup_logging
+from profiling import profile, trace_memory
 
-if __name__ == "__main__":
+
+@click.command()
+@click.option(
+    "--daemon",
+    "-d",
+    "daemon",
+    is_flag=True,
+    help="Режим службы: обновление данных по мере истечения сроков актуальности",
+)
+@click.option(
+    "--profile",
+    "-p",
+    "profile_path",
+    type=click.Path(dir_okay=False),
+    help="Путь для сохранения результатов профилирования (без расширения), "
+    "в режиме службы результаты сохраняются при остановке",
+)
+@click.option(
+    "--memory",
+    "-m",
+    "memory_path",
+    type=click.Path(dir_okay=False),
+    help="Путь для сохранения отчета об использовании памяти (без расширения), "
+    "в режиме службы отчет сохраняется при остановке",
+)
+async def process_collect(
+    daemon: bool, profile_path: Optional[str], memory_path: Optional[str]
+) -> None:
+    """
+    Сбор информации о странах, погоде и курсах валют.
+
+    :param bool daemon: Запуск в режиме службы
+    :param profile_path: Путь для сохранения результатов профилирования
+    :param memory_path: Путь для сохранения отчета об использовании памяти
+    """
+
+    setup_logging()
     logging.info("Запуск обновления данных ...")
     # запуск обработки
-    Collectors().collect()
+    with trace_memory(memory_path, "collect"), profile(profile_path, "collect"):
+        if daemon:
+            await Collectors.serve()
+        else:
+            await Collectors.run()
 
     logging.info("Обновление завершено.")
+
+
+if __name__ == "__main__":
+    # pylint: disable=E1120
+    process_collect(_anyio_backend="asyncio")
@@ -1,19 +1,138 @@
 """
 Базовые функции сборщиков информации о странах.
 """
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
 import time
 from abc import ABC, abstractmethod
-from typing import Iterable, Any, Optional
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Awaitable, Iterable, Any, Optional, Callable, TypeVar
 
 import aiofiles
 import aiofiles.os
 
+from profiling import span
+from settings import READ_CACHE_SIZE
+
+if TYPE_CHECKING:
+    from clients.models import ResponseDTO
+    from collectors.manifest import Manifest
+
+T = TypeVar("T")
+
+
+class FileCache:
+    """
+    Кэш прочитанных из файлов объектов в памяти процесса.
+
+    Объект хранится вместе с временем изменения и размером файла,
+    поэтому при перезаписи файла кэш автоматически становится неактуальным.
+    Количество хранимых файлов ограничено, при переполнении вытесняются
+    давно не использованные записи.
+
+    Возвращаемые объекты общие для всех вызовов и не должны изменяться.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Конструктор.
+
+        :param maxsize: Максимальное количество хранимых файлов (0 – без кэширования)
+        """
+
+        self.maxsize = maxsize
+        self._items: OrderedDict[str, tuple[tuple[int, int], Any]] = OrderedDict()
+
+    async def load(
+        self, file_path: str, parse: Callable[[Any], T], binary: bool = False
+    ) -> T:
+        """
+        Получение объекта, прочитанного из файла.
+        Файл читается и разбирается только если он изменился с момента прошлого чтения.
+
+        :param file_path: Путь к файлу
+        :param parse: Функция разбора содержимого файла
+        :param binary: Чтение содержимого в виде байтов
+        :return:
+        """
+
+        stat = await aiofiles.os.stat(file_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        found, result = self.get(file_path, version)
+        if found:
+            return result
+
+        with span("cache.read"):
+            async with aiofiles.open(file_path, mode="rb" if binary else "r") as file:
+                content = await file.read()
+
+        result = parse(content)
+        self.put(file_path, version, result)
+
+        return result
+
+    def get(self, key: str, version: tuple[int, int]) -> tuple[bool, Any]:
+        """
+        Получение объекта из кэша.
+
+        :param key: Ключ объекта (например, путь к файлу)
+        :param version: Версия источника (время изменения и размер файла)
+        :return: Признак наличия объекта этой версии и сам объект
+        """
+
+        if (item := self._items.get(key)) and item[0] == version:
+            self._items.move_to_end(key)
+            return True, item[1]
+
+        return False, None
+
+    def put(self, key: str, version: tuple[int, int], value: Any) -> None:
+        """
+        Сохранение объекта в кэше.
+
+        :param key: Ключ объекта (например, путь к файлу)
+        :param version: Версия источника (время изменения и размер файла)
+        :param value: Объект
+        :return:
+        """
+
+        if self.maxsize > 0:
+            self._items[key] = (version, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Очистка кэша.
+
+        :return:
+        """
+
+        self._items.clear()
+
 
 class BaseCollector(ABC):
     """
     Базовый класс, реализующий интерфейс для сборщиков информации.
     """
 
+    # общий для всех сборщиков кэш прочитанных данных
+    read_cache = FileCache(READ_CACHE_SIZE)
+
+    def __init__(self, manifest: Optional[Manifest] = None) -> None:
+        """
+        Конструктор.
+
+        :param manifest: Манифест сбора данных (если не задан, то актуальность
+            данных определяется по файлам кэша, а результаты запросов не фиксируются)
+        """
+
+        self.manifest = manifest
+
     @abstractmethod
     async def collect(self, **kwargs: Any) -> Optional[Iterable[Any]]:
         ...
@@ -28,16 +147,41 @@ class BaseCollector(ABC):
     async def get_cache_ttl() -> int:
         ...
 
-    async def cache_invalid(self, **kwargs: Any) -> bool:
+    @classmethod
+    async def get_resource(cls, **kwargs: Any) -> str:
+        """
+        Получение имени ресурса в манифесте сбора данных.
+
+        :return:
+        """
+
+        return os.path.basename(await cls.get_file_path(**kwargs))
+
+    async def cache_invalid(self, missing: bool = False, **kwargs: Any) -> bool:
         """
         Проверка необходимости актуализации данных в кэше.
         Если True, то необходимо актуализировать данные в кэше, иначе брать данные из кэша.
 
+        Если ресурс есть в манифесте, то срок актуальности определяется только по нему
+        (файл кэша не проверяется), иначе – по файлу кэша.
+
+        :param missing: Файл кэша отсутствует (проверяется вызывающим кодом один раз
+            для всех ресурсов файла): актуальный по манифесту ресурс получается заново,
+            не дожидаясь истечения срока
         :return: bool
         """
 
-        file_path = await self.get_file_path(**kwargs)
+        if self.manifest is not None:
+            resource = await self.get_resource(**kwargs)
+            stale = self.manifest.stale(resource, await self.get_cache_ttl())
+            if stale is not None:
+                if stale or self.manifest.retry_at(self.manifest.entries[resource]):
+                    # после неудачного запроса повтор откладывается, даже если файла нет
+                    return stale
+
+                return missing
 
+        file_path = await self.get_file_path(**kwargs)
         if (
             # проверка существования файла
             # (если файл не существует)
@@ -55,3 +199,157 @@ class BaseCollector(ABC):
             return True
 
         return False
+
+    async def cache_missing(self, **kwargs: Any) -> bool:
+        """
+        Проверка отсутствия данных в кэше (файл не существует или пустой).
+
+        :return: bool
+        """
+
+        file_path = await self.get_file_path(**kwargs)
+
+        return not (
+            await aiofiles.os.path.isfile(file_path)
+            and await aiofiles.os.path.getsize(file_path)
+        )
+
+    async def fetch(
+        self, request: Awaitable[ResponseDTO], resource: str
+    ) -> tuple[Optional[ResponseDTO], Optional[str]]:
+        """
+        Выполнение запроса к внешнему сервису.
+        Неудачный запрос фиксируется в манифесте, чтобы повторить его с задержкой.
+
+        :param request: Запрос
+        :param resource: Имя ресурса в манифесте
+        :return: Ответ с данными или ответ 304 Not Modified (None, если данные получить
+            не удалось) и описание ошибки
+        """
+
+        # pylint: disable=broad-except
+        try:
+            with span(f"fetch.{type(self).__name__}"):
+                response = await request
+        except Exception as exc:
+            error = repr(exc)
+        else:
+            if response.data or response.not_modified:
+                return response, None
+            error = f"HTTP {response.status}"
+
+        logging.warning("Не удалось получить %s: %s", resource, error)
+        if self.manifest is not None:
+            self.manifest.record_failure(resource, error)
+
+        return None, error
+
+    async def get_validators(self, **kwargs: Any) -> dict[str, str]:
+        """
+        Получение валидаторов ранее полученного ответа для условного запроса.
+        Условный запрос выполняется, только если ранее полученные данные сохранены в кэше,
+        иначе ответ 304 Not Modified не позволит их восстановить.
+
+        :return: Аргументы запроса клиента (etag, last_modified)
+        """
+
+        if self.manifest is None or not (
+            entry := self.manifest.get(await self.get_resource(**kwargs))
+        ):
+            return {}
+
+        if await self.cache_missing(**kwargs):
+            return {}
+
+        return self.manifest.validators(entry)
+
+    @staticmethod
+    def check(data: Any, build: Callable[[Any], Any]) -> Optional[str]:
+        """
+        Проверка полученных данных без фиксации результата в манифесте.
+
+        :param data: Полученные данные
+        :param build: Функция построения моделей данных с валидацией
+        :return: Описание ошибки или None, если данные корректны
+        """
+
+        try:
+            build(data)
+        except (KeyError, IndexError, TypeError, ValueError) as exc:
+            return f"Некорректные данные: {exc!r}"
+
+        return None
+
+    def validate(
+        self, resource: str, data: Any, build: Callable[[Any], Any]
+    ) -> Optional[str]:
+        """
+        Строгая проверка полученных данных перед сохранением в кэш.
+        Некорректные данные не сохраняются, а неудача фиксируется в манифесте,
+        поэтому при чтении кэша данные можно не проверять повторно.
+
+        :param resource: Имя ресурса в манифесте
+        :param data: Полученные данные
+        :param build: Функция построения моделей данных с валидацией
+        :return: Описание ошибки или None, если данные корректны
+        """
+
+        if (error := self.check(data, build)) is None:
+            return None
+
+        logging.warning("Не удалось получить %s: %s", resource, error)
+        if self.manifest is not None:
+            self.manifest.record_failure(resource, error)
+
+        return error
+
+    def record_success(
+        self, resource: str, response: ResponseDTO, **kwargs: Any
+    ) -> None:
+        """
+        Фиксация успешного получения и сохранения ресурса в манифесте.
+        Ответ 304 Not Modified продлевает срок актуальности ранее сохраненных данных.
+
+        :param resource: Имя ресурса в манифесте
+        :param response: Ответ внешнего сервиса
+        :param kwargs: Дополнительные сведения о ресурсе (см. :meth:`Manifest.record_success`)
+        :return:
+        """
+
+        if self.manifest is not None:
+            self.manifest.record_success(resource, response, **kwargs)
+
+
+class RateLimiter:
+    """
+    Ограничение частоты запросов (не более заданного количества запросов в секунду).
+    Запросы равномерно распределяются во времени в порядке вызова.
+    """
+
+    def __init__(self, rate: float) -> None:
+        """
+        Конструктор.
+
+        :param rate: Количество запросов в секунду (0 – без ограничения)
+        """
+
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        """
+        Ожидание момента, когда можно выполнить очередной запрос.
+
+        :return:
+        """
+
+        if not self.interval:
+            return
+
+        now = time.monotonic()
+        # резервирование ближайшего свободного слота выполняется без переключения контекста,
+        # поэтому конкурирующие задачи получают разные слоты
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
@@ -1,41 +1,82 @@
 """
 Функции сбора информации о странах.
+
+Клиенты внешних сервисов (и aiohttp) импортируются только при создании сборщиков,
+чтобы чтение данных из кэша не загружало сетевые модули.
 """
 
 from __future__ import annotations
 
 import asyncio
-import json
-from typing import Any, Optional, FrozenSet
+import logging
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, FrozenSet
 
 import aiofiles
 import aiofiles.os
 
-from clients.country import CountryClient
-from clients.currency import CurrencyClient
-from clients.weather import WeatherClient
-from collectors.base import BaseCollector
+from collectors import serialization
+from collectors.base import BaseCollector, RateLimiter
+from collectors.countries import (
+    CountryStore,
+    build_countries,
+    merge_blocs,
+    normalize,
+)
+from collectors.manifest import Manifest
+from collectors.storage import (
+    BaseWeatherStorage,
+    FileWeatherStorage,
+    SQLiteWeatherStorage,
+)
 from collectors.models import (
+    CollectResultDTO,
+    CollectStatus,
     LocationDTO,
     CountryDTO,
     CurrencyRatesDTO,
-    CurrencyInfoDTO,
     WeatherInfoDTO,
 )
+from metrics import registry
+from profiling import span
+from rates import RateMatrix
+from search import SearchIndex
 from settings import (
     MEDIA_PATH,
+    MANIFEST_PATH,
     CACHE_TTL_COUNTRY,
     CACHE_TTL_CURRENCY_RATES,
     CACHE_TTL_WEATHER,
+    CACHE_TRUSTED,
+    COLLECT_MIN_INTERVAL,
+    COUNTRY_BLOCS,
+    WEATHER_CONCURRENCY,
+    WEATHER_GROUP_SIZE,
+    WEATHER_RATE_LIMIT,
+    WEATHER_STORAGE,
 )
 
+if TYPE_CHECKING:
+    from clients.models import ResponseDTO
+
 
 class CountryCollector(BaseCollector):
     """
     Сбор информации о странах (географическое описание).
+
+    Данные о странах всех регионов из COUNTRY_BLOCS запрашиваются параллельно
+    и сохраняются в один файл: страна -> данные о стране и список ее регионов.
+    Каждый регион – отдельный ресурс манифеста, поэтому при ошибке для одного региона
+    сохраненные ранее данные о его странах остаются в кэше.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, manifest: Optional[Manifest] = None) -> None:
+        # pylint: disable=import-outside-toplevel
+        from clients.country import CountryClient
+
+        super().__init__(manifest)
+
         self.client = CountryClient()
 
     @staticmethod
@@ -46,33 +87,160 @@ class CountryCollector(BaseCollector):
     async def get_cache_ttl() -> int:
         return CACHE_TTL_COUNTRY
 
-    async def collect(self, **kwargs: Any) -> Optional[FrozenSet[LocationDTO]]:
-        if await self.cache_invalid():
-            # если кэш уже невалиден, то актуализируем его
-            result = await self.client.get_countries()
-            if result:
-                result_str = json.dumps(result)
-                async with aiofiles.open(await self.get_file_path(), mode="w") as file:
-                    await file.write(result_str)
-
-        # получение данных из кэша
-        async with aiofiles.open(await self.get_file_path(), mode="r") as file:
-            content = await file.read()
+    @classmethod
+    async def get_resource(cls, bloc: str = "", **kwargs: Any) -> str:
+        return f"country/{bloc}"
+
+    async def cache_invalid(
+        self, missing: bool = False, bloc: str = "", **kwargs: Any
+    ) -> bool:
+        if await super().cache_invalid(missing, bloc=bloc, **kwargs):
+            return True
+
+        # кэш, собранный до добавления региона в COUNTRY_BLOCS, не содержит его стран
+        return (
+            self.manifest is not None
+            and self.manifest.get(await self.get_resource(bloc)) is None
+        )
 
-        result = json.loads(content)
-        if result:
-            locations = frozenset(
+    async def collect(self, **kwargs: Any) -> Optional[FrozenSet[LocationDTO]]:
+        await self._forget_removed_blocs()
+        # файл кэша проверяется один раз, а срок актуальности регионов – по манифесту
+        missing = await self.cache_missing()
+        # актуализируются только регионы, данные которых устарели
+        blocs = [
+            bloc
+            for bloc in COUNTRY_BLOCS
+            if await self.cache_invalid(missing, bloc=bloc)
+        ]
+        responses = dict(
+            zip(blocs, await asyncio.gather(*(self._fetch(bloc) for bloc in blocs)))
+        )
+        # ответ 304 Not Modified допустим, только если кэш есть,
+        # иначе запрос повторяется без валидаторов
+        not_modified = [
+            bloc
+            for bloc, response in responses.items()
+            if response and response.not_modified
+        ]
+        if not_modified and missing:
+            responses.update(
+                zip(
+                    not_modified,
+                    await asyncio.gather(
+                        *(self._fetch(bloc, conditional=False) for bloc in not_modified)
+                    ),
+                )
+            )
+        if any(
+            response and not response.not_modified for response in responses.values()
+        ):
+            store = merge_blocs(
+                await self._read_raw(),
+                {
+                    bloc: response.data
+                    for bloc, response in responses.items()
+                    if response
+                    and not response.not_modified
+                    and isinstance(response.data, list)
+                },
+                COUNTRY_BLOCS,
+            )
+            content = serialization.dumps(store)
+            with span("write.CountryCollector"):
+                async with aiofiles.open(await self.get_file_path(), mode="wb") as file:
+                    await file.write(content)
+
+            # поисковый индекс строится один раз для новой версии кэша
+            await SearchIndex.build(
+                ((item["capital"], *item["alt_spellings"]) for item in store.values()),
+                source=await SearchIndex.get_source(await self.get_file_path()),
+            ).save()
+        for bloc, response in responses.items():
+            if response:
+                self.record_success(await self.get_resource(bloc), response)
+
+        # если данные еще ни разу не были получены, то локаций для сбора погоды нет
+        if not await aiofiles.os.path.isfile(await self.get_file_path()):
+            return None
+
+        # получение данных из кэша (разобранные данные хранятся в памяти процесса
+        # и перечитываются только после обновления файла)
+        if countries := await self.read():
+            return frozenset(
                 LocationDTO(
-                    capital=item["capital"],
-                    alpha2code=item["alpha2code"],
+                    capital=country.capital,
+                    alpha2code=country.alpha2code,
+                    latitude=country.capital_latitude,
+                    longitude=country.capital_longitude,
                 )
-                for item in result
+                for country in countries
             )
 
-            return locations
-
         return None
 
+    async def _forget_removed_blocs(self) -> None:
+        """
+        Удаление из манифеста сведений о регионах, исключенных из COUNTRY_BLOCS.
+        Страны таких регионов удаляются из кэша при его обновлении, поэтому
+        после возвращения региона в список его данные нужно получить заново.
+
+        :return:
+        """
+
+        if self.manifest is None:
+            return
+
+        prefix = await self.get_resource()
+        for resource in list(self.manifest.entries):
+            if (
+                resource.startswith(prefix)
+                and resource[len(prefix) :] not in COUNTRY_BLOCS
+            ):
+                self.manifest.remove(resource)
+
+    async def _fetch(
+        self, bloc: str, conditional: bool = True
+    ) -> Optional[ResponseDTO]:
+        """
+        Получение данных о странах региона.
+
+        :param bloc: Регион
+        :param conditional: Выполнить условный запрос с валидаторами из манифеста
+        :return: Ответ с проверенными данными или ответ 304 Not Modified
+            (None, если данные получить не удалось)
+        """
+
+        resource = await self.get_resource(bloc)
+        validators = await self.get_validators(bloc=bloc) if conditional else {}
+        response, _ = await self.fetch(
+            self.client.get_countries(bloc, **validators), resource
+        )
+        if (
+            response
+            and not response.not_modified
+            and self.validate(resource, response.data, self._build)
+        ):
+            return None
+
+        return response
+
+    async def _read_raw(self) -> dict[str, Any]:
+        """
+        Чтение сохраненных данных о странах без построения моделей.
+
+        :return: Код страны -> данные о стране
+        """
+
+        file_path = await self.get_file_path()
+        if not await aiofiles.os.path.isfile(file_path):
+            return {}
+
+        async with aiofiles.open(file_path, mode="rb") as file:
+            content = await file.read()
+
+        return normalize(serialization.loads(content) if content else None)
+
     @classmethod
     async def read(cls) -> Optional[list[CountryDTO]]:
         """
@@ -81,45 +249,56 @@ class CountryCollector(BaseCollector):
         :return:
         """
 
-        async with aiofiles.open(await cls.get_file_path(), mode="r") as file:
-            content = await file.read()
+        if store := await cls.read_store():
+            return store.countries
 
-        if content:
-            items = json.loads(content)
-            result_list = []
-            for item in items:
-                result_list.append(
-                    CountryDTO(
-                        capital=item["capital"],
-                        capital_latitude=item["latitude"],
-                        capital_longitude=item["longitude"],
-                        alpha2code=item["alpha2code"],
-                        alt_spellings=item["alt_spellings"],
-                        currencies={
-                            CurrencyInfoDTO(code=currency["code"])
-                            for currency in item["currencies"]
-                        },
-                        flag=item["flag"],
-                        languages=item["languages"],
-                        name=item["name"],
-                        area=item["area"],
-                        population=item["population"],
-                        subregion=item["subregion"],
-                        timezones=item["timezones"],
-                    )
-                )
+        return None
 
-            return result_list
+    @classmethod
+    async def read_store(cls) -> Optional[CountryStore]:
+        """
+        Чтение данных из кэша с доступом к стране по коду.
+
+        :return:
+        """
+
+        return await cls.read_cache.load(
+            await cls.get_file_path(), cls._parse, binary=True
+        )
+
+    @staticmethod
+    def _parse(content: bytes) -> Optional[CountryStore]:
+        """
+        Разбор содержимого файла кэша.
+
+        :param content: Содержимое файла
+        :return:
+        """
+
+        if content and (items := normalize(serialization.loads(content))):
+            with span("dto.build.country"):
+                return CountryStore(
+                    CountryCollector._build(items.values(), trusted=CACHE_TRUSTED)
+                )
 
         return None
 
+    @staticmethod
+    def _build(items: Any, trusted: bool = False) -> list[CountryDTO]:
+        return build_countries(items, trusted)
+
 
 class CurrencyRatesCollector(BaseCollector):
     """
     Сбор информации о курсах валют.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, manifest: Optional[Manifest] = None) -> None:
+        # pylint: disable=import-outside-toplevel
+        from clients.currency import CurrencyClient
+
+        super().__init__(manifest)
+
         self.client = CurrencyClient()
 
     @staticmethod
@@ -131,13 +310,39 @@ class CurrencyRatesCollector(BaseCollector):
         return CACHE_TTL_CURRENCY_RATES
 
     async def collect(self, **kwargs: Any) -> None:
-        if await self.cache_invalid():
+        missing = await self.cache_missing()
+        if await self.cache_invalid(missing):
             # если кэш уже невалиден, то актуализируем его
-            result = await self.client.get_rates()
-            if result:
-                result_str = json.dumps(result)
-                async with aiofiles.open(await self.get_file_path(), mode="w") as file:
-                    await file.write(result_str)
+            resource = await self.get_resource()
+            response, _ = await self.fetch(
+                self.client.get_rates(**await self.get_validators()), resource
+            )
+            # ответ 304 Not Modified допустим, только если кэш есть,
+            # иначе запрос повторяется без валидаторов
+            if response and response.not_modified and missing:
+                response, _ = await self.fetch(self.client.get_rates(), resource)
+            if (
+                response
+                and not response.not_modified
+                and self.validate(resource, response.data, self._build)
+            ):
+                response = None
+            if response and not response.not_modified:
+                content = serialization.dumps(response.data)
+                with span("write.CurrencyRatesCollector"):
+                    async with aiofiles.open(
+                        await self.get_file_path(), mode="wb"
+                    ) as file:
+                        await file.write(content)
+
+                # матрица кросс-курсов строится один раз для новой версии кэша
+                if currency_rates := self._parse(content):
+                    await RateMatrix.build(
+                        currency_rates,
+                        source=await RateMatrix.get_source(await self.get_file_path()),
+                    ).save()
+            if response:
+                self.record_success(resource, response)
 
     @classmethod
     async def read(cls) -> Optional[CurrencyRatesDTO]:
@@ -147,19 +352,49 @@ class CurrencyRatesCollector(BaseCollector):
         :return:
         """
 
-        async with aiofiles.open(await cls.get_file_path(), mode="r") as file:
-            content = await file.read()
+        return await cls.read_cache.load(
+            await cls.get_file_path(), cls._parse, binary=True
+        )
+
+    @staticmethod
+    def _parse(content: bytes) -> Optional[CurrencyRatesDTO]:
+        """
+        Разбор содержимого файла кэша.
+
+        :param content: Содержимое файла
+        :return:
+        """
 
         if content:
-            result = json.loads(content)
+            data = serialization.loads(content)
+            with span("dto.build.currency_rates"):
+                return CurrencyRatesCollector._build(data, trusted=CACHE_TRUSTED)
+
+        return None
+
+    @staticmethod
+    def _build(result: Any, trusted: bool = False) -> CurrencyRatesDTO:
+        """
+        Построение модели данных о курсах валют.
 
-            return CurrencyRatesDTO(
+        :param result: Данные о курсах валют в формате ответа внешнего сервиса
+        :param trusted: Данные уже проверены при сохранении в кэш,
+            модель создается без валидации
+        :return:
+        """
+
+        if trusted:
+            return CurrencyRatesDTO.construct(
                 base=result["base"],
                 date=result["date"],
-                rates=result["rates"],
+                rates={code: float(rate) for code, rate in result["rates"].items()},
             )
 
-        return None
+        return CurrencyRatesDTO(
+            base=result["base"],
+            date=result["date"],
+            rates=result["rates"],
+        )
 
 
 class WeatherCollector(BaseCollector):
@@ -167,8 +402,17 @@ class WeatherCollector(BaseCollector):
     Сбор информации о прогнозе погоды для столиц стран.
     """
 
-    def __init__(self) -> None:
+    # хранилища данных о погоде: путь -> хранилище
+    _storages: dict[str, BaseWeatherStorage] = {}
+
+    def __init__(self, manifest: Optional[Manifest] = None) -> None:
+        # pylint: disable=import-outside-toplevel
+        from clients.weather import WeatherClient
+
+        super().__init__(manifest)
+
         self.client = WeatherClient()
+        self.limiter = RateLimiter(WEATHER_RATE_LIMIT)
 
     @staticmethod
     async def get_file_path(filename: str = "", **kwargs: Any) -> str:
@@ -178,28 +422,340 @@ class WeatherCollector(BaseCollector):
     async def get_cache_ttl() -> int:
         return CACHE_TTL_WEATHER
 
+    @classmethod
+    async def get_storage(cls) -> BaseWeatherStorage:
+        """
+        Получение хранилища данных о погоде в соответствии с настройкой WEATHER_STORAGE.
+        Для каждого пути используется один экземпляр хранилища (и его подключения).
+
+        :return:
+        """
+
+        if WEATHER_STORAGE == "sqlite":
+            path = f"{MEDIA_PATH}/weather.sqlite3"
+            factory: Callable[[str], BaseWeatherStorage] = SQLiteWeatherStorage
+        else:
+            path = f"{MEDIA_PATH}/weather"
+            factory = FileWeatherStorage
+        if (storage := cls._storages.get(path)) is None:
+            storage = cls._storages[path] = factory(path)
+
+        return storage
+
+    @staticmethod
+    def get_key(location: LocationDTO) -> str:
+        """
+        Получение ключа локации в хранилище.
+
+        :param location: Локация
+        :return:
+        """
+
+        return f"{location.capital}_{location.alpha2code}".lower()
+
+    @classmethod
+    async def get_resource(cls, filename: str = "", **kwargs: Any) -> str:
+        return f"weather/{filename}"
+
     async def collect(
         self, locations: FrozenSet[LocationDTO] = frozenset(), **kwargs: Any
-    ) -> None:
-
-        target_dir_path = f"{MEDIA_PATH}/weather"
-        # если целевой директории еще не существует, то она создается
-        if not await aiofiles.os.path.exists(target_dir_path):
-            await aiofiles.os.mkdir(target_dir_path)
-
-        for location in locations:
-            filename = f"{location.capital}_{location.alpha2code}".lower()
-            if await self.cache_invalid(filename=filename):
-                # если кэш уже невалиден, то актуализируем его
-                result = await self.client.get_weather(
-                    f"{location.capital},{location.alpha2code}"
+    ) -> list[CollectResultDTO]:
+
+        storage = await self.get_storage()
+        keys = {self.get_key(location): location for location in locations}
+        stale = await self._stale(storage, keys)
+
+        # ограничение количества одновременно выполняемых запросов
+        semaphore = asyncio.Semaphore(WEATHER_CONCURRENCY)
+        stale_keys = [key for key in keys if key in stale]
+        # данные для городов с известным идентификатором запрашиваются группами,
+        # а для остальных (и не полученных в группе) – по одному
+        responses = await self._fetch_groups(stale_keys, semaphore)
+        # данные, полученные в группе, уже проверены
+        checked = set(responses)
+        single_keys = [key for key in stale_keys if key not in responses]
+        responses.update(
+            zip(
+                single_keys,
+                await asyncio.gather(
+                    *(self._fetch(keys[key], semaphore) for key in single_keys)
+                ),
+            )
+        )
+
+        # ответ 304 Not Modified допустим, только если данные есть в хранилище,
+        # иначе запрос повторяется без валидаторов
+        not_modified = [
+            key
+            for key, (response, _) in responses.items()
+            if response and response.not_modified
+        ]
+        if not_modified and (missing := await storage.stale(not_modified, sys.maxsize)):
+            missing_keys = [key for key in not_modified if key in missing]
+            responses.update(
+                zip(
+                    missing_keys,
+                    await asyncio.gather(
+                        *(
+                            self._fetch(keys[key], semaphore, conditional=False)
+                            for key in missing_keys
+                        )
+                    ),
                 )
-                if result:
-                    result_str = json.dumps(result)
-                    async with aiofiles.open(
-                        await self.get_file_path(filename), mode="w"
-                    ) as file:
-                        await file.write(result_str)
+            )
+
+        # полученные данные проверяются перед сохранением,
+        # поэтому при чтении из хранилища повторная валидация не требуется
+        for key, (response, _) in responses.items():
+            if (
+                response
+                and key not in checked
+                and not response.not_modified
+                and (
+                    error := self.validate(
+                        await self.get_resource(key), response.data, self._build
+                    )
+                )
+            ):
+                responses[key] = (None, error)
+
+        # все полученные данные сохраняются за одну операцию
+        fetched = {
+            key: response for key, (response, _) in responses.items() if response
+        }
+        with span("write.WeatherCollector"):
+            await storage.save(
+                {
+                    key: serialization.dumps(response.data)
+                    for key, response in fetched.items()
+                    if not response.not_modified
+                }
+            )
+        for key, response in fetched.items():
+            self.record_success(
+                await self.get_resource(key),
+                response,
+                city_id=response.data.get("id")
+                if isinstance(response.data, dict)
+                else None,
+            )
+
+        results = [
+            CollectResultDTO(location=location, status=CollectStatus.CACHED)
+            for key, location in keys.items()
+            if key not in stale
+        ] + [
+            CollectResultDTO(
+                location=keys[key],
+                status=CollectStatus.NOT_MODIFIED
+                if response.not_modified
+                else CollectStatus.FETCHED,
+            )
+            if response
+            else CollectResultDTO(
+                location=keys[key], status=CollectStatus.FAILED, error=error
+            )
+            for key, (response, error) in responses.items()
+        ]
+
+        logging.info(
+            "Погода: обновлено %s, не изменилось %s, актуально %s, ошибок %s.",
+            sum(item.status == CollectStatus.FETCHED for item in results),
+            sum(item.status == CollectStatus.NOT_MODIFIED for item in results),
+            sum(item.status == CollectStatus.CACHED for item in results),
+            sum(item.status == CollectStatus.FAILED for item in results),
+        )
+
+        return results
+
+    async def _stale(
+        self, storage: BaseWeatherStorage, keys: Iterable[str]
+    ) -> set[str]:
+        """
+        Получение ключей локаций, данные для которых нужно обновить.
+        Срок актуальности определяется по манифесту, а хранилище проверяется
+        для локаций, о которых в манифесте нет сведений (срок актуальности),
+        и для актуальных по манифесту локаций (только наличие данных).
+
+        :param storage: Хранилище данных о погоде
+        :param keys: Ключи локаций
+        :return:
+        """
+
+        ttl = await self.get_cache_ttl()
+        if (manifest := self.manifest) is None:
+            return await storage.stale(keys, ttl)
+
+        now = time.time()
+        stale, unknown, fresh = set(), [], []
+        for key in keys:
+            resource = await self.get_resource(key)
+            result = manifest.stale(resource, ttl, now)
+            if result is None:
+                unknown.append(key)
+            elif result:
+                stale.add(key)
+            elif not manifest.retry_at(manifest.entries[resource]):
+                # после неудачного запроса повтор откладывается, даже если данных нет
+                fresh.append(key)
+
+        # остальные данные проверяются за один раз
+        return (
+            stale
+            | await storage.stale(unknown, ttl)
+            | await storage.stale(fresh, sys.maxsize)
+        )
+
+    async def get_validators(self, filename: str = "", **kwargs: Any) -> dict[str, str]:
+        """
+        Получение валидаторов ранее полученного ответа для условного запроса.
+        Наличие данных в хранилище проверяется после получения ответа 304 Not Modified
+        сразу для всех локаций.
+
+        :param filename: Ключ локации
+        :return: Аргументы запроса клиента (etag, last_modified)
+        """
+
+        if self.manifest is None or not (
+            entry := self.manifest.get(await self.get_resource(filename))
+        ):
+            return {}
+
+        return self.manifest.validators(entry)
+
+    async def _fetch(
+        self,
+        location: LocationDTO,
+        semaphore: asyncio.Semaphore,
+        conditional: bool = True,
+    ) -> tuple[Optional[ResponseDTO], Optional[str]]:
+        """
+        Получение данных о погоде для одной локации.
+        Ошибка для одной локации не прерывает сбор данных для остальных.
+
+        :param location: Локация
+        :param semaphore: Семафор, ограничивающий количество одновременных запросов
+        :param conditional: Выполнить условный запрос с валидаторами из манифеста
+        :return: Ответ и описание ошибки
+        """
+
+        key = self.get_key(location)
+        validators = await self.get_validators(key) if conditional else {}
+        async with semaphore:
+            await self.limiter.acquire()
+
+            # по координатам сервису не требуется определять местоположение по названию
+            if location.latitude is not None and location.longitude is not None:
+                request = self.client.get_weather_by_coordinates(
+                    location.latitude, location.longitude, **validators
+                )
+            else:
+                request = self.client.get_weather(
+                    f"{location.capital},{location.alpha2code}", **validators
+                )
+
+            return await self.fetch(request, await self.get_resource(key))
+
+    async def _fetch_groups(
+        self, keys: Iterable[str], semaphore: asyncio.Semaphore
+    ) -> dict[str, tuple[Optional[ResponseDTO], Optional[str]]]:
+        """
+        Получение данных о погоде групповыми запросами (до WEATHER_GROUP_SIZE городов
+        в одном запросе) для локаций, идентификатор города которых сохранен в манифесте.
+
+        Групповой запрос выполняется без валидаторов. Данные каждой локации
+        проверяются сразу: локации, данные для которых не удалось получить в группе
+        или которые не прошли проверку, в результат не попадают и запрашиваются по одному.
+
+        :param keys: Ключи локаций
+        :param semaphore: Семафор, ограничивающий количество одновременных запросов
+        :return: Ключ локации -> ответ с данными локации и описание ошибки
+        """
+
+        # pylint: disable=import-outside-toplevel
+        from clients.models import ResponseDTO
+
+        if self.manifest is None or WEATHER_GROUP_SIZE < 2:
+            return {}
+
+        city_ids: dict[int, str] = {}
+        for key in keys:
+            if (entry := self.manifest.get(await self.get_resource(key))) and (
+                entry.city_id
+            ):
+                city_ids[entry.city_id] = key
+
+        ids = list(city_ids)
+        responses = await asyncio.gather(
+            *(
+                self._fetch_group(ids[i : i + WEATHER_GROUP_SIZE], semaphore)
+                for i in range(0, len(ids), WEATHER_GROUP_SIZE)
+            )
+        )
+
+        result: dict[str, tuple[Optional[ResponseDTO], Optional[str]]] = {}
+        for response in responses:
+            if response is None or not isinstance(response.data, dict):
+                continue
+            data: dict[str, Any] = response.data
+            for item in data.get("list") or []:
+                if (location_key := city_ids.get(item.get("id"))) is None:
+                    continue
+                # в ответе группового запроса часовой пояс передается в разделе sys
+                item.setdefault("timezone", (item.get("sys") or {}).get("timezone"))
+                if error := self.check(item, self._build):
+                    logging.warning(
+                        "Некорректные данные в групповом ответе для %s: %s",
+                        location_key,
+                        error,
+                    )
+                    continue
+                result[location_key] = (
+                    ResponseDTO(
+                        url=response.url,
+                        status=response.status,
+                        data=item,
+                        size=len(serialization.dumps(item)),
+                    ),
+                    None,
+                )
+
+        return result
+
+    async def _fetch_group(
+        self, city_ids: list[int], semaphore: asyncio.Semaphore
+    ) -> Optional[ResponseDTO]:
+        """
+        Выполнение одного группового запроса.
+        При ошибке данные для городов группы запрашиваются по одному,
+        поэтому неудача фиксируется только в журнале.
+
+        :param city_ids: Идентификаторы городов
+        :param semaphore: Семафор, ограничивающий количество одновременных запросов
+        :return: Ответ или None, если данные получить не удалось
+        """
+
+        async with semaphore:
+            await self.limiter.acquire()
+
+            # pylint: disable=broad-except
+            try:
+                with span(f"fetch.{type(self).__name__}"):
+                    response = await self.client.get_weather_group(city_ids)
+            except Exception as exc:
+                error = repr(exc)
+            else:
+                if isinstance(response.data, dict):
+                    return response
+                error = f"HTTP {response.status}"
+
+        logging.warning(
+            "Не удалось получить погоду для группы из %s городов: %s",
+            len(city_ids),
+            error,
+        )
+
+        return None
 
     @classmethod
     async def read(cls, location: LocationDTO) -> Optional[WeatherInfoDTO]:
@@ -207,42 +763,220 @@ class WeatherCollector(BaseCollector):
         Чтение данных из кэша.
 
         :param location:
-        :return:
+        :return: Данные о погоде или None, если они еще не собраны
         """
 
-        filename = f"{location.capital}_{location.alpha2code}".lower()
-        async with aiofiles.open(await cls.get_file_path(filename), mode="r") as file:
-            content = await file.read()
+        storage = await cls.get_storage()
+
+        return await storage.read(cls.get_key(location), cls._parse)
 
-        result = json.loads(content)
+    @staticmethod
+    def _parse(content: bytes) -> Optional[WeatherInfoDTO]:
+        """
+        Разбор содержимого файла кэша.
+
+        :param content: Содержимое файла
+        :return:
+        """
+
+        result = serialization.loads(content)
         if result:
-            return WeatherInfoDTO(
-                temp=result["main"]["temp"],
+            with span("dto.build.weather"):
+                return WeatherCollector._build(result, trusted=CACHE_TRUSTED)
+
+        return None
+
+    @staticmethod
+    def _build(result: Any, trusted: bool = False) -> WeatherInfoDTO:
+        """
+        Построение модели данных о погоде.
+
+        :param result: Данные о погоде в формате ответа внешнего сервиса
+        :param trusted: Данные уже проверены при сохранении в хранилище,
+            модель создается без валидации
+        :return:
+        """
+
+        if trusted:
+            return WeatherInfoDTO.construct(
+                temp=float(result["main"]["temp"]),
                 pressure=result["main"]["pressure"],
                 humidity=result["main"]["humidity"],
                 visibility=result["visibility"],
-                wind_speed=result["wind"]["speed"],
+                wind_speed=float(result["wind"]["speed"]),
                 description=result["weather"][0]["description"],
                 offset_seconds=result["timezone"],
             )
 
-        return None
+        return WeatherInfoDTO(
+            temp=result["main"]["temp"],
+            pressure=result["main"]["pressure"],
+            humidity=result["main"]["humidity"],
+            visibility=result["visibility"],
+            wind_speed=result["wind"]["speed"],
+            description=result["weather"][0]["description"],
+            offset_seconds=result["timezone"],
+        )
 
 
 class Collectors:
     @staticmethod
-    async def gather() -> tuple:
+    async def run_collector(collector: BaseCollector, **kwargs: Any) -> Any:
+        """
+        Запуск сборщика с отметкой этапа для профилирования.
+
+        :param collector: Сборщик
+        :param kwargs: Параметры сбора
+        :return: Результат сбора
+        """
+
+        with span(f"collect.{type(collector).__name__}"):
+            return await collector.collect(**kwargs)
+
+    @staticmethod
+    async def gather(manifest: Optional[Manifest] = None) -> tuple:
         return await asyncio.gather(
-            CurrencyRatesCollector().collect(),
-            CountryCollector().collect(),
+            Collectors.run_collector(CurrencyRatesCollector(manifest)),
+            Collectors.run_collector(CountryCollector(manifest)),
+        )
+
+    @staticmethod
+    async def cycle(manifest: Manifest) -> FrozenSet[LocationDTO]:
+        """
+        Один цикл сбора: обновляются только устаревшие данные.
+        Сведения о полученных ресурсах сохраняются в манифест по завершении цикла,
+        а метрики HTTP-запросов выгружаются в LOGGING_PATH.
+
+        :param manifest: Манифест сбора данных
+        :return: Локации для сбора данных о погоде
+        """
+
+        try:
+            results = await Collectors.gather(manifest)
+            locations = results[1] or frozenset()
+            await Collectors.run_collector(
+                WeatherCollector(manifest), locations=locations
+            )
+        finally:
+            await manifest.save()
+            await registry.export()
+
+        return locations
+
+    @staticmethod
+    async def run() -> None:
+        """
+        Запуск всех сборщиков в рамках одной общей HTTP-сессии.
+        Сведения о полученных ресурсах сохраняются в манифест один раз по завершении.
+
+        :return:
+        """
+
+        # pylint: disable=import-outside-toplevel
+        from clients.base import BaseClient
+
+        manifest = await Manifest.load(MANIFEST_PATH)
+        try:
+            await Collectors.cycle(manifest)
+        finally:
+            # соединения из общего пула закрываются только после завершения всех сборщиков
+            await BaseClient.close_session()
+
+    @staticmethod
+    async def get_next_run(
+        manifest: Manifest, locations: Iterable[LocationDTO]
+    ) -> float:
+        """
+        Получение времени, когда истечет срок актуальности первого из собранных ресурсов
+        (или наступит время повторной попытки после ошибки).
+
+        :param manifest: Манифест сбора данных
+        :param locations: Локации для сбора данных о погоде
+        :return: Время (Unix time), для неизвестных манифесту ресурсов – текущее время
+        """
+
+        weather_ttl = await WeatherCollector.get_cache_ttl()
+        country_ttl = await CountryCollector.get_cache_ttl()
+        resources = (
+            [
+                (await CountryCollector.get_resource(bloc), country_ttl)
+                for bloc in COUNTRY_BLOCS
+            ]
+            + [
+                (
+                    await CurrencyRatesCollector.get_resource(),
+                    await CurrencyRatesCollector.get_cache_ttl(),
+                ),
+            ]
+            + [
+                (
+                    await WeatherCollector.get_resource(
+                        WeatherCollector.get_key(location)
+                    ),
+                    weather_ttl,
+                )
+                for location in locations
+            ]
         )
 
+        now = time.time()
+        return min(
+            (
+                now if expires_at is None else expires_at
+                for expires_at in (
+                    manifest.expires_at(resource, ttl) for resource, ttl in resources
+                )
+            ),
+            default=now,
+        )
+
+    @staticmethod
+    async def serve() -> None:
+        """
+        Запуск сборщиков в режиме службы.
+        После каждого цикла сбора выполнение приостанавливается до истечения срока
+        актуальности первого из ресурсов (но не меньше чем на COLLECT_MIN_INTERVAL).
+        HTTP-сессия, манифест и прочитанные данные хранятся в памяти между циклами.
+
+        Ошибка в цикле сбора (например, при записи кэша) не останавливает службу:
+        цикл повторяется через COLLECT_MIN_INTERVAL.
+
+        :return:
+        """
+
+        # pylint: disable=import-outside-toplevel,broad-except
+        from clients.base import BaseClient
+
+        manifest = await Manifest.load(MANIFEST_PATH)
+        try:
+            while True:
+                try:
+                    locations = await Collectors.cycle(manifest)
+                    delay = max(
+                        await Collectors.get_next_run(manifest, locations)
+                        - time.time(),
+                        COLLECT_MIN_INTERVAL,
+                    )
+                except Exception:
+                    logging.exception("Ошибка в цикле сбора данных")
+                    delay = COLLECT_MIN_INTERVAL
+                logging.info("Следующее обновление через %.0f с.", delay)
+                await asyncio.sleep(delay)
+        finally:
+            await BaseClient.close_session()
+
     @staticmethod
-    def collect() -> None:
+    def collect(daemon: bool = False) -> None:
+        """
+        Запуск сборщиков.
+
+        :param daemon: Запуск в режиме службы (см. :meth:`serve`)
+        :return:
+        """
+
         loop = asyncio.get_event_loop()
         try:
-            results = loop.run_until_complete(Collectors.gather())
-            loop.run_until_complete(WeatherCollector().collect(results[1]))
+            loop.run_until_complete(Collectors.serve() if daemon else Collectors.run())
             loop.run_until_complete(loop.shutdown_asyncgens())
 
         finally:
@@ -0,0 +1,162 @@
+"""
+Данные о странах в кэше.
+
+* :class:`CountryStore` – разобранные данные с доступом к стране по коду;
+* :func:`merge_blocs` – объединение данных о странах нескольких регионов;
+* :func:`build_countries` – построение моделей данных о странах.
+"""
+
+from typing import Any, Iterable, Optional
+
+from collectors.models import CountryDTO, CurrencyInfoDTO, LanguagesInfoDTO
+
+
+class CountryStore:
+    """
+    Данные о странах из кэша с доступом к стране по коду ISO 3166-1 alpha-2.
+
+    Порядок стран в списке ``countries`` соответствует позициям в поисковом индексе
+    (см. :class:`search.SearchIndex`).
+    """
+
+    def __init__(self, countries: list[CountryDTO]) -> None:
+        """
+        Конструктор.
+
+        :param countries: Данные о странах
+        """
+
+        self.countries = countries
+        self.codes = {country.alpha2code: country for country in countries}
+
+    def get(self, alpha2code: str) -> Optional[CountryDTO]:
+        """
+        Получение данных о стране по коду.
+
+        :param alpha2code: Код страны
+        :return:
+        """
+
+        return self.codes.get(alpha2code.upper())
+
+
+def normalize(data: Any) -> dict[str, Any]:
+    """
+    Приведение содержимого кэша к виду "код страны -> данные о стране".
+    Кэш в прежнем формате (список стран одного региона) читается без списка регионов.
+
+    :param data: Содержимое кэша
+    :return:
+    """
+
+    if not data:
+        return {}
+    if isinstance(data, list):
+        return {item["alpha2code"]: item for item in data}
+
+    return data
+
+
+def merge_blocs(
+    store: dict[str, Any],
+    fetched: dict[str, list[dict[str, Any]]],
+    blocs: Iterable[str],
+) -> dict[str, Any]:
+    """
+    Объединение полученных данных о странах регионов с сохраненными.
+    Страна, входящая в несколько регионов, сохраняется один раз.
+
+    :param store: Сохраненные данные (код страны -> данные о стране)
+    :param fetched: Регион -> полученные данные о странах региона
+        (сохраненные данные остальных регионов остаются без изменений)
+    :param blocs: Отслеживаемые регионы (страны остальных регионов удаляются)
+    :return: Код страны -> данные о стране со списком регионов в поле ``blocs``
+    """
+
+    known = set(blocs)
+
+    # у сохраненных стран остаются только регионы, данные которых не обновлялись
+    result: dict[str, Any] = {}
+    for code, item in store.items():
+        if kept := [
+            bloc
+            for bloc in item.get("blocs") or []
+            if bloc in known and bloc not in fetched
+        ]:
+            result[code] = {**item, "blocs": kept}
+
+    for bloc, items in fetched.items():
+        for item in items:
+            code = item["alpha2code"]
+            kept = result[code]["blocs"] if code in result else []
+            result[code] = {
+                **item,
+                "blocs": kept if bloc in kept else [*kept, bloc],
+            }
+
+    return result
+
+
+def build_countries(items: Iterable[Any], trusted: bool = False) -> list[CountryDTO]:
+    """
+    Построение моделей данных о странах.
+
+    :param items: Данные о странах в формате ответа внешнего сервиса
+    :param trusted: Данные уже проверены при сохранении в кэш,
+        модели создаются без валидации, а одинаковые модели валют и языков
+        используются всеми странами совместно
+    :return:
+    """
+
+    if trusted:
+        return [
+            CountryDTO.construct(
+                capital=item["capital"],
+                capital_latitude=float(item["latitude"]),
+                capital_longitude=float(item["longitude"]),
+                alpha2code=item["alpha2code"],
+                alt_spellings=item["alt_spellings"],
+                currencies={
+                    CurrencyInfoDTO.intern(code=currency["code"])
+                    for currency in item["currencies"]
+                },
+                flag=item["flag"],
+                languages={
+                    LanguagesInfoDTO.intern(
+                        name=language["name"],
+                        native_name=language["native_name"],
+                    )
+                    for language in item["languages"]
+                },
+                name=item["name"],
+                area=None if item["area"] is None else float(item["area"]),
+                population=item["population"],
+                subregion=item["subregion"],
+                timezones=item["timezones"],
+                blocs=item.get("blocs", []),
+            )
+            for item in items
+        ]
+
+    return [
+        CountryDTO(
+            capital=item["capital"],
+            capital_latitude=item["latitude"],
+            capital_longitude=item["longitude"],
+            alpha2code=item["alpha2code"],
+            alt_spellings=item["alt_spellings"],
+            currencies={
+                CurrencyInfoDTO(code=currency["code"])
+                for currency in item["currencies"]
+            },
+            flag=item["flag"],
+            languages=item["languages"],
+            name=item["name"],
+            area=item["area"],
+            population=item["population"],
+            subregion=item["subregion"],
+            timezones=item["timezones"],
+            blocs=item.get("blocs", []),
+        )
+        for item in items
+    ]
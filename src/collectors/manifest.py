@@ -0,0 +1,283 @@
+"""
+Манифест сбора данных: сведения о получении каждого ресурса в одном файле.
+
+Манифест позволяет за одно чтение файла определить, какие ресурсы нужно обновить,
+не обращаясь к файловой системе для каждого файла кэша.
+Также в нем фиксируются неудачные попытки получения данных, чтобы повторные запросы
+к недоступному сервису выполнялись с увеличивающейся задержкой.
+
+Манифест может использоваться несколькими процессами (сборщиком в режиме службы
+и сервисом поиска с обращением к внешнему сервису): при сохранении в файл
+записываются только изменения, сделанные в этом процессе, а остальные сведения
+берутся из файла.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import TYPE_CHECKING, Optional
+
+import aiofiles
+import aiofiles.os
+
+from collectors import serialization
+from collectors.models import ManifestEntryDTO
+from settings import FETCH_RETRY_BACKOFF, FETCH_RETRY_BACKOFF_MAX
+
+if TYPE_CHECKING:
+    from clients.models import ResponseDTO
+
+
+class Manifest:
+    """
+    Манифест сбора данных.
+    """
+
+    def __init__(
+        self, path: str, entries: Optional[dict[str, ManifestEntryDTO]] = None
+    ) -> None:
+        """
+        Конструктор.
+
+        :param path: Путь к файлу манифеста
+        :param entries: Ресурс -> сведения о получении
+        """
+
+        self.path = path
+        self.entries = entries or {}
+        # ресурсы, сведения о которых изменены после последнего сохранения
+        self._changed: set[str] = set()
+        # время изменения файла при последнем чтении (None – файл не читался)
+        self._mtime_ns: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def load(cls, path: str) -> Manifest:
+        """
+        Чтение манифеста.
+        Если файла еще нет или он поврежден, то создается пустой манифест.
+
+        :param path: Путь к файлу манифеста
+        :return:
+        """
+
+        manifest = cls(path)
+        await manifest.reload()
+
+        return manifest
+
+    @staticmethod
+    async def _read(path: str) -> tuple[Optional[int], dict[str, ManifestEntryDTO]]:
+        """
+        Чтение файла манифеста.
+
+        :param path: Путь к файлу манифеста
+        :return: Время изменения файла (None, если файла нет) и сведения о ресурсах
+        """
+
+        try:
+            mtime_ns = (await aiofiles.os.stat(path)).st_mtime_ns
+            async with aiofiles.open(path, mode="rb") as file:
+                content = await file.read()
+        except FileNotFoundError:
+            return None, {}
+
+        try:
+            return mtime_ns, {
+                resource: ManifestEntryDTO(**entry)
+                for resource, entry in serialization.loads(content).items()
+            }
+        except (ValueError, TypeError):
+            return mtime_ns, {}
+
+    async def reload(self, force: bool = False) -> None:
+        """
+        Перечитывание файла манифеста, если он изменился (например, другим процессом).
+        Несохраненные изменения этого процесса остаются в силе.
+
+        :param force: Перечитать файл, даже если время его изменения не изменилось
+        :return:
+        """
+
+        if not force and self._mtime_ns is not None:
+            try:
+                if (await aiofiles.os.stat(self.path)).st_mtime_ns == self._mtime_ns:
+                    return
+            except FileNotFoundError:
+                pass
+
+        mtime_ns, entries = await self._read(self.path)
+        for resource in self._changed:
+            if resource in self.entries:
+                entries[resource] = self.entries[resource]
+            else:
+                entries.pop(resource, None)
+        self.entries = entries
+        self._mtime_ns = mtime_ns
+
+    async def save(self) -> None:
+        """
+        Сохранение манифеста.
+        Изменения этого процесса записываются поверх текущего содержимого файла,
+        поэтому сведения, сохраненные другими процессами, не теряются.
+        Файл заменяется целиком, чтобы читатели не получили его частично записанным.
+
+        :return:
+        """
+
+        async with self._lock:
+            await self.reload(force=True)
+            self._changed.clear()
+            content = serialization.dumps(
+                {
+                    resource: entry.dict(exclude_defaults=True)
+                    for resource, entry in self.entries.items()
+                }
+            )
+            # у каждого процесса свой временный файл
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            async with aiofiles.open(tmp_path, mode="wb") as file:
+                await file.write(content)
+            await aiofiles.os.replace(tmp_path, self.path)
+            self._mtime_ns = (await aiofiles.os.stat(self.path)).st_mtime_ns
+
+    def get(self, resource: str) -> Optional[ManifestEntryDTO]:
+        return self.entries.get(resource)
+
+    @staticmethod
+    def retry_at(entry: ManifestEntryDTO) -> Optional[float]:
+        """
+        Получение времени, раньше которого не следует повторять неудачный запрос.
+        Задержка удваивается после каждой неудачи подряд.
+
+        :param entry: Сведения о получении ресурса
+        :return:
+        """
+
+        if not entry.failures or entry.failed_at is None:
+            return None
+
+        backoff = min(
+            FETCH_RETRY_BACKOFF * 2 ** (entry.failures - 1), FETCH_RETRY_BACKOFF_MAX
+        )
+
+        return entry.failed_at + backoff
+
+    def expires_at(self, resource: str, ttl: int) -> Optional[float]:
+        """
+        Получение времени, когда ресурс нужно обновить.
+
+        :param resource: Ресурс
+        :param ttl: Время актуальности данных (в секундах)
+        :return: Время (Unix time) или None, если о ресурсе ничего не известно
+        """
+
+        if not (entry := self.get(resource)):
+            return None
+
+        if (retry_at := self.retry_at(entry)) is not None:
+            return retry_at
+
+        if entry.fetched_at is None:
+            return None
+
+        return entry.fetched_at + ttl
+
+    def stale(
+        self, resource: str, ttl: int, now: Optional[float] = None
+    ) -> Optional[bool]:
+        """
+        Проверка необходимости обновления ресурса.
+
+        :param resource: Ресурс
+        :param ttl: Время актуальности данных (в секундах)
+        :param now: Текущее время
+        :return: None, если о ресурсе ничего не известно
+        """
+
+        if (expires_at := self.expires_at(resource, ttl)) is None:
+            return None
+
+        return (time.time() if now is None else now) >= expires_at
+
+    def record_success(
+        self, resource: str, response: ResponseDTO, city_id: Optional[int] = None
+    ) -> None:
+        """
+        Фиксация успешного получения ресурса (в том числе ответа 304 Not Modified).
+
+        :param resource: Ресурс
+        :param response: Ответ внешнего сервиса
+        :param city_id: Идентификатор города у провайдера данных о погоде
+            (если не задан, то сохраняется ранее полученный)
+        :return:
+        """
+
+        size = response.size
+        entry = self.entries.get(resource)
+        if response.not_modified and entry:
+            # содержимое не передавалось, поэтому сохраняется размер ранее полученных данных
+            size = entry.size or 0
+        if city_id is None and entry:
+            city_id = entry.city_id
+
+        self._changed.add(resource)
+        self.entries[resource] = ManifestEntryDTO(
+            fetched_at=time.time(),
+            size=size,
+            url=response.url,
+            etag=response.etag,
+            last_modified=response.last_modified,
+            city_id=city_id,
+        )
+
+    @staticmethod
+    def validators(entry: ManifestEntryDTO) -> dict[str, str]:
+        """
+        Получение валидаторов для условного запроса.
+
+        :param entry: Сведения о получении ресурса
+        :return: Аргументы запроса клиента (etag, last_modified)
+        """
+
+        return {
+            key: value
+            for key, value in (
+                ("etag", entry.etag),
+                ("last_modified", entry.last_modified),
+            )
+            if value
+        }
+
+    def remove(self, resource: str) -> None:
+        """
+        Удаление сведений о ресурсе, который больше не собирается.
+
+        :param resource: Ресурс
+        :return:
+        """
+
+        if self.entries.pop(resource, None) is not None:
+            self._changed.add(resource)
+
+    def record_failure(self, resource: str, error: str) -> None:
+        """
+        Фиксация неудачной попытки получения ресурса.
+        Сведения о последнем успешном получении сохраняются.
+
+        :param resource: Ресурс
+        :param error: Описание ошибки
+        :return:
+        """
+
+        entry = self.entries.get(resource) or ManifestEntryDTO()
+        self._changed.add(resource)
+        self.entries[resource] = entry.copy(
+            update={
+                "failed_at": time.time(),
+                "failures": entry.failures + 1,
+                "error": error,
+            }
+        )
@@ -1,18 +1,75 @@
 """
 Описание моделей данных (DTO).
 """
-from typing import Optional
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Optional, TypeVar
 
-from pydantic import Field, BaseModel
+from pydantic import Field, BaseModel, PrivateAttr
+
+THashable = TypeVar("THashable", bound="HashableBaseModel")
+
+# максимальное количество общих экземпляров моделей (редко используемые вытесняются)
+INTERN_CACHE_SIZE = 4096
 
 
 class HashableBaseModel(BaseModel):
     """
     Добавление хэшируемости для моделей.
+
+    Модели неизменяемы, поэтому хэш вычисляется один раз при первом обращении,
+    а одинаковые экземпляры можно использовать совместно (см. :meth:`intern`).
     """
 
+    _hash: Optional[int] = PrivateAttr(default=None)
+
+    class Config:
+        frozen = True
+
     def __hash__(self) -> int:
-        return hash((type(self),) + tuple(self.__dict__.values()))
+        if self._hash is None:
+            self._hash = hash((type(self),) + tuple(self.__dict__.values()))
+
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+
+        return hash(self) == hash(other) and self.__dict__ == other.__dict__
+
+    def _copy_and_set_values(self: THashable, *args: Any, **kwargs: Any) -> THashable:
+        # копия может отличаться значениями полей, поэтому хэш вычисляется заново
+        copy = super()._copy_and_set_values(*args, **kwargs)
+        copy._hash = None
+
+        return copy
+
+    @classmethod
+    def intern(cls: type[THashable], **values: Any) -> THashable:
+        """
+        Получение общего экземпляра модели с указанными значениями полей.
+        Экземпляр создается (с валидацией) только при первом обращении,
+        например, одна модель ``CurrencyInfoDTO(code="EUR")`` для всех стран еврозоны.
+
+        :param values: Значения полей
+        :return:
+        """
+
+        return _intern(cls, tuple(values.items()))  # type: ignore[return-value]
+
+
+@lru_cache(maxsize=INTERN_CACHE_SIZE)
+def _intern(cls: type[HashableBaseModel], values: tuple) -> HashableBaseModel:
+    """
+    Создание общего экземпляра модели (результаты хранятся в ограниченном кэше).
+
+    :param cls: Класс модели
+    :param values: Пары (имя поля, значение)
+    :return:
+    """
+
+    return cls(**dict(values))
 
 
 class LocationDTO(HashableBaseModel):
@@ -24,11 +81,16 @@ class LocationDTO(HashableBaseModel):
         LocationDTO(
             capital="Mariehamn",
             alpha2code="AX",
+            latitude=60.116667,
+            longitude=19.9,
         )
     """
 
     capital: str
     alpha2code: str = Field(min_length=2, max_length=2)  # country alpha‑2 code
+    # координаты столицы (если заданы, то погода запрашивается по ним)
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 
 class CurrencyInfoDTO(HashableBaseModel):
@@ -94,6 +156,9 @@ class CountryDTO(BaseModel):
             timezones=[
                 "UTC+02:00",
             ],
+            blocs=[
+                "eu",
+            ],
         )
     """
 
@@ -110,6 +175,8 @@ class CountryDTO(BaseModel):
     area: Optional[float]
     subregion: str
     timezones: list[str]
+    # регионы (regional blocs), в которые входит страна
+    blocs: list[str] = []
 
 
 class CurrencyRatesDTO(BaseModel):
@@ -199,11 +266,86 @@ class LocationInfoDTO(BaseModel):
                 description="scattered clouds",
             ),
             currency_rates={
-                "EUR": 0.016503,
+                "EUR": 60.59,
             },
+            currency="RUB",
         )
     """
 
     location: CountryDTO
     weather: WeatherInfoDTO
+    # стоимость единицы каждой валюты страны в валюте currency
     currency_rates: dict[str, float]
+    currency: str = "RUB"
+
+
+class CollectStatus(str, Enum):
+    """
+    Результат актуализации данных для локации.
+    """
+
+    #: данные получены от внешнего сервиса и сохранены
+    FETCHED = "fetched"
+    #: данные не изменились (304 Not Modified), срок их актуальности продлен
+    NOT_MODIFIED = "not_modified"
+    #: данные в кэше актуальны, запрос не выполнялся
+    CACHED = "cached"
+    #: данные получить не удалось
+    FAILED = "failed"
+
+
+class CollectResultDTO(BaseModel):
+    """
+    Модель результата актуализации данных для локации.
+
+    .. code-block::
+
+        CollectResultDTO(
+            location=LocationDTO(
+                capital="Mariehamn",
+                alpha2code="AX",
+            ),
+            status=CollectStatus.FAILED,
+            error="Пустой ответ",
+        )
+    """
+
+    location: LocationDTO
+    status: CollectStatus
+    error: Optional[str] = None
+
+
+class ManifestEntryDTO(BaseModel):
+    """
+    Модель сведений о получении ресурса (записи манифеста сбора данных).
+
+    .. code-block::
+
+        ManifestEntryDTO(
+            fetched_at=1663113600.0,
+            size=87,
+            url="https://api.apilayer.com/fixer/latest?base=rub",
+            etag='"5f3b1c"',
+            last_modified="Wed, 14 Sep 2022 00:00:00 GMT",
+            failed_at=None,
+            failures=0,
+            error=None,
+            city_id=None,
+        )
+    """
+
+    # время последнего успешного получения данных (Unix time)
+    fetched_at: Optional[float] = None
+    # размер полученных данных (в байтах)
+    size: Optional[int] = None
+    # адрес ресурса (без ключей доступа)
+    url: Optional[str] = None
+    # валидаторы для условных запросов
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # время последней неудачной попытки и количество неудач подряд
+    failed_at: Optional[float] = None
+    failures: int = 0
+    error: Optional[str] = None
+    # идентификатор города у провайдера данных о погоде (для групповых запросов)
+    city_id: Optional[int] = None
@@ -0,0 +1,135 @@
+"""
+Сериализация данных кэша в JSON.
+
+Если установлен пакет ``orjson``, то используется он, иначе – стандартный модуль ``json``.
+Данные сериализуются в байты (UTF-8) и разбираются из байтов или строк,
+поэтому файлы кэша читаются и записываются без промежуточного декодирования.
+Библиотеку можно выбрать явно настройкой JSON_BACKEND.
+"""
+
+import json
+from typing import Any, Protocol, Union
+
+from profiling import span
+from settings import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+
+class Backend(Protocol):
+    """
+    Интерфейс библиотеки сериализации.
+    """
+
+    name: str
+
+    @staticmethod
+    def loads(content: Union[bytes, str]) -> Any:
+        """
+        Разбор JSON.
+
+        :param content: Содержимое в виде байтов (UTF-8) или строки
+        :return:
+        """
+
+    @staticmethod
+    def dumps(data: Any) -> bytes:
+        """
+        Сериализация в JSON.
+
+        :param data: Данные
+        :return: Содержимое в кодировке UTF-8
+        """
+
+
+class JSONBackend:
+    """
+    Сериализация стандартным модулем ``json``.
+    """
+
+    name = "json"
+
+    @staticmethod
+    def loads(content: Union[bytes, str]) -> Any:
+        return json.loads(content)
+
+    @staticmethod
+    def dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False).encode()
+
+
+class OrjsonBackend:
+    """
+    Сериализация библиотекой ``orjson``.
+    """
+
+    name = "orjson"
+
+    @staticmethod
+    def loads(content: Union[bytes, str]) -> Any:
+        return orjson.loads(content)
+
+    @staticmethod
+    def dumps(data: Any) -> bytes:
+        return orjson.dumps(data)
+
+
+def get_backends() -> dict[str, Backend]:
+    """
+    Получение доступных библиотек сериализации.
+
+    :return: Название -> класс
+    """
+
+    backends: dict[str, Backend] = {JSONBackend.name: JSONBackend}
+    if orjson is not None:
+        backends[OrjsonBackend.name] = OrjsonBackend
+
+    return backends
+
+
+def get_backend(name: str = JSON_BACKEND) -> Backend:
+    """
+    Получение библиотеки сериализации.
+
+    :param name: Название (auto – самая быстрая из доступных)
+    :return:
+    """
+
+    backends = get_backends()
+    if name == "auto":
+        return backends.get(OrjsonBackend.name, JSONBackend)
+    if name not in backends:
+        raise ValueError(f"Библиотека сериализации {name} недоступна")
+
+    return backends[name]
+
+
+# используемая библиотека сериализации
+backend = get_backend()
+
+
+def loads(content: Union[bytes, str]) -> Any:
+    """
+    Разбор JSON.
+
+    :param content: Содержимое в виде байтов (UTF-8) или строки
+    :return:
+    """
+
+    with span("json.parse"):
+        return backend.loads(content)
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Сериализация в JSON.
+
+    :param data: Данные
+    :return: Содержимое в кодировке UTF-8
+    """
+
+    return backend.dumps(data)
@@ -0,0 +1,258 @@
+"""
+Хранилища собранных данных о погоде.
+
+* :class:`FileWeatherStorage` – отдельный JSON-файл для каждой локации;
+* :class:`SQLiteWeatherStorage` – одна база данных SQLite со временем получения
+  данных для каждой локации: проверка актуальности выполняется одним запросом,
+  а результаты сбора сохраняются в одной транзакции.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Iterable, Optional, TypeVar
+
+import aiofiles
+import aiofiles.os
+
+from collectors.base import BaseCollector
+from profiling import span
+
+T = TypeVar("T")
+
+
+class BaseWeatherStorage(ABC):
+    """
+    Базовый класс, реализующий интерфейс для хранилищ данных о погоде.
+    Данные хранятся в виде JSON (в кодировке UTF-8) с ключом локации (например, ``mariehamn_ax``).
+    """
+
+    @abstractmethod
+    async def stale(self, keys: Iterable[str], ttl: int) -> set[str]:
+        """
+        Получение ключей, данные для которых отсутствуют или устарели.
+
+        :param keys: Ключи локаций
+        :param ttl: Время актуальности данных (в секундах)
+        :return:
+        """
+
+    @abstractmethod
+    async def save(self, items: dict[str, bytes]) -> None:
+        """
+        Сохранение данных.
+
+        :param items: Ключ локации -> содержимое (JSON в кодировке UTF-8)
+        :return:
+        """
+
+    @abstractmethod
+    async def read(self, key: str, parse: Callable[[bytes], T]) -> Optional[T]:
+        """
+        Чтение данных для локации.
+
+        :param key: Ключ локации
+        :param parse: Функция разбора содержимого
+        :return: Результат разбора или None, если данных нет
+        """
+
+
+class FileWeatherStorage(BaseWeatherStorage):
+    """
+    Хранение данных о погоде в отдельных файлах.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Конструктор.
+
+        :param directory: Директория для файлов
+        """
+
+        self.directory = directory
+
+    def get_file_path(self, key: str) -> str:
+        return f"{self.directory}/{key}.json"
+
+    async def _stale(self, key: str, ttl: int, now: float) -> bool:
+        try:
+            stat = await aiofiles.os.stat(self.get_file_path(key))
+        except FileNotFoundError:
+            return True
+
+        return not stat.st_size or now - stat.st_mtime > ttl
+
+    async def stale(self, keys: Iterable[str], ttl: int) -> set[str]:
+        keys = list(keys)
+        now = time.time()
+        results = await asyncio.gather(*(self._stale(key, ttl, now) for key in keys))
+
+        return {key for key, result in zip(keys, results) if result}
+
+    async def _write(self, key: str, content: bytes) -> None:
+        async with aiofiles.open(self.get_file_path(key), mode="wb") as file:
+            await file.write(content)
+
+    async def save(self, items: dict[str, bytes]) -> None:
+        # если целевой директории еще не существует, то она создается
+        if not await aiofiles.os.path.exists(self.directory):
+            await aiofiles.os.mkdir(self.directory)
+
+        await asyncio.gather(
+            *(self._write(key, content) for key, content in items.items())
+        )
+
+    async def read(self, key: str, parse: Callable[[bytes], T]) -> Optional[T]:
+        try:
+            return await BaseCollector.read_cache.load(
+                self.get_file_path(key), parse, binary=True
+            )
+        except FileNotFoundError:
+            return None
+
+
+class SQLiteWeatherStorage(BaseWeatherStorage):
+    """
+    Хранение данных о погоде в одной базе данных SQLite.
+
+    Журнал WAL не используется, так как он не поддерживается сетевыми файловыми системами.
+    Операции с базой данных выполняются в отдельном потоке.
+
+    База данных и таблица создаются при первом сохранении данных, а чтение
+    из отсутствующей базы данных возвращает пустой результат (файл не создается).
+    Для чтения используется одно подключение на экземпляр хранилища, а прочитанные
+    данные кэшируются в памяти до следующего изменения файла базы данных.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS weather ("
+        "key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, content BLOB NOT NULL)"
+    )
+
+    def __init__(self, path: str) -> None:
+        """
+        Конструктор.
+
+        :param path: Путь к файлу базы данных
+        """
+
+        self.path = path
+        # подключение для чтения (создается при первом чтении существующей базы данных)
+        self._reader: Optional[sqlite3.Connection] = None
+        # подключение используется из разных потоков, но не одновременно
+        self._lock = threading.Lock()
+
+    def _connect_write(self) -> sqlite3.Connection:
+        """
+        Подключение к базе данных для записи.
+        База данных и таблица создаются, если их еще нет.
+
+        :return:
+        """
+
+        connection = sqlite3.connect(self.path)
+        connection.execute(self.schema)
+
+        return connection
+
+    def _connect_read(self) -> Optional[sqlite3.Connection]:
+        """
+        Получение подключения к базе данных для чтения.
+        Вызывается при захваченной блокировке ``_lock``.
+
+        :return: Подключение или None, если базы данных еще нет
+        """
+
+        if not os.path.isfile(self.path):
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+            return None
+
+        if self._reader is None:
+            self._reader = sqlite3.connect(
+                f"{Path(self.path).resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+            )
+
+        return self._reader
+
+    def _fetched_at(self, keys: list[str]) -> dict[str, float]:
+        with self._lock:
+            if (connection := self._connect_read()) is None:
+                return {}
+
+            return dict(
+                connection.execute(
+                    "SELECT key, fetched_at FROM weather WHERE key IN "
+                    f"({', '.join('?' for _ in keys)})",
+                    keys,
+                )
+            )
+
+    async def stale(self, keys: Iterable[str], ttl: int) -> set[str]:
+        keys = list(keys)
+        if not keys:
+            return set()
+
+        fetched_at = await asyncio.to_thread(self._fetched_at, keys)
+        now = time.time()
+
+        return {
+            key for key in keys if key not in fetched_at or now - fetched_at[key] > ttl
+        }
+
+    def _save(self, items: dict[str, bytes]) -> None:
+        connection = self._connect_write()
+        try:
+            # все данные одного запуска сбора сохраняются в одной транзакции
+            with connection:
+                now = time.time()
+                connection.executemany(
+                    "INSERT OR REPLACE INTO weather (key, fetched_at, content) "
+                    "VALUES (?, ?, ?)",
+                    ((key, now, content) for key, content in items.items()),
+                )
+        finally:
+            connection.close()
+
+    async def save(self, items: dict[str, bytes]) -> None:
+        if items:
+            await asyncio.to_thread(self._save, items)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if (connection := self._connect_read()) is None:
+                return None
+
+            row = connection.execute(
+                "SELECT content FROM weather WHERE key = ?", (key,)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    async def read(self, key: str, parse: Callable[[bytes], T]) -> Optional[T]:
+        try:
+            stat = await aiofiles.os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        # любая запись изменяет файл базы данных (журнал WAL не используется),
+        # поэтому разобранные данные актуальны, пока файл не изменился
+        version = (stat.st_mtime_ns, stat.st_size)
+        cache_key = f"{self.path}#{key}"
+        found, result = BaseCollector.read_cache.get(cache_key, version)
+        if found:
+            return result
+
+        with span("cache.read"):
+            content = await asyncio.to_thread(self._read, key)
+        result = parse(content) if content is not None else None
+        BaseCollector.read_cache.put(cache_key, version, result)
+
+        return result
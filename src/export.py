@@ -0,0 +1,283 @@
+"""
+Выгрузка всех собранных данных о странах с погодой и курсами валют в файл.
+
+Данные читаются и записываются порциями, поэтому объем используемой памяти
+не зависит от количества стран. Поддерживаемые форматы:
+
+* ``jsonl`` – JSON Lines, по одному объекту в строке (как в пакетном режиме main.py);
+* ``csv`` – CSV с заголовком, списки значений объединяются через точку с запятой;
+* ``xlsx`` – книга Excel (openpyxl в режиме только для записи).
+
+Пример запуска:
+
+.. code-block:: console
+
+    python export.py --format csv --output countries.csv
+    python export.py --format jsonl --currency EUR > countries.jsonl
+"""
+import csv
+import io
+import json
+import logging
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+import aiofiles
+import asyncclick as click
+
+from collectors.models import LocationInfoDTO
+from logging_setup import setup_logging
+from profiling import profile
+from reader import Reader
+from renderer import Renderer
+
+
+class BaseExportWriter(ABC):
+    """
+    Запись выгружаемых данных в файл.
+    Каждая порция данных форматируется (``format``) и записывается (``dump``).
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Конструктор.
+
+        :param path: Путь к файлу (``-`` – стандартный вывод)
+        """
+
+        self.path = path
+        self.count = 0
+        self._file: Any = None
+
+    async def open(self) -> None:
+        """
+        Открытие файла для записи.
+
+        :return:
+        """
+
+        if self.path != "-":
+            self._file = await aiofiles.open(
+                self.path, mode="w", encoding="utf-8", newline=""
+            )
+
+    async def write(self, items: list[LocationInfoDTO]) -> None:
+        """
+        Запись порции данных.
+
+        :param items: Данные о странах
+        :return:
+        """
+
+        await self.dump(await self.format(items))
+        self.count += len(items)
+
+    @abstractmethod
+    async def format(self, items: list[LocationInfoDTO]) -> Any:
+        """
+        Форматирование порции данных.
+
+        :param items: Данные о странах
+        :return: Данные для записи
+        """
+
+    async def dump(self, content: Any) -> None:
+        """
+        Запись отформатированной порции данных.
+
+        :param content: Данные для записи
+        :return:
+        """
+
+        if self._file is None:
+            sys.stdout.write(content)
+            sys.stdout.flush()
+        else:
+            await self._file.write(content)
+
+    async def close(self) -> None:
+        """
+        Завершение записи и закрытие файла.
+
+        :return:
+        """
+
+        if self._file is not None:
+            await self._file.close()
+
+
+class JSONLinesWriter(BaseExportWriter):
+    """
+    Запись данных в формате JSON Lines.
+    """
+
+    async def format(self, items: list[LocationInfoDTO]) -> str:
+        return "".join(
+            [
+                json.dumps(await Renderer(item).serialize(), ensure_ascii=False) + "\n"
+                for item in items
+            ]
+        )
+
+
+class CSVWriter(BaseExportWriter):
+    """
+    Запись данных в формате CSV (заголовок записывается перед первой строкой).
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._header_written = False
+
+    async def format(self, items: list[LocationInfoDTO]) -> str:
+        buffer = io.StringIO()
+        rows = [Renderer(item).row() for item in items]
+        if rows:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+            if not self._header_written:
+                writer.writeheader()
+                self._header_written = True
+            writer.writerows(rows)
+
+        return buffer.getvalue()
+
+
+class XLSXWriter(BaseExportWriter):
+    """
+    Запись данных в книгу Excel.
+    Книга создается в режиме только для записи: строки сразу сохраняются
+    во временный файл openpyxl и не хранятся в памяти.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._workbook: Any = None
+        self._sheet: Any = None
+        self._header_written = False
+
+    async def open(self) -> None:
+        if self.path == "-":
+            raise click.UsageError("Формат xlsx нельзя выводить в стандартный вывод")
+
+        try:
+            # pylint: disable=import-outside-toplevel
+            from openpyxl import Workbook
+        except ImportError as exc:
+            raise click.ClickException(
+                "Для выгрузки в формате xlsx необходима библиотека openpyxl"
+            ) from exc
+
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("countries")
+
+    async def format(self, items: list[LocationInfoDTO]) -> list[list[Any]]:
+        rows = [Renderer(item).row() for item in items]
+        result = [list(row.values()) for row in rows]
+        if rows and not self._header_written:
+            result.insert(0, list(rows[0]))
+            self._header_written = True
+
+        return result
+
+    async def dump(self, content: list[list[Any]]) -> None:
+        for row in content:
+            self._sheet.append(row)
+
+    async def close(self) -> None:
+        if self._workbook is not None:
+            self._workbook.save(self.path)
+
+
+# форматы выгрузки: имя -> класс для записи
+WRITERS: dict[str, type[BaseExportWriter]] = {
+    "jsonl": JSONLinesWriter,
+    "csv": CSVWriter,
+    "xlsx": XLSXWriter,
+}
+
+
+async def export(path: str, output_format: str, currency: Optional[str] = None) -> int:
+    """
+    Выгрузка данных обо всех странах, для которых собраны данные о погоде.
+
+    :param path: Путь к файлу (``-`` – стандартный вывод)
+    :param output_format: Формат выгрузки (jsonl, csv или xlsx)
+    :param currency: Валюта для курсов валют
+    :return: Количество выгруженных стран
+    """
+
+    writer = WRITERS[output_format](path)
+    # выгружаются только собранные данные, без запросов к внешним сервисам
+    reader = Reader(read_through=False)
+    await writer.open()
+    try:
+        async for items in reader.iter_all(currency):
+            await writer.write(items)
+    finally:
+        try:
+            await writer.close()
+        finally:
+            await reader.close()
+
+    return writer.count
+
+
+@click.command()
+@click.option(
+    "--format",
+    "-f",
+    "output_format",
+    type=click.Choice(list(WRITERS)),
+    default="jsonl",
+    show_default=True,
+    help="Формат выгрузки",
+)
+@click.option(
+    "--output",
+    "-o",
+    "path",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default="-",
+    show_default=True,
+    help="Файл для выгрузки (- для стандартного вывода)",
+)
+@click.option(
+    "--currency",
+    "-c",
+    "currency",
+    type=str,
+    help="Валюта для курсов валют (по умолчанию – базовая валюта собранных курсов)",
+)
+@click.option(
+    "--profile",
+    "-p",
+    "profile_path",
+    type=click.Path(dir_okay=False),
+    help="Путь для сохранения результатов профилирования (без расширения)",
+)
+async def process_export(
+    output_format: str,
+    path: str,
+    currency: Optional[str],
+    profile_path: Optional[str],
+) -> None:
+    """
+    Выгрузка информации обо всех странах, погоде и курсах валют.
+
+    :param str output_format: Формат выгрузки (jsonl, csv или xlsx)
+    :param str path: Файл для выгрузки
+    :param currency: Валюта для курсов валют
+    :param profile_path: Путь для сохранения результатов профилирования
+    """
+
+    setup_logging()
+    with profile(profile_path, "export"):
+        count = await export(path, output_format, currency)
+
+    logging.info("Выгружено стран: %s", count)
+
+
+if __name__ == "__main__":
+    # pylint: disable=E1120
+    process_export(_anyio_backend="asyncio")
@@ -0,0 +1,240 @@
+"""
+Пространственный индекс столиц для поиска ближайшей столицы и столиц в радиусе.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+from typing import Iterable, Iterator, Optional
+
+from profiling import span
+
+# средний радиус Земли (в километрах)
+EARTH_RADIUS_KM = 6371.0088
+
+Point = tuple[float, float, float]
+# поддерево: диапазон узлов [lo, hi) и глубина
+Subtree = tuple[int, int, int]
+
+
+def to_point(latitude: float, longitude: float) -> Point:
+    """
+    Преобразование географических координат в точку на единичной сфере.
+
+    :param latitude: Широта (в градусах)
+    :param longitude: Долгота (в градусах)
+    :return: Декартовы координаты
+    """
+
+    phi, lam = math.radians(latitude), math.radians(longitude)
+
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def chord_to_km(chord: float) -> float:
+    """
+    Преобразование длины хорды единичной сферы в расстояние по поверхности Земли.
+
+    :param chord: Длина хорды
+    :return: Расстояние (в километрах)
+    """
+
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(distance: float) -> float:
+    """
+    Преобразование расстояния по поверхности Земли в длину хорды единичной сферы.
+
+    :param distance: Расстояние (в километрах)
+    :return: Длина хорды
+    """
+
+    return 2 * math.sin(min(math.pi, distance / EARTH_RADIUS_KM) / 2)
+
+
+class GeoIndex:
+    """
+    K-d дерево по точкам столиц на единичной сфере.
+
+    Расстояние между точками на сфере (длина хорды) монотонно зависит от расстояния
+    по поверхности Земли, поэтому дерево с евклидовой метрикой находит те же столицы,
+    что и перебор с формулой гаверсинусов, но проверяет только ветви, которые могут
+    содержать подходящие точки.
+
+    Дерево хранится неявно: узел диапазона ``[lo, hi)`` находится в его середине,
+    а левое и правое поддеревья – в диапазонах слева и справа от него.
+    """
+
+    def __init__(self, positions: list[int], points: list[Point]) -> None:
+        """
+        Конструктор.
+
+        :param positions: Позиции стран в кэше (в порядке узлов дерева)
+        :param points: Точки столиц (в порядке узлов дерева)
+        """
+
+        self.positions = positions
+        self.points = points
+
+    @classmethod
+    def build(cls, coordinates: Iterable[tuple[float, float]]) -> GeoIndex:
+        """
+        Построение индекса.
+
+        :param coordinates: Широта и долгота столицы каждой страны (в порядке кэша)
+        :return:
+        """
+
+        items = [
+            (position, to_point(latitude, longitude))
+            for position, (latitude, longitude) in enumerate(coordinates)
+        ]
+        cls._place(items, 0, len(items), 0)
+
+        return cls([position for position, _ in items], [point for _, point in items])
+
+    @staticmethod
+    def _place(items: list[tuple[int, Point]], lo: int, hi: int, depth: int) -> None:
+        """
+        Упорядочивание точек диапазона в порядке узлов дерева.
+
+        :param items: Позиции стран в кэше и точки столиц
+        :param lo: Начало диапазона
+        :param hi: Конец диапазона (не включается)
+        :param depth: Глубина поддерева
+        :return:
+        """
+
+        if hi - lo <= 1:
+            return
+        axis = depth % 3
+        items[lo:hi] = sorted(items[lo:hi], key=lambda item: item[1][axis])
+        middle = (lo + hi) // 2
+        GeoIndex._place(items, lo, middle, depth + 1)
+        GeoIndex._place(items, middle + 1, hi, depth + 1)
+
+    def nearest(self, latitude: float, longitude: float) -> Optional[tuple[int, float]]:
+        """
+        Поиск ближайшей столицы.
+        Из равноудаленных столиц выбирается столица страны, которая раньше в кэше.
+
+        :param latitude: Широта (в градусах)
+        :param longitude: Долгота (в градусах)
+        :return: Позиция страны в кэше и расстояние до столицы (в километрах)
+        """
+
+        with span("geo.match"):
+            return next(self.iter_nearest(latitude, longitude), None)
+
+    def iter_nearest(
+        self, latitude: float, longitude: float
+    ) -> Iterator[tuple[int, float]]:
+        """
+        Перебор столиц в порядке возрастания расстояния.
+        Ветви дерева проверяются по мере необходимости, поэтому получение нескольких
+        ближайших столиц не требует обхода всего дерева.
+        Из равноудаленных столиц раньше выбирается столица страны, которая раньше в кэше.
+
+        :param latitude: Широта (в градусах)
+        :param longitude: Долгота (в градусах)
+        :return: Позиции стран в кэше и расстояния до столиц (в километрах)
+        """
+
+        target = to_point(latitude, longitude)
+        counter = itertools.count()
+        # (нижняя граница квадрата расстояния, 0 – ветвь дерева, номер, поддерево)
+        # или (квадрат расстояния, 1 – столица, позиция страны, узел);
+        # при равных расстояниях ветви раскрываются раньше столиц
+        heap: list[tuple[float, int, int, Subtree]] = [
+            (0.0, 0, next(counter), (0, len(self.points), 0))
+        ]
+        while heap:
+            distance2, kind, number, subtree = heapq.heappop(heap)
+            if kind:
+                yield number, chord_to_km(math.sqrt(distance2))
+                continue
+            if subtree[0] >= subtree[1]:
+                continue
+            middle, node2, diff, near, far = self._visit(target, subtree)
+            heapq.heappush(heap, (node2, 1, self.positions[middle], subtree))
+            heapq.heappush(heap, (distance2, 0, next(counter), near))
+            heapq.heappush(heap, (max(distance2, diff * diff), 0, next(counter), far))
+
+    def within(
+        self, latitude: float, longitude: float, radius: float
+    ) -> list[tuple[int, float]]:
+        """
+        Поиск столиц в радиусе.
+
+        :param latitude: Широта (в градусах)
+        :param longitude: Долгота (в градусах)
+        :param radius: Радиус (в километрах)
+        :return: Позиции стран в кэше и расстояния до столиц (в километрах)
+            в порядке возрастания расстояния
+        """
+
+        with span("geo.match"):
+            target = to_point(latitude, longitude)
+            limit = km_to_chord(radius) ** 2
+            found = []
+            stack: list[Subtree] = [(0, len(self.points), 0)]
+            while stack:
+                subtree = stack.pop()
+                if subtree[0] >= subtree[1]:
+                    continue
+                middle, distance2, diff, near, far = self._visit(target, subtree)
+                if distance2 <= limit:
+                    found.append((distance2, self.positions[middle]))
+
+                # дальняя ветвь проверяется, только если может содержать точки в радиусе
+                stack.append(near)
+                if diff * diff <= limit:
+                    stack.append(far)
+
+            found.sort()
+
+        return [
+            (position, chord_to_km(math.sqrt(distance2)))
+            for distance2, position in found
+        ]
+
+    def _visit(
+        self, target: Point, subtree: Subtree
+    ) -> tuple[int, float, float, Subtree, Subtree]:
+        """
+        Проверка корня непустого поддерева.
+
+        :param target: Искомая точка
+        :param subtree: Поддерево
+        :return: Номер узла, квадрат расстояния до его точки, разность координат
+            по оси узла, ближняя и дальняя к искомой точке ветви
+        """
+
+        lo, hi, depth = subtree
+        middle = (lo + hi) // 2
+        point = self.points[middle]
+        axis = depth % 3
+        diff = target[axis] - point[axis]
+        left, right = (lo, middle, depth + 1), (middle + 1, hi, depth + 1)
+        near, far = (left, right) if diff < 0 else (right, left)
+
+        return middle, self._distance2(target, point), diff, near, far
+
+    @staticmethod
+    def _distance2(first: Point, second: Point) -> float:
+        """
+        Квадрат расстояния между точками.
+
+        :param first: Первая точка
+        :param second: Вторая точка
+        :return:
+        """
+
+        return (
+            (first[0] - second[0]) ** 2
+            + (first[1] - second[1]) ** 2
+            + (first[2] - second[2]) ** 2
+        )
@@ -1,13 +1,119 @@
 """
 Функции для логирования.
+
+Для каждого HTTP-запроса клиентов фиксируются время разрешения имени (DNS),
+ожидания соединения в пуле, установки нового соединения, получения первого байта ответа
+и полное время запроса, а также статус и размер ответа (см. :mod:`metrics`).
 """
 import logging
+import time
 from types import SimpleNamespace
+from typing import Optional
 
 import aiohttp
-from aiohttp import ClientSession, TraceRequestStartParams
+from aiohttp import (
+    ClientSession,
+    TraceConnectionCreateEndParams,
+    TraceConnectionCreateStartParams,
+    TraceConnectionQueuedEndParams,
+    TraceConnectionQueuedStartParams,
+    TraceConnectionReuseconnParams,
+    TraceDnsResolveHostEndParams,
+    TraceDnsResolveHostStartParams,
+    TraceRequestEndParams,
+    TraceRequestExceptionParams,
+    TraceRequestStartParams,
+    TraceResponseChunkReceivedParams,
+)
+from yarl import URL
+
+from metrics import SIZE_BUCKETS, registry
+
+requests_total = registry.counter(
+    "http_client_requests_total", "Количество HTTP-запросов по статусам ответа"
+)
+connections_total = registry.counter(
+    "http_client_connections_total",
+    "Количество HTTP-запросов по способу получения соединения (reused – из пула)",
+)
+dns_seconds = registry.histogram(
+    "http_client_dns_seconds", "Время разрешения имени хоста (без кэша DNS)"
+)
+queue_seconds = registry.histogram(
+    "http_client_queue_seconds", "Время ожидания свободного соединения в пуле"
+)
+connect_seconds = registry.histogram(
+    "http_client_connect_seconds",
+    "Время установки нового соединения (включая DNS и TLS)",
+)
+ttfb_seconds = registry.histogram(
+    "http_client_ttfb_seconds", "Время до получения заголовков ответа"
+)
+request_seconds = registry.histogram(
+    "http_client_request_seconds", "Полное время запроса (до получения тела ответа)"
+)
+response_bytes = registry.histogram(
+    "http_client_response_bytes", "Размер тела ответа (после распаковки)", SIZE_BUCKETS
+)
+
+
+def _labels(context: SimpleNamespace, url: URL) -> dict[str, str]:
+    """
+    Получение меток запроса: клиент и адрес без параметров (и ключей доступа).
+
+    :param context: Контекст запроса
+    :param url: URL запроса
+    :return:
+    """
+
+    client = (context.trace_request_ctx or {}).get("client", "unknown")
+
+    return {"client": client, "endpoint": f"{url.host}{url.path}"}
+
+
+def _finish(
+    context: SimpleNamespace,
+    url: URL,
+    status: str,
+    size: Optional[int] = None,
+) -> None:
+    """
+    Фиксация результатов запроса в метриках.
+
+    :param context: Контекст запроса
+    :param url: URL запроса
+    :param status: Статус ответа или ``error``
+    :param size: Размер тела ответа
+    :return:
+    """
+
+    if getattr(context, "finished", True):
+        return
+    context.finished = True
+
+    labels = _labels(context, url)
+    total = time.perf_counter() - context.start
+    requests_total.inc({**labels, "status": status})
+    request_seconds.observe(total, labels)
+    for name, histogram in (
+        ("dns", dns_seconds),
+        ("queue", queue_seconds),
+        ("connect", connect_seconds),
+        ("ttfb", ttfb_seconds),
+    ):
+        if name in context.timings:
+            histogram.observe(context.timings[name], labels)
+    if size is not None:
+        response_bytes.observe(size, labels)
 
-from settings import LOGGING_LEVEL
+    logging.getLogger("aiohttp.client").debug(
+        "Request <%s> %s: %s, total %.3f s, %s bytes",
+        labels["endpoint"],
+        status,
+        ", ".join(f"{name} {value:.3f} s" for name, value in context.timings.items()),
+        total,
+        size,
+    )
 
 
 async def on_request_start(
@@ -24,7 +130,150 @@ async def on_request_start(
     # pylint: disable=unused-argument
     logging.getLogger("aiohttp.client").debug("Starting request <%s>", params)
 
+    context.start = time.perf_counter()
+    context.timings = {}
+    context.finished = False
+    context.url = params.url
+    # контекст передается клиенту, чтобы зафиксировать ошибку чтения тела ответа
+    if isinstance(context.trace_request_ctx, dict):
+        context.trace_request_ctx["trace"] = context
+
+
+async def on_connection_queued_start(
+    session: ClientSession,
+    context: SimpleNamespace,
+    params: TraceConnectionQueuedStartParams,
+) -> None:
+    # pylint: disable=unused-argument
+    context.queue_start = time.perf_counter()
+
+
+async def on_connection_queued_end(
+    session: ClientSession,
+    context: SimpleNamespace,
+    params: TraceConnectionQueuedEndParams,
+) -> None:
+    # pylint: disable=unused-argument
+    context.timings["queue"] = time.perf_counter() - context.queue_start
+
+
+async def on_dns_resolvehost_start(
+    session: ClientSession,
+    context: SimpleNamespace,
+    params: TraceDnsResolveHostStartParams,
+) -> None:
+    # pylint: disable=unused-argument
+    context.dns_start = time.perf_counter()
+
+
+async def on_dns_resolvehost_end(
+    session: ClientSession,
+    context: SimpleNamespace,
+    params: TraceDnsResolveHostEndParams,
+) -> None:
+    # pylint: disable=unused-argument
+    context.timings["dns"] = time.perf_counter() - context.dns_start
+
+
+async def on_connection_create_start(
+    session: ClientSession,
+    context: SimpleNamespace,
+    params: TraceConnectionCreateStartParams,
+) -> None:
+    # pylint: disable=unused-argument
+    context.connect_start = time.perf_counter()
+
+
+async def on_connection_create_end(
+    session: ClientSession,
+    context: SimpleNamespace,
+    params: TraceConnectionCreateEndParams,
+) -> None:
+    # pylint: disable=unused-argument
+    context.timings["connect"] = time.perf_counter() - context.connect_start
+    context.reused = False
+
+
+async def on_connection_reuseconn(
+    session: ClientSession,
+    context: SimpleNamespace,
+    params: TraceConnectionReuseconnParams,
+) -> None:
+    # pylint: disable=unused-argument
+    context.reused = True
+
+
+async def on_request_end(
+    session: ClientSession, context: SimpleNamespace, params: TraceRequestEndParams
+) -> None:
+    """
+    Действия при получении заголовков ответа.
+
+    :param ClientSession session: Сессия для HTTP-запроса
+    :param SimpleNamespace context: Контекст запроса
+    :param TraceRequestEndParams params: Параметры запроса и ответ
+    :return:
+    """
+    # pylint: disable=unused-argument
+    context.timings["ttfb"] = time.perf_counter() - context.start
+    context.status = str(params.response.status)
+    if (reused := getattr(context, "reused", None)) is not None:
+        connections_total.inc(
+            {**_labels(context, params.url), "reused": str(reused).lower()}
+        )
+
+
+async def on_response_chunk_received(
+    session: ClientSession,
+    context: SimpleNamespace,
+    params: TraceResponseChunkReceivedParams,
+) -> None:
+    """
+    Действия при получении тела ответа (тело читается целиком одним фрагментом).
+
+    :param ClientSession session: Сессия для HTTP-запроса
+    :param SimpleNamespace context: Контекст запроса
+    :param TraceResponseChunkReceivedParams params: Параметры запроса и тело ответа
+    :return:
+    """
+    # pylint: disable=unused-argument
+    _finish(
+        context, params.url, getattr(context, "status", "unknown"), len(params.chunk)
+    )
+
+
+async def on_request_exception(
+    session: ClientSession,
+    context: SimpleNamespace,
+    params: TraceRequestExceptionParams,
+) -> None:
+    # pylint: disable=unused-argument
+    _finish(context, params.url, "error")
+
+
+def record_error(trace_request_ctx: dict) -> None:
+    """
+    Фиксация ошибки запроса, произошедшей после получения заголовков ответа
+    (например, превышения времени чтения тела), о которой aiohttp не сообщает.
+    Если результат запроса уже зафиксирован, то метрики не изменяются.
+
+    :param trace_request_ctx: Контекст, переданный в запрос (``trace_request_ctx``)
+    :return:
+    """
+
+    if (context := trace_request_ctx.get("trace")) is not None:
+        _finish(context, context.url, "error")
+
 
-logging.basicConfig(level=LOGGING_LEVEL)
 trace_config = aiohttp.TraceConfig()
 trace_config.on_request_start.append(on_request_start)
+trace_config.on_connection_queued_start.append(on_connection_queued_start)
+trace_config.on_connection_queued_end.append(on_connection_queued_end)
+trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+trace_config.on_connection_create_start.append(on_connection_create_start)
+trace_config.on_connection_create_end.append(on_connection_create_end)
+trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+trace_config.on_request_end.append(on_request_end)
+trace_config.on_response_chunk_received.append(on_response_chunk_received)
+trace_config.on_request_exception.append(on_request_exception)
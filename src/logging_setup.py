@@ -0,0 +1,21 @@
+"""
+Настройка логирования для точек входа приложения.
+
+Модуль не загружает сетевые библиотеки, поэтому вызывается в начале любой
+точки входа, в том числе на пути поиска (main.py).
+"""
+
+import logging
+
+from settings import LOGGING_FORMAT, LOGGING_LEVEL
+
+
+def setup_logging() -> None:
+    """
+    Настройка корневого логгера: уровень LOGGING_LEVEL и формат LOGGING_FORMAT.
+
+    :return:
+    """
+
+    logging.basicConfig(level=LOGGING_LEVEL, format=LOGGING_FORMAT)
+    logging.getLogger().setLevel(LOGGING_LEVEL)
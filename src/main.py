@@ -2,10 +2,47 @@
 Запуск приложения.
 """
 
+import inspect
+import json
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Optional, TextIO
+
 import asyncclick as click
 
+from collectors.models import LocationInfoDTO
+from logging_setup import setup_logging
+from profiling import profile, trace_memory
 from reader import Reader
 from renderer import Renderer
+from settings import BATCH_SIZE
+
+
+@dataclass
+class InputOptions:
+    """
+    Параметры поиска из командной строки.
+
+    :param location: Страна и/или город
+    :param batch: Файл со строками для поиска
+    :param output_format: Формат вывода (text или jsonl)
+    :param latitude: Широта точки для поиска по координатам
+    :param longitude: Долгота точки для поиска по координатам
+    :param radius: Радиус поиска столиц (в километрах)
+    :param currency: Валюта для курсов валют
+    :param profile_path: Путь для сохранения результатов профилирования
+    :param memory_path: Путь для сохранения отчета об использовании памяти
+    """
+
+    location: Optional[str] = None
+    batch: Optional[TextIO] = None
+    output_format: str = "text"
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    radius: Optional[float] = None
+    currency: Optional[str] = None
+    profile_path: Optional[str] = None
+    memory_path: Optional[str] = None
 
 
 @click.command()
@@ -15,19 +52,222 @@ from renderer import Renderer
     "location",
     type=str,
     help="Страна и/или город",
-    prompt="Страна и/или город",
 )
-async def process_input(location: str) -> None:
+@click.option(
+    "--batch",
+    "-b",
+    "batch",
+    type=click.File("r", encoding="utf-8"),
+    help="Файл со строками для поиска, по одной в строке (- для стандартного ввода)",
+)
+@click.option(
+    "--format",
+    "-f",
+    "output_format",
+    type=click.Choice(["text", "jsonl"]),
+    default="text",
+    show_default=True,
+    help="Формат вывода",
+)
+@click.option(
+    "--latitude",
+    "--lat",
+    "latitude",
+    type=click.FloatRange(-90, 90),
+    help="Широта точки для поиска ближайшей столицы (вместе с --longitude)",
+)
+@click.option(
+    "--longitude",
+    "--lon",
+    "longitude",
+    type=click.FloatRange(-180, 180),
+    help="Долгота точки для поиска ближайшей столицы (вместе с --latitude)",
+)
+@click.option(
+    "--radius",
+    "-r",
+    "radius",
+    type=click.FloatRange(0, min_open=True),
+    help="Поиск всех столиц в радиусе от точки (в километрах) вместо ближайшей",
+)
+@click.option(
+    "--currency",
+    "-c",
+    "currency",
+    type=str,
+    help="Валюта для курсов валют (по умолчанию – базовая валюта собранных курсов)",
+)
+@click.option(
+    "--profile",
+    "-p",
+    "profile_path",
+    type=click.Path(dir_okay=False),
+    help="Путь для сохранения результатов профилирования (без расширения)",
+)
+@click.option(
+    "--memory",
+    "-m",
+    "memory_path",
+    type=click.Path(dir_okay=False),
+    help="Путь для сохранения отчета об использовании памяти (без расширения)",
+)
+async def process_input(**params: Any) -> None:
     """
     Поиск и вывод информации о стране, погоде и курсах валют.
 
-    :param str location: Страна и/или город
+    :param params: Параметры командной строки (см. :class:`InputOptions`)
+    """
+
+    setup_logging()
+    options = InputOptions(**params)
+    coordinates = None
+    if options.latitude is not None or options.longitude is not None:
+        if options.latitude is None or options.longitude is None:
+            raise click.UsageError("Широта и долгота указываются вместе")
+        coordinates = (options.latitude, options.longitude)
+    elif options.radius is not None:
+        raise click.UsageError("Для поиска в радиусе необходимо указать координаты")
+
+    location = options.location
+    if location is None and options.batch is None and coordinates is None:
+        location = await prompt_location()
+
+    # ожидание ввода не учитывается в результатах профилирования
+    with trace_memory(options.memory_path, "main"), profile(
+        options.profile_path, "main"
+    ):
+        if coordinates is not None:
+            await process_coordinates(
+                *coordinates, options.radius, options.output_format, options.currency
+            )
+        elif options.batch is not None:
+            await process_batch(options.batch, options.output_format, options.currency)
+        elif location is not None:
+            await process_location(location, options.output_format, options.currency)
+
+
+async def prompt_location() -> str:
     """
+    Запрос строки для поиска у пользователя.
 
-    location_info = await Reader().find(location)
-    if location_info:
+    :return:
+    """
+
+    prompt: Any = click.prompt("Страна и/или город", type=str)
+    # в новых версиях asyncclick запрос ввода выполняется асинхронно
+    if inspect.isawaitable(prompt):
+        prompt = await prompt
+
+    return str(prompt)
+
+
+async def process_location(
+    location: str, output_format: str, currency: Optional[str] = None
+) -> None:
+    """
+    Поиск и вывод информации для одной строки.
+
+    :param str location: Строка для поиска
+    :param str output_format: Формат вывода (text или jsonl)
+    :param currency: Валюта для курсов валют
+    """
+
+    reader = Reader()
+    try:
+        await output(location, await reader.find(location, currency), output_format)
+    finally:
+        await reader.close()
+
+
+async def process_coordinates(
+    latitude: float,
+    longitude: float,
+    radius: Optional[float],
+    output_format: str,
+    currency: Optional[str] = None,
+) -> None:
+    """
+    Поиск и вывод информации о ближайшей к точке столице
+    или обо всех столицах в радиусе от точки (в порядке возрастания расстояния).
+
+    :param float latitude: Широта
+    :param float longitude: Долгота
+    :param radius: Радиус поиска (в километрах)
+    :param str output_format: Формат вывода (text или jsonl)
+    :param currency: Валюта для курсов валют
+    """
+
+    query = f"{latitude}, {longitude}"
+    reader = Reader()
+    try:
+        if radius is None:
+            found = await reader.find_nearest(latitude, longitude, currency)
+            results = [found] if found else []
+        else:
+            results = await reader.find_within(latitude, longitude, radius, currency)
+
+        if not results:
+            await output(query, None, output_format)
+        for distance, location_info in results:
+            await output(query, location_info, output_format, distance)
+    finally:
+        await reader.close()
+
+
+async def process_batch(
+    batch: TextIO, output_format: str, currency: Optional[str] = None
+) -> None:
+    """
+    Потоковая обработка строк для поиска.
+    Строки читаются и обрабатываются порциями, результаты выводятся сразу после обработки порции.
+
+    :param batch: Файл со строками для поиска
+    :param str output_format: Формат вывода (text или jsonl)
+    :param currency: Валюта для курсов валют
+    """
+
+    reader = Reader()
+    lines = (line.strip() for line in batch)
+    try:
+        while chunk := list(islice(lines, BATCH_SIZE)):
+            queries = [line for line in chunk if line]
+            for query, location_info in zip(
+                queries, await reader.find_many(queries, currency)
+            ):
+                if output_format == "text":
+                    click.secho(f"Запрос: {query}", bold=True)
+                await output(query, location_info, output_format)
+    finally:
+        await reader.close()
+
+
+async def output(
+    query: str,
+    location_info: Optional[LocationInfoDTO],
+    output_format: str,
+    distance: Optional[float] = None,
+) -> None:
+    """
+    Вывод результата поиска.
+
+    :param str query: Строка для поиска
+    :param location_info: Найденные данные
+    :param str output_format: Формат вывода (text или jsonl)
+    :param distance: Расстояние до столицы при поиске по координатам (в километрах)
+    """
+
+    if output_format == "jsonl":
+        result = await Renderer(location_info).serialize() if location_info else None
+        item: dict[str, Any] = {"query": query, "result": result}
+        if distance is not None:
+            item["distance_km"] = round(distance, 1)
+        click.echo(json.dumps(item, ensure_ascii=False))
+    elif location_info:
         lines = await Renderer(location_info).render()
 
+        if distance is not None:
+            click.secho(f"Расстояние до столицы: {distance:.0f} км", bold=True)
+
         for line in lines:
             click.secho(line, fg="green")
     else:
@@ -0,0 +1,335 @@
+"""
+Метрики работы приложения (счетчики и гистограммы) и их выгрузка в файлы.
+
+Метрики накапливаются в памяти процесса и выгружаются в директорию LOGGING_PATH
+(в файлы с именем процесса, например ``metrics.collect.prom`` и ``metrics.server.prom``,
+чтобы процессы не перезаписывали метрики друг друга):
+
+* ``metrics.<процесс>.prom`` – в текстовом формате Prometheus (например, для textfile
+  collector из node_exporter), у каждой серии есть метка ``process``;
+* ``metrics.<процесс>.json`` – снимок в формате JSON для сравнения запусков.
+"""
+
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import aiofiles
+import aiofiles.os
+
+from settings import LOGGING_PATH
+
+# границы интервалов гистограмм времени (в секундах)
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# границы интервалов гистограмм размера (в байтах)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _key(labels: Optional[dict[str, str]]) -> Labels:
+    """
+    Получение ключа серии по меткам.
+
+    :param labels: Метки серии
+    :return:
+    """
+
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    """
+    Форматирование меток серии в текстовом формате Prometheus.
+
+    :param labels: Метки серии
+    :param extra: Дополнительные метки
+    :return:
+    """
+
+    items = [*labels, *extra]
+    if not items:
+        return ""
+
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in items) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
+class Counter:
+    """
+    Счетчик с метками.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str) -> None:
+        """
+        Конструктор.
+
+        :param name: Имя метрики
+        :param description: Описание метрики
+        """
+
+        self.name = name
+        self.description = description
+        self.series: dict[Labels, float] = {}
+
+    def inc(self, labels: Optional[dict[str, str]] = None, value: float = 1) -> None:
+        """
+        Увеличение значения счетчика.
+
+        :param labels: Метки серии
+        :param value: Величина увеличения
+        :return:
+        """
+
+        key = _key(labels)
+        self.series[key] = self.series.get(key, 0) + value
+
+    def prometheus(self, extra: Labels = ()) -> Iterable[str]:
+        for labels, value in self.series.items():
+            yield f"{self.name}{_format_labels(labels, extra)} {value}"
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {"labels": dict(labels), "value": value}
+            for labels, value in self.series.items()
+        ]
+
+
+class Histogram:
+    """
+    Гистограмма с метками: количество наблюдений в интервалах, их сумма и количество.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, description: str, buckets: Iterable[float] = TIME_BUCKETS
+    ) -> None:
+        """
+        Конструктор.
+
+        :param name: Имя метрики
+        :param description: Описание метрики
+        :param buckets: Верхние границы интервалов
+        """
+
+        self.name = name
+        self.description = description
+        self.buckets = (*sorted(buckets), math.inf)
+        # метки -> [количество в каждом интервале, сумма, количество]
+        self.series: dict[Labels, list[Any]] = {}
+
+    def observe(self, value: float, labels: Optional[dict[str, str]] = None) -> None:
+        """
+        Добавление наблюдения.
+
+        :param value: Значение
+        :param labels: Метки серии
+        :return:
+        """
+
+        key = _key(labels)
+        if (series := self.series.get(key)) is None:
+            series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][position] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def cumulative(self, labels: Labels) -> list[tuple[float, int]]:
+        """
+        Получение накопленного количества наблюдений для каждой границы интервала.
+
+        :param labels: Метки серии
+        :return:
+        """
+
+        counts, total = self.series[labels][0], 0
+        result = []
+        for bound, count in zip(self.buckets, counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def quantile(self, labels: Labels, q: float) -> Optional[float]:
+        """
+        Оценка квантиля по интервалам (верхняя граница интервала, в который он попадает).
+
+        :param labels: Метки серии
+        :param q: Квантиль (от 0 до 1)
+        :return: Оценка или None, если наблюдений нет
+        """
+
+        count = self.series[labels][2]
+        if not count:
+            return None
+
+        for bound, total in self.cumulative(labels):
+            if total >= q * count:
+                return None if math.isinf(bound) else bound
+
+        return None
+
+    def prometheus(self, extra: Labels = ()) -> Iterable[str]:
+        for labels, (_, total, count) in self.series.items():
+            for bound, value in self.cumulative(labels):
+                bucket = (*extra, ("le", _format_bound(bound)))
+                yield f"{self.name}_bucket{_format_labels(labels, bucket)} {value}"
+            yield f"{self.name}_sum{_format_labels(labels, extra)} {total}"
+            yield f"{self.name}_count{_format_labels(labels, extra)} {count}"
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "labels": dict(labels),
+                "count": count,
+                "sum": total,
+                "p50": self.quantile(labels, 0.5),
+                "p95": self.quantile(labels, 0.95),
+                "buckets": {
+                    _format_bound(bound): value
+                    for bound, value in self.cumulative(labels)
+                },
+            }
+            for labels, (_, total, count) in self.series.items()
+        ]
+
+
+class Registry:
+    """
+    Набор метрик процесса.
+    """
+
+    def __init__(self, process: Optional[str] = None) -> None:
+        """
+        Конструктор.
+
+        :param process: Имя процесса для меток и файлов выгрузки
+            (по умолчанию – имя запущенного скрипта, например ``collect``)
+        """
+
+        self.metrics: dict[str, Any] = {}
+        self.process = process or Path(sys.argv[0]).stem or "python"
+
+    def counter(self, name: str, description: str) -> Counter:
+        """
+        Регистрация счетчика.
+
+        :param name: Имя метрики
+        :param description: Описание метрики
+        :return:
+        """
+
+        return self.metrics.setdefault(name, Counter(name, description))
+
+    def histogram(
+        self, name: str, description: str, buckets: Iterable[float] = TIME_BUCKETS
+    ) -> Histogram:
+        """
+        Регистрация гистограммы.
+
+        :param name: Имя метрики
+        :param description: Описание метрики
+        :param buckets: Верхние границы интервалов
+        :return:
+        """
+
+        return self.metrics.setdefault(name, Histogram(name, description, buckets))
+
+    @property
+    def empty(self) -> bool:
+        return not any(metric.series for metric in self.metrics.values())
+
+    def clear(self) -> None:
+        """
+        Удаление накопленных значений (зарегистрированные метрики сохраняются).
+
+        :return:
+        """
+
+        for metric in self.metrics.values():
+            metric.series.clear()
+
+    def prometheus(self) -> str:
+        """
+        Получение значений метрик в текстовом формате Prometheus.
+
+        :return:
+        """
+
+        lines = []
+        for metric in self.metrics.values():
+            if not metric.series:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.prometheus((("process", self.process),)))
+
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Получение снимка значений метрик.
+
+        :return:
+        """
+
+        return {
+            "generated_at": time.time(),
+            "process": self.process,
+            "metrics": {
+                metric.name: {
+                    "type": metric.kind,
+                    "help": metric.description,
+                    "series": metric.snapshot(),
+                }
+                for metric in self.metrics.values()
+                if metric.series
+            },
+        }
+
+    async def export(self, path: Optional[str] = None) -> None:
+        """
+        Выгрузка метрик в файлы ``metrics.<процесс>.prom`` и ``metrics.<процесс>.json``.
+        Файлы заменяются атомарно (через временный файл процесса),
+        поэтому их можно читать во время выгрузки.
+        Если значений еще нет, то файлы не создаются.
+
+        :param path: Директория для файлов (по умолчанию – LOGGING_PATH)
+        :return:
+        """
+
+        if self.empty:
+            return
+
+        path = path or LOGGING_PATH
+        await aiofiles.os.makedirs(path, exist_ok=True)
+        for extension, content in (
+            ("prom", self.prometheus()),
+            ("json", json.dumps(self.snapshot(), indent=2)),
+        ):
+            file_path = os.path.join(path, f"metrics.{self.process}.{extension}")
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            async with aiofiles.open(tmp_path, mode="w", encoding="utf-8") as file:
+                await file.write(content)
+            await aiofiles.os.replace(tmp_path, file_path)
+
+
+# метрики процесса
+registry = Registry()
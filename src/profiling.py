@@ -0,0 +1,415 @@
+"""
+Профилирование точек входа: статистика cProfile, время выполнения этапов
+и использование памяти.
+
+Этапы отмечаются в коде приложения вызовом :func:`span`. Пока профилирование
+не запущено, отметки только проверяют флаги и ничего не измеряют.
+
+Результат профилирования (:func:`profile`) сохраняется в два файла:
+
+* ``<path>.pstats`` – статистика cProfile (например, для ``python -m pstats``);
+* ``<path>.json`` – время этапов и самые затратные функции в формате JSON
+  (ключи упорядочены, поэтому результаты разных версий удобно сравнивать).
+
+Отчет об использовании памяти (:func:`trace_memory`) сохраняется в ``<path>.memory.json``:
+пиковая и оставшаяся после выполнения память для каждого этапа (по данным tracemalloc),
+места с наибольшим объемом выделенной памяти и количество моделей данных каждого типа.
+
+Время этапов – астрономическое (wall-clock): для параллельно выполняемых задач
+(например, запросов сборщиков) суммарное время этапа может превышать общее время,
+а память, выделенная одной задачей, учитывается и в этапах других задач,
+выполняемых в это время.
+"""
+
+import cProfile
+import gc
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Iterator, Optional
+
+from pydantic import BaseModel
+
+# директория с исходным кодом приложения (пути к файлам в отчете указываются от нее)
+SRC_PATH = os.path.dirname(os.path.abspath(__file__))
+# директория стандартной библиотеки
+STDLIB_PATH = os.path.dirname(os.__file__)
+# количество функций и мест выделения памяти в отчете
+TOP_FUNCTIONS = 50
+TOP_ALLOCATIONS = 25
+
+# время этапов: имя этапа -> [количество, суммарное время, максимальное время]
+# (None – профилирование не запущено)
+_stages: Optional[dict[str, list[Any]]] = None
+# память этапов: имя этапа -> [количество, пиковая память, оставшаяся память]
+# (None – учет памяти не запущен)
+_memory: Optional[dict[str, list[int]]] = None
+# выполняемые этапы (первый элемент – вся команда)
+_frames: list["_Frame"] = []
+
+
+class _Frame:
+    """
+    Сведения о памяти выполняемого этапа.
+    """
+
+    __slots__ = ("start", "peak")
+
+    def __init__(self, start: int) -> None:
+        # объем памяти в начале этапа
+        self.start = start
+        # пиковый объем памяти во вложенных этапах
+        self.peak = 0
+
+
+class Span:
+    """
+    Замер времени выполнения этапа (контекстный менеджер).
+    """
+
+    __slots__ = ("name", "start", "frame")
+
+    def __init__(self, name: str) -> None:
+        """
+        Конструктор.
+
+        :param name: Имя этапа
+        """
+
+        self.name = name
+        self.start: Optional[float] = None
+        self.frame: Optional[_Frame] = None
+
+    def __enter__(self) -> "Span":
+        if _stages is not None:
+            self.start = time.perf_counter()
+        if _memory is not None:
+            self.frame = _enter_frame()
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if self.start is not None:
+            record(self.name, time.perf_counter() - self.start)
+        if self.frame is not None:
+            _exit_frame(self.name, self.frame)
+
+
+def span(name: str) -> Span:
+    """
+    Отметка этапа выполнения.
+
+    .. code-block:: python
+
+        with span("json.parse"):
+            data = loads(content)
+
+    :param name: Имя этапа
+    :return:
+    """
+
+    return Span(name)
+
+
+def record(name: str, seconds: float) -> None:
+    """
+    Фиксация времени выполнения этапа.
+
+    :param name: Имя этапа
+    :param seconds: Время (в секундах)
+    :return:
+    """
+
+    if _stages is None:
+        return
+
+    if (stage := _stages.get(name)) is None:
+        _stages[name] = [1, seconds, seconds]
+    else:
+        stage[0] += 1
+        stage[1] += seconds
+        stage[2] = max(stage[2], seconds)
+
+
+def _enter_frame() -> _Frame:
+    """
+    Начало учета памяти этапа.
+    Пиковое значение tracemalloc сбрасывается, поэтому пик, достигнутый до начала этапа,
+    сохраняется во внешнем этапе.
+
+    :return:
+    """
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    if _frames:
+        _frames[-1].peak = max(_frames[-1].peak, peak)
+    frame = _Frame(current)
+    _frames.append(frame)
+
+    return frame
+
+
+def _exit_frame(name: str, frame: _Frame) -> None:
+    """
+    Завершение учета памяти этапа.
+
+    :param name: Имя этапа
+    :param frame: Сведения о памяти этапа
+    :return:
+    """
+
+    current, peak = tracemalloc.get_traced_memory()
+    peak = max(peak, frame.peak)
+
+    # этапы параллельных задач могут завершаться не в порядке начала
+    position = next(i for i, item in enumerate(_frames) if item is frame)
+    del _frames[position]
+    if position:
+        _frames[position - 1].peak = max(_frames[position - 1].peak, peak)
+
+    if _memory is None:
+        return
+    if (stage := _memory.get(name)) is None:
+        stage = _memory[name] = [0, 0, 0]
+    stage[0] += 1
+    stage[1] = max(stage[1], peak - frame.start)
+    stage[2] += current - frame.start
+
+
+def _function_name(function: tuple[str, int, str]) -> str:
+    """
+    Получение имени функции для отчета.
+    Пути к файлам указываются относительно директорий приложения и библиотек,
+    чтобы отчеты с разных машин можно было сравнивать.
+
+    :param function: Файл, строка и имя функции
+    :return:
+    """
+
+    filename, line, name = function
+    if filename.startswith(SRC_PATH):
+        filename = os.path.relpath(filename, SRC_PATH)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    elif filename.startswith(STDLIB_PATH):
+        filename = os.path.join("<stdlib>", os.path.relpath(filename, STDLIB_PATH))
+
+    return f"{filename}:{line}({name})"
+
+
+def report(profiler: cProfile.Profile, command: str, elapsed: float) -> dict[str, Any]:
+    """
+    Формирование отчета о профилировании.
+
+    :param profiler: Профилировщик
+    :param command: Имя точки входа
+    :param elapsed: Общее время выполнения команды (в секундах)
+    :return:
+    """
+
+    # pylint: disable=no-member
+    items = pstats.Stats(profiler).stats.items()  # type: ignore[attr-defined]
+    functions = sorted(
+        (
+            (function, calls, total, cumulative)
+            for function, (_, calls, total, cumulative, _) in items
+        ),
+        key=lambda item: item[3],
+        reverse=True,
+    )[:TOP_FUNCTIONS]
+
+    return {
+        "command": command,
+        "python": sys.version.split()[0],
+        "elapsed_ms": elapsed * 1000,
+        "stages": {
+            name: {
+                "count": count,
+                "total_ms": total * 1000,
+                "max_ms": maximum * 1000,
+            }
+            for name, (count, total, maximum) in sorted((_stages or {}).items())
+        },
+        "functions": [
+            {
+                "function": _function_name(function),
+                "calls": calls,
+                "total_ms": total * 1000,
+                "cumulative_ms": cumulative * 1000,
+            }
+            for function, calls, total, cumulative in functions
+        ],
+    }
+
+
+@contextmanager
+def profile(path: Optional[str], command: str) -> Iterator[None]:
+    """
+    Профилирование выполнения команды.
+    Если путь не задан, то команда выполняется без профилирования.
+
+    :param path: Путь к файлам результата без расширения
+    :param command: Имя точки входа
+    :return:
+    """
+
+    # pylint: disable=global-statement
+    global _stages
+
+    if not path:
+        yield
+        return
+
+    _stages = {}
+    # импорт модулей и разбор аргументов до запуска команды (процессорное время)
+    record("imports", time.process_time())
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        try:
+            profiler.dump_stats(f"{path}.pstats")
+            Path(f"{path}.json").write_text(
+                json.dumps(
+                    report(profiler, command, elapsed),
+                    indent=2,
+                    sort_keys=True,
+                )
+            )
+        finally:
+            _stages = None
+
+
+def _site_name(frame: tracemalloc.Frame) -> str:
+    """
+    Получение места выделения памяти для отчета.
+
+    :param frame: Кадр стека
+    :return:
+    """
+
+    return _function_name((frame.filename, frame.lineno, "")).removesuffix("()")
+
+
+def count_models() -> dict[str, dict[str, int]]:
+    """
+    Подсчет существующих в памяти моделей данных каждого типа.
+    Размер – собственный размер объектов и их словарей атрибутов (без значений полей).
+
+    :return: Имя типа модели -> количество и размер (в байтах)
+    """
+
+    counts: Counter[str] = Counter()
+    sizes: Counter[str] = Counter()
+    for item in gc.get_objects():
+        if isinstance(item, BaseModel):
+            name = type(item).__name__
+            counts[name] += 1
+            sizes[name] += sys.getsizeof(item) + sys.getsizeof(item.__dict__)
+
+    return {
+        name: {"count": count, "size_bytes": sizes[name]}
+        for name, count in sorted(counts.items())
+    }
+
+
+def memory_report(snapshot: tracemalloc.Snapshot, command: str) -> dict[str, Any]:
+    """
+    Формирование отчета об использовании памяти.
+
+    :param snapshot: Снимок выделенной памяти по завершении команды
+    :param command: Имя точки входа
+    :return:
+    """
+
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+    )
+
+    return {
+        "command": command,
+        "python": sys.version.split()[0],
+        "peak_bytes": max(peak, _frames[0].peak if _frames else 0),
+        "retained_bytes": current - (_frames[0].start if _frames else 0),
+        "stages": {
+            name: {"count": count, "peak_bytes": peak, "retained_bytes": retained}
+            for name, (count, peak, retained) in sorted((_memory or {}).items())
+        },
+        "allocations": [
+            {
+                "site": _site_name(statistic.traceback[0]),
+                "size_bytes": statistic.size,
+                "count": statistic.count,
+            }
+            for statistic in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+        ],
+        "models": count_models(),
+    }
+
+
+@contextmanager
+def trace_memory(path: Optional[str], command: str) -> Iterator[None]:
+    """
+    Учет использования памяти при выполнении команды.
+    Если путь не задан, то команда выполняется без учета памяти.
+
+    Учитывается только память, выделенная после запуска команды
+    (без импорта модулей). Учет памяти замедляет выполнение в несколько раз,
+    поэтому время этапов при одновременном профилировании неточно.
+
+    :param path: Путь к файлу результата без расширения
+    :param command: Имя точки входа
+    :return:
+    """
+
+    # pylint: disable=global-statement
+    global _memory
+
+    if not path:
+        yield
+        return
+
+    started = tracemalloc.is_tracing()
+    if not started:
+        tracemalloc.start()
+    _memory = {}
+    _frames.append(_Frame(tracemalloc.get_traced_memory()[0]))
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        try:
+            Path(f"{path}.memory.json").write_text(
+                json.dumps(
+                    memory_report(tracemalloc.take_snapshot(), command),
+                    indent=2,
+                    sort_keys=True,
+                )
+            )
+        finally:
+            _memory = None
+            _frames.clear()
+            if not started:
+                tracemalloc.stop()
@@ -0,0 +1,236 @@
+"""
+Матрица кросс-курсов для всех пар валют из кэша курсов валют.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from typing import Optional
+
+import aiofiles
+import aiofiles.os
+
+from collectors.base import BaseCollector
+from collectors.models import CurrencyRatesDTO
+from settings import MEDIA_PATH
+
+# признак и версия формата файла матрицы
+MAGIC = b"CRM1"
+# заголовок: признак, количество валют, время изменения и размер файла кэша,
+# длина списка кодов валют
+HEADER = struct.Struct("<4sIqqI")
+
+
+class RateMatrix:
+    """
+    Плотная матрица кросс-курсов.
+
+    Значение в строке ``base`` и столбце ``quote`` – стоимость одной единицы
+    валюты ``base`` в валюте ``quote``. Матрица хранится в одном массиве ``array("d")``
+    построчно, поэтому курс для любой пары валют получается по индексу без вычислений.
+    """
+
+    def __init__(
+        self,
+        base: str,
+        codes: list[str],
+        values: array,
+        source: Optional[dict[str, int]] = None,
+    ) -> None:
+        """
+        Конструктор.
+
+        :param base: Базовая валюта, относительно которой получены курсы
+        :param codes: Коды валют (порядок строк и столбцов матрицы)
+        :param values: Значения матрицы (построчно)
+        :param source: Сведения о файле кэша, из которого построена матрица
+        """
+
+        self.base = base
+        self.codes = codes
+        self.values = values
+        self.source = source or {}
+        self.positions = {code: position for position, code in enumerate(codes)}
+
+    @classmethod
+    def build(
+        cls,
+        currency_rates: CurrencyRatesDTO,
+        source: Optional[dict[str, int]] = None,
+    ) -> RateMatrix:
+        """
+        Построение матрицы по курсам относительно базовой валюты.
+        Валюты без положительного курса в матрицу не попадают.
+
+        :param currency_rates: Курсы валют из кэша
+        :param source: Сведения о файле кэша, из которого построена матрица
+        :return:
+        """
+
+        rates = {currency_rates.base: 1.0}
+        rates.update(
+            (code, rate)
+            for code, rate in currency_rates.rates.items()
+            if isinstance(rate, float) and rate > 0
+        )
+        codes = list(rates)
+        column = array("d", rates.values())
+        values = array("d")
+        # строка base содержит курсы всех валют, деленные на курс base
+        for rate in column:
+            values.extend(quote / rate for quote in column)
+
+        return cls(currency_rates.base, codes, values, source)
+
+    def rate(self, base: str, quote: str) -> Optional[float]:
+        """
+        Получение курса для пары валют.
+
+        :param base: Код валюты, стоимость которой нужно получить
+        :param quote: Код валюты, в которой выражается стоимость
+        :return: Стоимость единицы base в quote или None, если курса нет
+        """
+
+        row, column = self.positions.get(base), self.positions.get(quote)
+        if row is None or column is None:
+            return None
+
+        return self.values[row * len(self.codes) + column]
+
+    def row(self, base: str) -> dict[str, float]:
+        """
+        Получение стоимости единицы валюты во всех валютах.
+
+        :param base: Код валюты
+        :return:
+        """
+
+        if (row := self.positions.get(base)) is None:
+            return {}
+
+        size = len(self.codes)
+        return dict(zip(self.codes, self.values[row * size : (row + 1) * size]))
+
+    def column(self, quote: str) -> dict[str, float]:
+        """
+        Получение стоимости единицы каждой валюты в указанной валюте.
+
+        :param quote: Код валюты, в которой выражается стоимость
+        :return:
+        """
+
+        if (column := self.positions.get(quote)) is None:
+            return {}
+
+        return dict(zip(self.codes, self.values[column :: len(self.codes)]))
+
+    def to_bytes(self) -> bytes:
+        """
+        Сериализация матрицы в двоичный формат.
+        Значения сохраняются в порядке байтов little-endian.
+
+        :return:
+        """
+
+        codes = ",".join([self.base, *self.codes]).encode()
+        values = array("d", self.values)
+        if sys.byteorder == "big":
+            values.byteswap()
+
+        return (
+            HEADER.pack(
+                MAGIC,
+                len(self.codes),
+                self.source.get("mtime_ns", 0),
+                self.source.get("size", 0),
+                len(codes),
+            )
+            + codes
+            + values.tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> RateMatrix:
+        """
+        Десериализация матрицы из двоичного формата.
+
+        :param content: Содержимое файла
+        :return:
+        """
+
+        magic, size, mtime_ns, file_size, length = HEADER.unpack_from(content)
+        if magic != MAGIC:
+            raise ValueError("Неизвестный формат матрицы курсов валют")
+
+        base, *codes = content[HEADER.size : HEADER.size + length].decode().split(",")
+        values = array("d")
+        values.frombytes(content[HEADER.size + length :])
+        if sys.byteorder == "big":
+            values.byteswap()
+        if len(codes) != size or len(values) != size * size:
+            raise ValueError("Некорректный размер матрицы курсов валют")
+
+        return cls(base, codes, values, {"mtime_ns": mtime_ns, "size": file_size})
+
+    @staticmethod
+    async def get_file_path() -> str:
+        return f"{MEDIA_PATH}/currency_rates.bin"
+
+    @staticmethod
+    async def get_source(source_path: str) -> dict[str, int]:
+        """
+        Получение сведений о файле кэша для проверки актуальности матрицы.
+
+        :param source_path: Путь к файлу кэша
+        :return:
+        """
+
+        stat = await aiofiles.os.stat(source_path)
+
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    @classmethod
+    async def load(cls, source_path: str) -> Optional[RateMatrix]:
+        """
+        Чтение матрицы с диска.
+        Если матрица отсутствует или построена по другой версии кэша, то возвращается None.
+
+        :param source_path: Путь к файлу кэша, из которого построена матрица
+        :return:
+        """
+
+        file_path = await cls.get_file_path()
+        if not await aiofiles.os.path.isfile(file_path):
+            return None
+
+        matrix = await BaseCollector.read_cache.load(file_path, cls._parse, binary=True)
+        if matrix is None or matrix.source != await cls.get_source(source_path):
+            return None
+
+        return matrix
+
+    @classmethod
+    def _parse(cls, content: bytes) -> Optional[RateMatrix]:
+        """
+        Разбор содержимого файла матрицы.
+
+        :param content: Содержимое файла
+        :return:
+        """
+
+        try:
+            return cls.from_bytes(content)
+        except (ValueError, struct.error, UnicodeDecodeError):
+            return None
+
+    async def save(self) -> None:
+        """
+        Сохранение матрицы на диск.
+
+        :return:
+        """
+
+        async with aiofiles.open(await self.get_file_path(), mode="wb") as file:
+            await file.write(self.to_bytes())
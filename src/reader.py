@@ -2,14 +2,17 @@
 Поиск собранной информации в файлах на диске.
 """
 
+import asyncio
+import logging
 from difflib import SequenceMatcher
-from typing import Optional
+from typing import AsyncIterator, Iterable, Optional
 
 from collectors.collector import (
     CountryCollector,
     CurrencyRatesCollector,
     WeatherCollector,
 )
+from collectors.manifest import Manifest
 from collectors.models import (
     CountryDTO,
     CurrencyInfoDTO,
@@ -17,63 +20,546 @@ from collectors.models import (
     LocationInfoDTO,
     WeatherInfoDTO,
 )
+from geo import GeoIndex
+from profiling import span
+from rates import RateMatrix
+from search import MATCH_RATIO, SearchIndex
+from settings import BATCH_SIZE, MANIFEST_PATH, READ_THROUGH, READ_THROUGH_DEADLINE
 
 
 class Reader:
     """
     Чтение сохраненных данных.
+
+    В режиме чтения с обращением к внешнему сервису (read-through) время ответа
+    остается ограниченным:
+
+    * отсутствующие данные о погоде запрашиваются не дольше ``deadline`` секунд,
+      после чего запрос продолжается в фоне, а результат поиска отсутствует;
+    * устаревшие данные возвращаются сразу, а их обновление выполняется в фоне.
     """
 
-    async def find(self, location: str) -> Optional[LocationInfoDTO]:
+    def __init__(
+        self, read_through: bool = READ_THROUGH, deadline: float = READ_THROUGH_DEADLINE
+    ) -> None:
+        """
+        Конструктор.
+
+        :param read_through: Запрашивать отсутствующие и обновлять устаревшие данные
+        :param deadline: Максимальное время ожидания отсутствующих данных (в секундах)
+        """
+
+        self.read_through = read_through
+        self.deadline = deadline
+        # выполняемые обновления данных о погоде: ключ локации -> задача
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self._fetched = False
+        # манифест сборщика (загружается при первом обращении)
+        self._manifest: Optional[Manifest] = None
+        # пространственный индекс и данные о странах, по которым он построен
+        self._geo_index: Optional[tuple[list[CountryDTO], GeoIndex]] = None
+
+    async def find(
+        self, location: str, currency: Optional[str] = None
+    ) -> Optional[LocationInfoDTO]:
         """
         Поиск данных о стране по строке.
+        Если данные о погоде для найденной страны еще не собраны, то результат отсутствует.
 
         :param location: Строка для поиска
+        :param currency: Валюта для курсов валют (по умолчанию – базовая валюта кэша)
+        :return:
+        """
+
+        with span("find"):
+            return await self._find(location, currency)
+
+    async def _find(
+        self, location: str, currency: Optional[str] = None
+    ) -> Optional[LocationInfoDTO]:
+        """
+        Поиск данных о стране по строке (без отметки этапа).
+
+        :param location: Строка для поиска
+        :param currency: Валюта для курсов валют
         :return:
         """
 
         country = await self.find_country(location)
-        if country:
-            weather = await self.get_weather(
-                LocationDTO(capital=country.capital, alpha2code=country.alpha2code)
-            )
-            currency_rates = await self.get_currency_rates(country.currencies)
+        if country and (weather := await self.get_weather(self.get_location(country))):
+            matrix = await self.get_rate_matrix()
+            currency = self._get_currency(matrix, currency)
 
             return LocationInfoDTO(
                 location=country,
                 weather=weather,
-                currency_rates=currency_rates,
+                currency_rates=self._convert_rates(
+                    country.currencies, matrix, currency
+                ),
+                currency=currency,
             )
 
         return None
 
+    async def find_many(
+        self, locations: Iterable[str], currency: Optional[str] = None
+    ) -> list[Optional[LocationInfoDTO]]:
+        """
+        Поиск данных о странах для нескольких строк.
+        Кэши данных о странах и курсах валют читаются один раз,
+        а нужные данные о погоде – параллельно и без повторов.
+
+        Если данных о погоде для найденной страны еще нет,
+        то результат для этой строки отсутствует (None).
+
+        :param locations: Строки для поиска
+        :param currency: Валюта для курсов валют (по умолчанию – базовая валюта кэша)
+        :return: Результаты в порядке строк для поиска
+        """
+
+        with span("find_many"):
+            return await self._find_many(locations, currency)
+
+    async def _find_many(
+        self, locations: Iterable[str], currency: Optional[str] = None
+    ) -> list[Optional[LocationInfoDTO]]:
+        """
+        Поиск данных о странах для нескольких строк (без отметки этапа).
+
+        :param locations: Строки для поиска
+        :param currency: Валюта для курсов валют
+        :return:
+        """
+
+        locations = list(locations)
+        countries = await CountryCollector.read()
+        if not countries:
+            return [None for _ in locations]
+
+        index = await self.get_search_index(countries)
+        matrix = await self.get_rate_matrix()
+        currency = self._get_currency(matrix, currency)
+
+        found = [
+            countries[position]
+            if (position := index.search(location)) is not None
+            else None
+            for location in locations
+        ]
+        weather_locations = {
+            country.alpha2code: self.get_location(country)
+            for country in found
+            if country
+        }
+        weather = dict(
+            zip(
+                weather_locations,
+                await asyncio.gather(
+                    *(self.get_weather(item) for item in weather_locations.values())
+                ),
+            )
+        )
+
+        result: list[Optional[LocationInfoDTO]] = []
+        for country in found:
+            if country and (country_weather := weather[country.alpha2code]):
+                result.append(
+                    LocationInfoDTO(
+                        location=country,
+                        weather=country_weather,
+                        currency_rates=self._convert_rates(
+                            country.currencies, matrix, currency
+                        ),
+                        currency=currency,
+                    )
+                )
+            else:
+                result.append(None)
+
+        return result
+
+    async def iter_all(
+        self, currency: Optional[str] = None, chunk_size: int = BATCH_SIZE
+    ) -> AsyncIterator[list[LocationInfoDTO]]:
+        """
+        Потоковое чтение данных обо всех странах порциями (в порядке кэша).
+        Кэши данных о странах и курсах валют читаются один раз,
+        а данные о погоде для каждой порции – параллельно.
+
+        Страны, данные о погоде для которых еще не собраны, пропускаются.
+
+        :param currency: Валюта для курсов валют (по умолчанию – базовая валюта кэша)
+        :param chunk_size: Количество стран в порции
+        :return: Порции найденных данных
+        """
+
+        countries = await CountryCollector.read()
+        if not countries:
+            return
+
+        matrix = await self.get_rate_matrix()
+        currency = self._get_currency(matrix, currency)
+        for start in range(0, len(countries), chunk_size):
+            chunk = countries[start : start + chunk_size]
+            weather = await asyncio.gather(
+                *(self.get_weather(self.get_location(country)) for country in chunk)
+            )
+            yield [
+                LocationInfoDTO(
+                    location=country,
+                    weather=country_weather,
+                    currency_rates=self._convert_rates(
+                        country.currencies, matrix, currency
+                    ),
+                    currency=currency,
+                )
+                for country, country_weather in zip(chunk, weather)
+                if country_weather
+            ]
+
+    async def find_nearest(
+        self, latitude: float, longitude: float, currency: Optional[str] = None
+    ) -> Optional[tuple[float, LocationInfoDTO]]:
+        """
+        Поиск данных о стране, столица которой ближе всего к точке.
+        Страны, данные о погоде для которых еще не собраны, пропускаются
+        (как и при поиске в радиусе).
+
+        :param latitude: Широта (в градусах)
+        :param longitude: Долгота (в градусах)
+        :param currency: Валюта для курсов валют (по умолчанию – базовая валюта кэша)
+        :return: Расстояние до столицы (в километрах) и найденные данные
+        """
+
+        with span("find_nearest"):
+            countries = await CountryCollector.read()
+            if not countries:
+                return None
+
+            index = self.get_geo_index(countries)
+            # столицы проверяются по возрастанию расстояния до первой с данными о погоде
+            for found in index.iter_nearest(latitude, longitude):
+                if result := await self._join_weather(countries, [found], currency):
+                    return result[0]
+
+            return None
+
+    async def find_within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        currency: Optional[str] = None,
+    ) -> list[tuple[float, LocationInfoDTO]]:
+        """
+        Поиск данных о странах, столицы которых находятся в радиусе от точки.
+        Страны, данные о погоде для которых еще не собраны, пропускаются.
+
+        :param latitude: Широта (в градусах)
+        :param longitude: Долгота (в градусах)
+        :param radius: Радиус (в километрах)
+        :param currency: Валюта для курсов валют (по умолчанию – базовая валюта кэша)
+        :return: Расстояния до столиц (в километрах) и найденные данные
+            в порядке возрастания расстояния
+        """
+
+        with span("find_within"):
+            countries = await CountryCollector.read()
+            if not countries:
+                return []
+
+            index = self.get_geo_index(countries)
+
+            return await self._join_weather(
+                countries, index.within(latitude, longitude, radius), currency
+            )
+
+    def get_geo_index(self, countries: list[CountryDTO]) -> GeoIndex:
+        """
+        Получение пространственного индекса для кэша данных о странах.
+        Пока кэш не изменился (прочитанные данные те же), индекс строится один раз.
+
+        :param countries: Данные о странах из кэша
+        :return:
+        """
+
+        if self._geo_index is None or self._geo_index[0] is not countries:
+            self._geo_index = (
+                countries,
+                GeoIndex.build(
+                    (country.capital_latitude, country.capital_longitude)
+                    for country in countries
+                ),
+            )
+
+        return self._geo_index[1]
+
+    async def _join_weather(
+        self,
+        countries: list[CountryDTO],
+        found: list[tuple[int, float]],
+        currency: Optional[str] = None,
+    ) -> list[tuple[float, LocationInfoDTO]]:
+        """
+        Формирование результатов поиска по координатам: данные о погоде для найденных
+        стран читаются параллельно, а страны без данных о погоде пропускаются.
+
+        :param countries: Данные о странах из кэша
+        :param found: Позиции стран в кэше и расстояния до столиц
+        :param currency: Валюта для курсов валют
+        :return:
+        """
+
+        matrix = await self.get_rate_matrix()
+        currency = self._get_currency(matrix, currency)
+        weather = await asyncio.gather(
+            *(
+                self.get_weather(self.get_location(countries[position]))
+                for position, _ in found
+            )
+        )
+
+        return [
+            (
+                distance,
+                LocationInfoDTO(
+                    location=countries[position],
+                    weather=country_weather,
+                    currency_rates=self._convert_rates(
+                        countries[position].currencies, matrix, currency
+                    ),
+                    currency=currency,
+                ),
+            )
+            for (position, distance), country_weather in zip(found, weather)
+            if country_weather
+        ]
+
+    @staticmethod
+    def get_location(country: CountryDTO) -> LocationDTO:
+        """
+        Получение локации столицы страны для чтения данных о погоде.
+
+        :param country: Данные о стране
+        :return:
+        """
+
+        return LocationDTO(
+            capital=country.capital,
+            alpha2code=country.alpha2code,
+            latitude=country.capital_latitude,
+            longitude=country.capital_longitude,
+        )
+
     @staticmethod
-    async def get_currency_rates(currencies: set[CurrencyInfoDTO]) -> dict[str, float]:
+    async def get_currency_rates(
+        currencies: set[CurrencyInfoDTO], currency: Optional[str] = None
+    ) -> dict[str, float]:
         """
         Чтение и формирование информации о курсах валют.
 
         :param currencies: Множество с данными о курсах валют
+        :param currency: Валюта для курсов валют (по умолчанию – базовая валюта кэша)
+        :return:
+        """
+
+        matrix = await Reader.get_rate_matrix()
+
+        return Reader._convert_rates(
+            currencies, matrix, Reader._get_currency(matrix, currency)
+        )
+
+    @staticmethod
+    def _get_currency(matrix: Optional[RateMatrix], currency: Optional[str]) -> str:
+        """
+        Получение кода валюты для курсов валют.
+
+        :param matrix: Матрица кросс-курсов
+        :param currency: Запрошенная валюта
+        :return:
+        """
+
+        if currency:
+            return currency.upper()
+
+        return matrix.base if matrix else "RUB"
+
+    @staticmethod
+    def _convert_rates(
+        currencies: set[CurrencyInfoDTO],
+        matrix: Optional[RateMatrix],
+        currency: str,
+    ) -> dict[str, float]:
+        """
+        Формирование информации о курсах валют.
+
+        :param currencies: Множество с данными о курсах валют
+        :param matrix: Матрица кросс-курсов
+        :param currency: Валюта, в которой выражается стоимость
         :return:
         """
 
-        currency_rates = await CurrencyRatesCollector.read()
         result = {}
-        for currency in currencies:
-            if currency_rates:
-                if isinstance(rate := currency_rates.rates.get(currency.code), float):
-                    result[currency.code] = 1 / rate
+        if matrix:
+            for item in currencies:
+                if (rate := matrix.rate(item.code, currency)) is not None:
+                    result[item.code] = rate
 
         return result
 
     @staticmethod
-    async def get_weather(location: LocationDTO) -> Optional[WeatherInfoDTO]:
+    async def get_rate_matrix() -> Optional[RateMatrix]:
+        """
+        Получение матрицы кросс-курсов для кэша курсов валют.
+        Если сохраненная матрица отсутствует или устарела, то она строится заново.
+
+        :return:
+        """
+
+        source_path = await CurrencyRatesCollector.get_file_path()
+        if matrix := await RateMatrix.load(source_path):
+            return matrix
+
+        if not (currency_rates := await CurrencyRatesCollector.read()):
+            return None
+
+        matrix = RateMatrix.build(
+            currency_rates, source=await RateMatrix.get_source(source_path)
+        )
+        try:
+            await matrix.save()
+        except OSError:
+            # отсутствие прав на запись не должно мешать поиску
+            pass
+
+        return matrix
+
+    async def get_weather(self, location: LocationDTO) -> Optional[WeatherInfoDTO]:
         """
         Получение данных о погоде.
 
         :param location: Объект локации для получения данных
+        :return: Данные о погоде или None, если они еще не собраны
+            (или не получены за отведенное время в режиме read-through)
+        """
+
+        weather = await WeatherCollector.read(location=location)
+        if not self.read_through:
+            return weather
+
+        if weather is None:
+            # запрос продолжается в фоне, даже если время ожидания истекло
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(self.refresh_weather(location)), self.deadline
+                )
+            except asyncio.TimeoutError:
+                return None
+
+            return await WeatherCollector.read(location=location)
+
+        if await self.weather_stale(location):
+            self.refresh_weather(location)
+
+        return weather
+
+    async def weather_stale(self, location: LocationDTO) -> bool:
+        """
+        Проверка актуальности данных о погоде.
+        Срок актуальности (с учетом задержки после неудачных запросов) определяется
+        по манифесту, а если сведений о локации в нем нет – по хранилищу.
+
+        :param location: Объект локации
+        :return:
+        """
+
+        key = WeatherCollector.get_key(location)
+        ttl = await WeatherCollector.get_cache_ttl()
+        manifest = await self.get_manifest()
+        if (
+            stale := manifest.stale(await WeatherCollector.get_resource(key), ttl)
+        ) is not None:
+            return stale
+
+        storage = await WeatherCollector.get_storage()
+
+        return key in await storage.stale([key], ttl)
+
+    async def get_manifest(self) -> Manifest:
+        """
+        Получение манифеста сборщика.
+        Манифест перечитывается, если файл изменился (например, сборщиком в режиме службы).
+
         :return:
         """
-        return await WeatherCollector.read(location=location)
+
+        if self._manifest is None:
+            self._manifest = await Manifest.load(MANIFEST_PATH)
+        else:
+            await self._manifest.reload()
+
+        return self._manifest
+
+    def refresh_weather(self, location: LocationDTO) -> asyncio.Task:
+        """
+        Запуск фонового обновления данных о погоде.
+        Для каждой локации одновременно выполняется не больше одного обновления.
+
+        :param location: Объект локации
+        :return: Задача обновления
+        """
+
+        key = WeatherCollector.get_key(location)
+        if (task := self._refreshing.get(key)) is None:
+            self._fetched = True
+            task = asyncio.create_task(self._refresh_weather(location))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+        return task
+
+    async def _refresh_weather(self, location: LocationDTO) -> None:
+        """
+        Обновление данных о погоде сборщиком.
+        Сборщик использует общий манифест: учитываются задержки после неудачных
+        запросов, условные запросы и идентификаторы городов, а результат сохраняется
+        для сборщика в режиме службы.
+
+        :param location: Объект локации
+        :return:
+        """
+
+        # pylint: disable=broad-except
+        try:
+            manifest = await self.get_manifest()
+            await WeatherCollector(manifest).collect(frozenset({location}))
+            await manifest.save()
+        except Exception:
+            logging.exception("Не удалось обновить погоду для %s", location.capital)
+
+    async def close(self) -> None:
+        """
+        Завершение фоновых обновлений и закрытие HTTP-сессии, если она использовалась.
+        Выполняемые обновления ожидаются не дольше ``deadline`` секунд,
+        после чего отменяются.
+        Метрики выполненных HTTP-запросов выгружаются в LOGGING_PATH.
+
+        :return:
+        """
+
+        if tasks := list(self._refreshing.values()):
+            _, pending = await asyncio.wait(tasks, timeout=self.deadline)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if self._fetched:
+            # pylint: disable=import-outside-toplevel
+            from clients.base import BaseClient
+            from metrics import registry
+
+            await BaseClient.close_session()
+            await registry.export()
 
     async def find_country(self, search: str) -> Optional[CountryDTO]:
         """
@@ -84,16 +570,57 @@ class Reader:
         """
 
         if countries := await CountryCollector.read():
-            for country in countries:
-                if await self._match(search, country):
-                    return country
+            index = await self.get_search_index(countries)
+            if (position := index.search(search)) is not None:
+                return countries[position]
+
+        return None
+
+    @staticmethod
+    async def get_country(alpha2code: str) -> Optional[CountryDTO]:
+        """
+        Получение данных о стране по коду ISO 3166-1 alpha-2 (без поиска).
+
+        :param alpha2code: Код страны
+        :return:
+        """
+
+        if store := await CountryCollector.read_store():
+            return store.get(alpha2code)
 
         return None
 
+    @staticmethod
+    async def get_search_index(countries: list[CountryDTO]) -> SearchIndex:
+        """
+        Получение поискового индекса для кэша данных о странах.
+        Если сохраненный индекс отсутствует или устарел, то он строится заново.
+
+        :param countries: Данные о странах из кэша
+        :return:
+        """
+
+        source_path = await CountryCollector.get_file_path()
+        if index := await SearchIndex.load(source_path):
+            return index
+
+        index = SearchIndex.build(
+            ((country.capital, *country.alt_spellings) for country in countries),
+            source=await SearchIndex.get_source(source_path),
+        )
+        try:
+            await index.save()
+        except OSError:
+            # отсутствие прав на запись не должно мешать поиску
+            pass
+
+        return index
+
     @staticmethod
     async def _match(search: str, country: CountryDTO) -> bool:
         """
         Получение факта сходства между переданными строками для поиска страны.
+        Эталонная реализация правил сравнения, которые применяет :class:`search.SearchIndex`.
 
         :param search: Строка для сравнения
         :param CountryDTO country: Данные о стране
@@ -101,8 +628,7 @@ class Reader:
         """
 
         words = search.split()
-        # степень схожести сравниваемого текста
-        ratio = 0.67
+        ratio = MATCH_RATIO
         for word in words:
             if any(
                 [
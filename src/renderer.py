@@ -4,8 +4,10 @@
 
 import datetime
 from decimal import ROUND_HALF_UP, Decimal
+from typing import Any
 
 from collectors.models import LocationInfoDTO
+from profiling import span
 
 
 class Renderer:
@@ -29,27 +31,103 @@ class Renderer:
         :return: Результат форматирования
         """
 
-        return (
-            f"Страна: {self.location_info.location.name}",
-            f"Столица: {self.location_info.location.capital}",
-            f"Широта столицы: {self.location_info.location.capital_latitude}",
-            f"Долгота столицы: {self.location_info.location.capital_longitude}",
-            f"Часовой пояс столицы: {await self._get_timezone()}",
-            f"Площадь: {await self._format_area()} км²",
-            f"Регион: {self.location_info.location.subregion}",
-            f"Языки: {await self._format_languages()}",
-            f"Население страны: {await self._format_population()} чел.",
-            f"Курсы валют: {await self._format_currency_rates()}",
-            "-----------------погода в столице---------------------------",
-            f"Сейчас в {self.location_info.location.capital} {await self._format_current_time()}",
-            f"Температура: {self.location_info.weather.temp} °C",
-            f"Погода: {self.location_info.weather.description}",
-            f"Влажность: {self.location_info.weather.humidity}%",
-            f"Видимость: {await self._format_visibility()} км",
-            f"Скорость ветра: {self.location_info.weather.wind_speed} м/с",
-        )
+        with span("render"):
+            return (
+                f"Страна: {self.location_info.location.name}",
+                f"Столица: {self.location_info.location.capital}",
+                f"Широта столицы: {self.location_info.location.capital_latitude}",
+                f"Долгота столицы: {self.location_info.location.capital_longitude}",
+                f"Часовой пояс столицы: {self._get_timezone()}",
+                f"Площадь: {self._format_area()} км²",
+                f"Регион: {self.location_info.location.subregion}",
+                f"Языки: {self._format_languages()}",
+                f"Население страны: {self._format_population()} чел.",
+                f"Курсы валют: {self._format_currency_rates()}",
+                "-----------------погода в столице---------------------------",
+                f"Сейчас в {self.location_info.location.capital} {self._format_current_time()}",
+                f"Температура: {self.location_info.weather.temp} °C",
+                f"Погода: {self.location_info.weather.description}",
+                f"Влажность: {self.location_info.weather.humidity}%",
+                f"Видимость: {self._format_visibility()} км",
+                f"Скорость ветра: {self.location_info.weather.wind_speed} м/с",
+            )
+
+    async def serialize(self) -> dict[str, Any]:
+        """
+        Преобразование прочитанных данных в словарь для сериализации (например, в JSON).
+        Множества преобразуются в упорядоченные списки.
+
+        :return:
+        """
 
-    async def _get_timezone(self) -> str:
+        with span("render"):
+            location = self.location_info.location
+
+            return {
+                "location": {
+                    **location.dict(exclude={"currencies", "languages"}),
+                    "currencies": [
+                        item.dict()
+                        for item in sorted(
+                            location.currencies, key=lambda item: item.code
+                        )
+                    ],
+                    "languages": [
+                        item.dict()
+                        for item in sorted(
+                            location.languages, key=lambda item: item.name
+                        )
+                    ],
+                },
+                "weather": self.location_info.weather.dict(),
+                "currency_rates": self.location_info.currency_rates,
+                "currency": self.location_info.currency,
+            }
+
+    def row(self) -> dict[str, Any]:
+        """
+        Преобразование прочитанных данных в плоскую строку таблицы (например, для CSV).
+        Списки значений объединяются в строки через точку с запятой.
+
+        :return: Имя столбца -> значение
+        """
+
+        with span("render"):
+            location = self.location_info.location
+            weather = self.location_info.weather
+
+            return {
+                "alpha2code": location.alpha2code,
+                "name": location.name,
+                "capital": location.capital,
+                "capital_latitude": location.capital_latitude,
+                "capital_longitude": location.capital_longitude,
+                "subregion": location.subregion,
+                "area": location.area,
+                "population": location.population,
+                "languages": "; ".join(
+                    sorted(item.name for item in location.languages)
+                ),
+                "currencies": "; ".join(
+                    sorted(item.code for item in location.currencies)
+                ),
+                "timezones": "; ".join(location.timezones),
+                "blocs": "; ".join(location.blocs),
+                "temp": weather.temp,
+                "pressure": weather.pressure,
+                "humidity": weather.humidity,
+                "visibility": weather.visibility,
+                "wind_speed": weather.wind_speed,
+                "description": weather.description,
+                "utc_offset": self._get_timezone(),
+                "currency": self.location_info.currency,
+                "currency_rates": "; ".join(
+                    f"{code} {rate}"
+                    for code, rate in sorted(self.location_info.currency_rates.items())
+                ),
+            }
+
+    def _get_timezone(self) -> str:
         """
         Форматирование информации о времени.
 
@@ -58,7 +136,7 @@ class Renderer:
         offset_hours = self.location_info.weather.offset_seconds / 3600.0
         return "UTC{:+d}:{:02d}".format(int(offset_hours), int((offset_hours % 1) * 60))
 
-    async def _format_current_time(self) -> str:
+    def _format_current_time(self) -> str:
         """
         Форматирование информации о времени.
 
@@ -69,7 +147,7 @@ class Renderer:
         )
         return dt.strftime("%X, %x")
 
-    async def _format_visibility(self) -> str:
+    def _format_visibility(self) -> str:
         """
         Форматирование информации о видимости.
         Необходимо преобразовать ответ из метров в километры.
@@ -80,7 +158,7 @@ class Renderer:
         # pylint: disable=C0209
         return f"{self.location_info.weather.visibility / 1000}"
 
-    async def _format_languages(self) -> str:
+    def _format_languages(self) -> str:
         """
         Форматирование информации о языках.
 
@@ -92,7 +170,7 @@ class Renderer:
             for item in self.location_info.location.languages
         )
 
-    async def _format_area(self) -> str:
+    def _format_area(self) -> str:
         """
         Форматирование информации о площади.
 
@@ -106,7 +184,7 @@ class Renderer:
         else:
             return "{:,.0f}".format(self.location_info.location.area).replace(",", ".")
 
-    async def _format_population(self) -> str:
+    def _format_population(self) -> str:
         """
         Форматирование информации о населении.
 
@@ -116,14 +194,20 @@ class Renderer:
         # pylint: disable=C0209
         return "{:,}".format(self.location_info.location.population).replace(",", ".")
 
-    async def _format_currency_rates(self) -> str:
+    def _format_currency_rates(self) -> str:
         """
         Форматирование информации о курсах валют.
 
         :return:
         """
 
+        unit = (
+            "руб."
+            if self.location_info.currency == "RUB"
+            else self.location_info.currency
+        )
+
         return ", ".join(
-            f"{currency} = {Decimal(rates).quantize(exp=Decimal('.01'), rounding=ROUND_HALF_UP)} руб."
+            f"{currency} = {Decimal(rates).quantize(exp=Decimal('.01'), rounding=ROUND_HALF_UP)} {unit}"
             for currency, rates in self.location_info.currency_rates.items()
         )
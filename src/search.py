@@ -0,0 +1,278 @@
+"""
+Поисковый индекс по названиям столиц и вариантам написания названий стран.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Any, Iterable, Optional
+
+import aiofiles
+import aiofiles.os
+
+from collectors import serialization
+from collectors.base import BaseCollector
+from profiling import span
+from settings import MEDIA_PATH
+
+# степень схожести сравниваемого текста
+MATCH_RATIO = 0.67
+# длина n-грамм для поиска подстроки
+NGRAM_SIZE = 3
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> set[str]:
+    """
+    Получение множества символьных n-грамм строки.
+
+    :param text: Строка
+    :param size: Длина n-граммы
+    :return:
+    """
+
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+class SearchIndex:
+    """
+    Инвертированный индекс для поиска страны по строке.
+
+    Индекс только сужает множество кандидатов, а окончательная проверка
+    выполняется по тем же правилам, что и в :meth:`reader.Reader._match`,
+    поэтому результат поиска совпадает с последовательным перебором стран:
+
+    * для поиска подстроки используются триграммы названий, приведенных к casefold;
+    * для нечеткого сравнения (``SequenceMatcher``) используются униграммы с количеством
+      вхождений, по которым вычисляется верхняя оценка степени схожести.
+    """
+
+    def __init__(
+        self,
+        entries: list[tuple[int, str]],
+        trigrams: dict[str, list[int]],
+        chars: dict[str, list[list[int]]],
+        source: Optional[dict[str, int]] = None,
+    ) -> None:
+        """
+        Конструктор.
+
+        :param entries: Названия в виде пар (позиция страны в кэше, название)
+        :param trigrams: Триграмма -> номера названий
+        :param chars: Символ -> номера названий, содержащих символ не менее k раз (по уровням k)
+        :param source: Сведения о файле кэша, из которого построен индекс
+        """
+
+        self.entries = entries
+        self.trigrams = trigrams
+        self.chars = chars
+        self.source = source or {}
+        self.lowered = [name.lower() for _, name in entries]
+        self.folded = [name.casefold() for _, name in entries]
+
+    @classmethod
+    def build(
+        cls,
+        countries: Iterable[Iterable[str]],
+        source: Optional[dict[str, int]] = None,
+    ) -> SearchIndex:
+        """
+        Построение индекса.
+
+        :param countries: Названия для каждой страны (столица и варианты написания)
+        :param source: Сведения о файле кэша, из которого построен индекс
+        :return:
+        """
+
+        entries = [
+            (position, name)
+            for position, names in enumerate(countries)
+            for name in names
+        ]
+        trigrams: dict[str, list[int]] = defaultdict(list)
+        chars: dict[str, list[list[int]]] = defaultdict(list)
+        for entry, (_, name) in enumerate(entries):
+            for gram in ngrams(name.casefold()):
+                trigrams[gram].append(entry)
+            for char, count in Counter(name).items():
+                levels = chars[char]
+                levels.extend([] for _ in range(count - len(levels)))
+                for level in levels[:count]:
+                    level.append(entry)
+
+        return cls(entries, dict(trigrams), dict(chars), source)
+
+    def search(self, search: str) -> Optional[int]:
+        """
+        Поиск страны.
+
+        :param search: Строка для поиска
+        :return: Позиция первой подходящей страны в кэше
+        """
+
+        with span("match"):
+            return self._search(search)
+
+    def _search(self, search: str) -> Optional[int]:
+        """
+        Поиск страны (без замера времени).
+
+        :param search: Строка для поиска
+        :return: Позиция первой подходящей страны в кэше
+        """
+
+        words = search.split()
+        if not words:
+            return None
+
+        candidates = self._substring_candidates(search.casefold())
+        for word in words:
+            candidates |= self._fuzzy_candidates(word)
+
+        lowered = search.lower()
+        # номера названий возрастают вместе с позицией страны,
+        # поэтому первое подтвержденное название относится к первой подходящей стране
+        for entry in sorted(candidates):
+            position, name = self.entries[entry]
+            if lowered in self.lowered[entry] or any(
+                SequenceMatcher(None, word, name).ratio() > MATCH_RATIO
+                for word in words
+            ):
+                return position
+
+        return None
+
+    def _substring_candidates(self, folded: str) -> set[int]:
+        """
+        Получение названий, которые могут содержать строку поиска.
+
+        :param folded: Строка поиска, приведенная к casefold
+        :return:
+        """
+
+        if len(folded) < NGRAM_SIZE:
+            return {entry for entry, name in enumerate(self.folded) if folded in name}
+
+        postings = []
+        for gram in ngrams(folded):
+            if gram not in self.trigrams:
+                return set()
+            postings.append(self.trigrams[gram])
+
+        postings.sort(key=len)
+        return set(postings[0]).intersection(*postings[1:])
+
+    def _fuzzy_candidates(self, word: str) -> set[int]:
+        """
+        Получение названий, степень схожести которых со словом может превышать порог.
+        Количество совпадающих символов не меньше, чем находит ``SequenceMatcher``,
+        поэтому оценка не отбрасывает подходящие названия.
+
+        :param word: Слово из строки поиска
+        :return:
+        """
+
+        # для каждого названия суммируется min(вхождений в слово, вхождений в название)
+        # по всем символам слова
+        shared: Counter[int] = Counter()
+        for char, count in Counter(word).items():
+            for level in self.chars.get(char, [])[:count]:
+                shared.update(level)
+
+        length = len(word)
+        return {
+            entry
+            for entry, matches in shared.items()
+            if 2.0 * matches / (length + len(self.entries[entry][1])) > MATCH_RATIO
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Сериализация индекса.
+
+        :return:
+        """
+
+        return {
+            "source": self.source,
+            "entries": self.entries,
+            "trigrams": self.trigrams,
+            "chars": self.chars,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SearchIndex:
+        """
+        Десериализация индекса.
+
+        :param data: Сериализованный индекс
+        :return:
+        """
+
+        return cls(
+            entries=[(position, name) for position, name in data["entries"]],
+            trigrams=data["trigrams"],
+            chars=data["chars"],
+            source=data["source"],
+        )
+
+    @staticmethod
+    async def get_file_path() -> str:
+        return f"{MEDIA_PATH}/country_index.json"
+
+    @staticmethod
+    async def get_source(source_path: str) -> dict[str, int]:
+        """
+        Получение сведений о файле кэша для проверки актуальности индекса.
+
+        :param source_path: Путь к файлу кэша
+        :return:
+        """
+
+        stat = await aiofiles.os.stat(source_path)
+
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    @classmethod
+    async def load(cls, source_path: str) -> Optional[SearchIndex]:
+        """
+        Чтение индекса с диска.
+        Если индекс отсутствует или построен по другой версии кэша, то возвращается None.
+
+        :param source_path: Путь к файлу кэша, из которого построен индекс
+        :return:
+        """
+
+        file_path = await cls.get_file_path()
+        if not await aiofiles.os.path.isfile(file_path):
+            return None
+
+        index = await BaseCollector.read_cache.load(file_path, cls._parse, binary=True)
+        if index is None or index.source != await cls.get_source(source_path):
+            return None
+
+        return index
+
+    @classmethod
+    def _parse(cls, content: bytes) -> Optional[SearchIndex]:
+        """
+        Разбор содержимого файла индекса.
+
+        :param content: Содержимое файла
+        :return:
+        """
+
+        try:
+            return cls.from_dict(serialization.loads(content))
+        except (ValueError, KeyError):
+            return None
+
+    async def save(self) -> None:
+        """
+        Сохранение индекса на диск.
+
+        :return:
+        """
+
+        async with aiofiles.open(await self.get_file_path(), mode="wb") as file:
+            await file.write(serialization.dumps(self.to_dict()))
@@ -0,0 +1,144 @@
+"""
+Запуск HTTP-сервиса для поиска собранной информации.
+
+Прочитанные данные хранятся в памяти процесса между запросами
+и автоматически перечитываются после обновления файлов сборщиками.
+"""
+
+from typing import Any, AsyncIterator, Optional
+
+from aiohttp import web
+
+from collectors.models import LocationInfoDTO
+from logging_setup import setup_logging
+from reader import Reader
+from renderer import Renderer
+from settings import SERVER_HOST, SERVER_PORT
+
+
+async def serialize(
+    query: str, location_info: Optional[LocationInfoDTO]
+) -> dict[str, Any]:
+    """
+    Формирование результата поиска для ответа.
+
+    :param query: Строка для поиска
+    :param location_info: Найденные данные
+    :return:
+    """
+
+    if location_info is None:
+        return {"query": query, "result": None, "lines": []}
+
+    renderer = Renderer(location_info)
+
+    return {
+        "query": query,
+        "result": await renderer.serialize(),
+        "lines": list(await renderer.render()),
+    }
+
+
+async def find_location(request: web.Request) -> web.Response:
+    """
+    Поиск информации о стране по строке из параметра ``location``.
+    Валюта для курсов валют задается необязательным параметром ``currency``.
+
+    :param request: HTTP-запрос
+    :return:
+    """
+
+    query = request.query.get("location", "").strip()
+    if not query:
+        raise web.HTTPBadRequest(reason="Не задан параметр location")
+
+    try:
+        (location_info,) = await request.app["reader"].find_many(
+            [query], request.query.get("currency")
+        )
+    except FileNotFoundError as exc:
+        raise web.HTTPServiceUnavailable(reason="Данные еще не собраны") from exc
+
+    if location_info is None:
+        return web.json_response(await serialize(query, None), status=404)
+
+    return web.json_response(await serialize(query, location_info))
+
+
+async def find_locations(request: web.Request) -> web.Response:
+    """
+    Поиск информации о странах для списка строк ``{"locations": [...]}``.
+    Валюта для курсов валют задается необязательным ключом ``currency``.
+
+    :param request: HTTP-запрос
+    :return:
+    """
+
+    try:
+        data = await request.json()
+        queries = [str(item).strip() for item in data["locations"]]
+        currency = str(data.get("currency") or "") or None
+    except (ValueError, KeyError, TypeError) as exc:
+        raise web.HTTPBadRequest(reason="Ожидается объект {locations: [...]}") from exc
+
+    try:
+        results = await request.app["reader"].find_many(queries, currency)
+    except FileNotFoundError as exc:
+        raise web.HTTPServiceUnavailable(reason="Данные еще не собраны") from exc
+
+    return web.json_response(
+        {
+            "results": [
+                await serialize(query, location_info)
+                for query, location_info in zip(queries, results)
+            ]
+        }
+    )
+
+
+async def health(request: web.Request) -> web.Response:
+    """
+    Проверка работоспособности сервиса.
+
+    :param request: HTTP-запрос
+    :return:
+    """
+
+    # pylint: disable=unused-argument
+    return web.json_response({"status": "ok"})
+
+
+async def close_reader(app: web.Application) -> AsyncIterator[None]:
+    """
+    Остановка фоновых обновлений данных при завершении работы сервиса.
+    Используется контекст очистки: типы сигнала ``on_cleanup`` в aiohttp 3.8
+    не принимают обработчики приложения.
+
+    :param app: Приложение
+    :return:
+    """
+
+    yield
+    await app["reader"].close()
+
+
+def create_app() -> web.Application:
+    """
+    Создание приложения.
+
+    :return:
+    """
+
+    app = web.Application()
+    app["reader"] = Reader()
+    app.cleanup_ctx.append(close_reader)
+    app.router.add_get("/health", health)
+    app.router.add_get("/api/location", find_location)
+    app.router.add_post("/api/locations", find_locations)
+
+    return app
+
+
+if __name__ == "__main__":
+    setup_logging()
+    web.run_app(create_app(), host=SERVER_HOST, port=SERVER_PORT)
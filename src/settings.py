@@ -21,9 +21,87 @@ LOGGING_LEVEL: str = os.getenv("LOGGING_LEVEL", "INFO")
 API_KEY_APILAYER: Optional[str] = os.getenv("API_KEY_APILAYER")
 API_KEY_OPENWEATHER: Optional[str] = os.getenv("API_KEY_OPENWEATHER")
 
+# регионы (regional blocs), данные о странах которых собираются
+COUNTRY_BLOCS: list[str] = [
+    bloc.strip().lower()
+    for bloc in os.getenv(
+        "COUNTRY_BLOCS",
+        "eu,efta,caricom,pa,au,usan,eeu,al,asean,cais,cefta,nafta,saarc",
+    ).split(",")
+    if bloc.strip()
+]
+
 # время актуальности данных о странах (в секундах), по умолчанию – один год
 CACHE_TTL_COUNTRY: int = int(os.getenv("CACHE_TTL_COUNTRY", "31_536_000"))
 # время актуальности данных о курсах валют (в секундах), по умолчанию – сутки
 CACHE_TTL_CURRENCY_RATES: int = int(os.getenv("CACHE_TTL_CURRENCY_RATES", "86_400"))
 # время актуальности данных о погоде (в секундах), по умолчанию ~ три часа
 CACHE_TTL_WEATHER: int = int(os.getenv("CACHE_TTL_WEATHER", "10_700"))
+
+# максимальное количество одновременных HTTP-соединений
+HTTP_LIMIT: int = int(os.getenv("HTTP_LIMIT", "100"))
+# максимальное количество одновременных HTTP-соединений с одним хостом
+HTTP_LIMIT_PER_HOST: int = int(os.getenv("HTTP_LIMIT_PER_HOST", "10"))
+# время кэширования результатов DNS-запросов (в секундах)
+HTTP_DNS_CACHE_TTL: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+# время удержания неактивного соединения открытым (в секундах)
+HTTP_KEEPALIVE_TIMEOUT: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+# время ожидания установки соединения и получения данных из сокета (в секундах)
+HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT: float = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+# количество повторов запроса при ошибках сети и ответах 429/5xx
+HTTP_RETRIES: int = int(os.getenv("HTTP_RETRIES", "2"))
+# начальная и максимальная задержка перед повтором запроса (в секундах)
+HTTP_RETRY_BACKOFF: float = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))
+HTTP_RETRY_BACKOFF_MAX: float = float(os.getenv("HTTP_RETRY_BACKOFF_MAX", "10"))
+# количество неудачных запросов к хосту подряд, после которого запросы к нему
+# временно не выполняются (0 – без ограничения), и пауза до пробного запроса (в секундах)
+HTTP_BREAKER_THRESHOLD: int = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))
+HTTP_BREAKER_RESET: float = float(os.getenv("HTTP_BREAKER_RESET", "60"))
+
+# максимальное количество одновременных запросов данных о погоде
+WEATHER_CONCURRENCY: int = int(os.getenv("WEATHER_CONCURRENCY", "10"))
+# максимальное количество запросов данных о погоде в секунду (0 – без ограничения),
+# по умолчанию соответствует бесплатному тарифу OpenWeather (60 запросов в минуту)
+WEATHER_RATE_LIMIT: float = float(os.getenv("WEATHER_RATE_LIMIT", "1"))
+# максимальное количество городов в одном групповом запросе данных о погоде
+# (не более 20 для OpenWeather, 0 или 1 – групповые запросы не выполняются)
+WEATHER_GROUP_SIZE: int = int(os.getenv("WEATHER_GROUP_SIZE", "20"))
+
+# максимальное количество файлов, прочитанные данные из которых хранятся в памяти процесса
+READ_CACHE_SIZE: int = int(os.getenv("READ_CACHE_SIZE", "1024"))
+
+# чтение данных о погоде с обращением к внешнему сервису (1 – да, 0 – только кэш):
+# отсутствующие данные запрашиваются при поиске, а устаревшие обновляются в фоне
+READ_THROUGH: bool = os.getenv("READ_THROUGH", "0") == "1"
+# максимальное время ожидания отсутствующих данных при поиске (в секундах)
+READ_THROUGH_DEADLINE: float = float(os.getenv("READ_THROUGH_DEADLINE", "2"))
+
+# количество строк для поиска, обрабатываемых за один раз в пакетном режиме
+BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", "100"))
+
+# адрес и порт HTTP-сервиса для поиска информации
+SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8080"))
+
+# хранилище данных о погоде: files – отдельный файл для каждой локации,
+# sqlite – одна база данных SQLite для всех локаций
+WEATHER_STORAGE: str = os.getenv("WEATHER_STORAGE", "files")
+
+# создание моделей данных при чтении кэша без валидации
+# (данные проверяются сборщиками перед сохранением)
+CACHE_TRUSTED: bool = os.getenv("CACHE_TRUSTED", "1") == "1"
+
+# библиотека сериализации JSON: auto – orjson, если установлена, иначе json
+JSON_BACKEND: str = os.getenv("JSON_BACKEND", "auto")
+
+# минимальная пауза между циклами сбора данных в режиме службы (в секундах)
+COLLECT_MIN_INTERVAL: int = int(os.getenv("COLLECT_MIN_INTERVAL", "60"))
+
+# задержка перед повторной попыткой получить данные после ошибки (в секундах),
+# удваивается после каждой неудачи подряд, но не превышает максимального значения
+FETCH_RETRY_BACKOFF: int = int(os.getenv("FETCH_RETRY_BACKOFF", "60"))
+FETCH_RETRY_BACKOFF_MAX: int = int(os.getenv("FETCH_RETRY_BACKOFF_MAX", "3600"))
+
+# путь к файлу манифеста сбора данных (сведения о получении каждого ресурса)
+MANIFEST_PATH: str = os.getenv("MANIFEST_PATH", f"{MEDIA_PATH}/manifest.json")
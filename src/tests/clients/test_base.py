@@ -0,0 +1,141 @@
+"""
+Тестирование базовых функций клиентов.
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from clients.base import BaseClient
+from clients.country import CountryClient
+from clients.resilience import CircuitOpenError, parse_retry_after, retry_delay
+from clients.weather import WeatherClient
+
+
+@pytest.mark.asyncio
+class TestBaseClient:
+    """
+    Тестирование общей HTTP-сессии клиентов.
+    """
+
+    async def test_session_shared(self):
+        try:
+            session = await CountryClient().get_session()
+            assert await WeatherClient().get_session() is session
+            assert session.connector.limit_per_host > 0
+        finally:
+            await BaseClient.close_session()
+
+        assert session.closed
+
+    async def test_session_recreated_after_close(self):
+        try:
+            session = await BaseClient.get_session()
+            await BaseClient.close_session()
+            assert await BaseClient.get_session() is not session
+        finally:
+            await BaseClient.close_session()
+
+
+@pytest.mark.asyncio
+class TestBaseClientResilience:
+    """
+    Тестирование повторов запросов и автоматического выключателя.
+    """
+
+    @pytest.fixture
+    async def server(self, aiohttp_server, monkeypatch):
+        monkeypatch.setattr("clients.base.HTTP_RETRIES", 2)
+        monkeypatch.setattr("clients.base.HTTP_BREAKER_THRESHOLD", 2)
+        monkeypatch.setattr("clients.resilience.HTTP_RETRY_BACKOFF", 0.01)
+        # ответы сервера по порядку (после исчерпания – последний)
+        responses = []
+        requests = []
+
+        async def handler(request):
+            requests.append(request)
+            status, headers, delay = responses[min(len(requests), len(responses)) - 1]
+            await asyncio.sleep(delay)
+            return web.json_response({"status": status}, status=status, headers=headers)
+
+        app = web.Application()
+        app.router.add_get("/", handler)
+        server = await aiohttp_server(app)
+        server.responses = responses
+        server.requests = requests
+        yield server
+        await BaseClient.close_session()
+        BaseClient._breakers.clear()
+
+    @pytest.fixture
+    def client(self, server):
+        return WeatherClient()
+
+    async def test_retry_server_error(self, server, client):
+        server.responses.extend([(503, {"Retry-After": "0"}, 0), (200, {}, 0)])
+
+        response = await client._get(str(server.make_url("/")))
+
+        assert response.status == 200
+        assert len(server.requests) == 2
+
+    async def test_retry_exhausted(self, server, client):
+        server.responses.append((500, {}, 0))
+
+        response = await client._get(str(server.make_url("/")))
+
+        assert response.status == 500
+        assert len(server.requests) == 3
+
+    async def test_retry_after_too_long(self, server, client):
+        server.responses.append((429, {"Retry-After": "3600"}, 0))
+
+        response = await client._get(str(server.make_url("/")))
+
+        assert response.status == 429
+        assert len(server.requests) == 1
+
+    async def test_read_timeout(self, server, client, monkeypatch):
+        monkeypatch.setattr("clients.base.HTTP_READ_TIMEOUT", 0.05)
+        server.responses.append((200, {}, 0.5))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await client._get(str(server.make_url("/")))
+        assert len(server.requests) == 3
+
+    async def test_circuit_breaker(self, server, client, monkeypatch):
+        monkeypatch.setattr("clients.base.HTTP_RETRIES", 0)
+        server.responses.extend([(503, {}, 0), (503, {}, 0), (200, {}, 0)])
+        url = str(server.make_url("/"))
+
+        assert (await client._get(url)).status == 503
+        assert (await client._get(url)).status == 503
+        # после двух неудач подряд запросы к хосту не выполняются
+        with pytest.raises(CircuitOpenError):
+            await client._get(url)
+        assert len(server.requests) == 2
+
+        # по истечении паузы выполняется пробный запрос, и выключатель замыкается
+        breaker = BaseClient.get_breaker(url)
+        breaker.opened_at -= breaker.reset_timeout
+        assert (await client._get(url)).status == 200
+        assert breaker.closed
+
+
+class TestRetryDelay:
+    """
+    Тестирование расчета задержки перед повторным запросом.
+    """
+
+    def test_backoff(self, monkeypatch):
+        monkeypatch.setattr("clients.resilience.HTTP_RETRY_BACKOFF", 1)
+        monkeypatch.setattr("clients.resilience.HTTP_RETRY_BACKOFF_MAX", 5)
+
+        assert 0 <= retry_delay(0) <= 1
+        assert 0 <= retry_delay(10) <= 5
+
+    def test_retry_after(self):
+        assert retry_delay(0, "2") == 2
+        assert retry_delay(0, "Wed, 21 Oct 2015 07:28:00 GMT") == 0
+        assert parse_retry_after("invalid") is None
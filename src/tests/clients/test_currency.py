@@ -1,3 +1,62 @@
 """
 Тестирование функций клиента для получения информации о курсах валют.
 """
+
+import pytest
+from aiohttp import hdrs, web
+
+from clients.base import BaseClient
+from clients.currency import CurrencyClient
+from tests.conftest import CURRENCY_RATES
+
+
+@pytest.mark.asyncio
+class TestClientCurrency:
+    """
+    Тестирование клиента для получения информации о курсах валют.
+    """
+
+    etag = '"rates-2022-09-14"'
+
+    @pytest.fixture
+    async def server(self, aiohttp_server):
+        requests = []
+
+        async def handler(request):
+            requests.append(request)
+            if request.headers.get(hdrs.IF_NONE_MATCH) == self.etag:
+                return web.Response(status=304)
+
+            response = web.json_response(CURRENCY_RATES, headers={"ETag": self.etag})
+            response.enable_compression()
+            return response
+
+        app = web.Application()
+        app.router.add_get("/fixer/latest", handler)
+        server = await aiohttp_server(app)
+        server.requests = requests
+        yield server
+        await BaseClient.close_session()
+
+    @pytest.fixture
+    def client(self, server, mocker):
+        client = CurrencyClient()
+        mocker.patch.object(
+            client, "get_base_url", return_value=str(server.make_url("/fixer/latest"))
+        )
+        return client
+
+    async def test_get_rates(self, server, client):
+        response = await client.get_rates()
+
+        assert response.data == CURRENCY_RATES
+        assert response.etag == self.etag
+        assert "gzip" in server.requests[0].headers[hdrs.ACCEPT_ENCODING]
+        assert server.requests[0].query["base"] == "rub"
+
+    async def test_get_rates_not_modified(self, client):
+        response = await client.get_rates(etag=self.etag)
+
+        assert response.not_modified
+        assert response.data is None
+        assert response.etag == self.etag
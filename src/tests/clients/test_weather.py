@@ -1,3 +1,72 @@
 """
 Тестирование функций клиента для получения информации о погоде.
 """
+
+import pytest
+from aiohttp import web
+
+from clients.base import BaseClient
+from clients.weather import WeatherClient
+from tests.conftest import WEATHER
+
+
+@pytest.mark.asyncio
+class TestClientWeather:
+    """
+    Тестирование клиента для получения информации о погоде.
+    """
+
+    @pytest.fixture
+    async def server(self, aiohttp_server):
+        requests = []
+
+        async def weather(request):
+            requests.append(request)
+            return web.json_response(WEATHER)
+
+        async def group(request):
+            requests.append(request)
+            ids = request.query["id"].split(",")
+            return web.json_response(
+                {
+                    "cnt": len(ids),
+                    "list": [{**WEATHER, "id": int(city_id)} for city_id in ids],
+                }
+            )
+
+        app = web.Application()
+        app.router.add_get("/data/2.5/weather", weather)
+        app.router.add_get("/data/2.5/group", group)
+        server = await aiohttp_server(app)
+        server.requests = requests
+        yield server
+        await BaseClient.close_session()
+
+    @pytest.fixture
+    def client(self, server, mocker):
+        client = WeatherClient()
+        mocker.patch.object(
+            client, "get_base_url", return_value=str(server.make_url("/data/2.5"))
+        )
+        return client
+
+    async def test_get_weather(self, server, client):
+        response = await client.get_weather("Paris,FR")
+
+        assert response.data == WEATHER
+        assert server.requests[0].query["q"] == "Paris,FR"
+        assert "appid" not in response.url
+
+    async def test_get_weather_by_coordinates(self, server, client):
+        response = await client.get_weather_by_coordinates(46.0, 2.0)
+
+        assert response.data == WEATHER
+        assert server.requests[0].query["lat"] == "46.0"
+        assert server.requests[0].query["lon"] == "2.0"
+        assert "q" not in server.requests[0].query
+
+    async def test_get_weather_group(self, server, client):
+        response = await client.get_weather_group([2988507, 2950159])
+
+        assert [item["id"] for item in response.data["list"]] == [2988507, 2950159]
+        assert len(server.requests) == 1
@@ -1,3 +1,195 @@
 """
 Тестирование функций сбора информации о странах.
 """
+
+import json
+
+import pytest
+
+from clients.models import ResponseDTO
+from collectors.collector import CountryCollector, CurrencyRatesCollector
+from collectors.manifest import Manifest
+from tests.conftest import COUNTRIES
+
+
+@pytest.mark.asyncio
+class TestCountryCollectorRead:
+    """
+    Тестирование чтения кэша данных о странах.
+    """
+
+    async def test_read_cached(self, media_cache):
+        countries = await CountryCollector.read()
+
+        assert [country.alpha2code for country in countries] == [
+            item["alpha2code"] for item in COUNTRIES
+        ]
+        # пока файл не изменился, повторное чтение возвращает уже разобранные объекты
+        assert await CountryCollector.read() is countries
+        assert (
+            await CurrencyRatesCollector.read() is await CurrencyRatesCollector.read()
+        )
+
+    async def test_read_invalidated(self, media_cache):
+        countries = await CountryCollector.read()
+        (media_cache / "country.json").write_text(json.dumps(COUNTRIES[:1]))
+
+        assert len(await CountryCollector.read()) == 1
+        assert await CountryCollector.read() is not countries
+
+    async def test_read_trusted(self, media_cache, monkeypatch):
+        trusted = await CountryCollector.read()
+        monkeypatch.setattr("collectors.collector.CACHE_TRUSTED", False)
+        CountryCollector.read_cache.clear()
+
+        # модели, созданные без валидации, совпадают с проверенными
+        assert [country.__dict__ for country in await CountryCollector.read()] == [
+            country.__dict__ for country in trusted
+        ]
+
+
+@pytest.mark.asyncio
+class TestCountryCollector:
+    """
+    Тестирование сбора информации о странах нескольких регионов.
+    """
+
+    @pytest.fixture
+    def collector(self, media_path, monkeypatch, mocker):
+        monkeypatch.setattr("collectors.collector.COUNTRY_BLOCS", ["eu", "efta"])
+        collector = CountryCollector(Manifest(str(media_path / "manifest.json")))
+        mocker.patch.object(collector.client, "get_countries")
+        return collector
+
+    @staticmethod
+    def respond(collector, responses):
+        """
+        Ответы сервиса для каждого региона по порядку запросов
+        (регионы запрашиваются параллельно, поэтому порядок между ними не определен).
+        """
+
+        responses = {bloc: iter(items) for bloc, items in responses.items()}
+
+        async def get_countries(bloc, **kwargs):
+            return next(responses[bloc])
+
+        collector.client.get_countries.side_effect = get_countries
+
+    async def test_collect_merged(self, collector):
+        paris = COUNTRIES[1]
+        self.respond(
+            collector,
+            {
+                "eu": [ResponseDTO(url="", status=200, data=COUNTRIES[:3])],
+                "efta": [ResponseDTO(url="", status=200, data=[COUNTRIES[3], paris])],
+            },
+        )
+
+        locations = await collector.collect()
+
+        # страна из нескольких регионов сохраняется один раз
+        assert {location.alpha2code for location in locations} == {
+            "AX",
+            "FR",
+            "DE",
+            "CH",
+        }
+        store = await CountryCollector.read_store()
+        assert store.get("fr").blocs == ["eu", "efta"]
+        assert store.get("CH").blocs == ["efta"]
+        assert store.get("GB") is None
+        assert collector.manifest.get("country/efta").fetched_at > 0
+
+    async def test_collect_bloc_failed(self, collector):
+        self.respond(
+            collector,
+            {
+                "eu": [
+                    ResponseDTO(url="", status=200, data=COUNTRIES[:3]),
+                    ResponseDTO(url="", status=500),
+                ],
+                "efta": [
+                    ResponseDTO(url="", status=200, data=[COUNTRIES[3], COUNTRIES[1]]),
+                    ResponseDTO(url="", status=200, data=[COUNTRIES[3]]),
+                ],
+            },
+        )
+        await collector.collect()
+        for bloc in ("eu", "efta"):
+            collector.manifest.entries[f"country/{bloc}"].fetched_at = 0
+        await collector.collect()
+
+        # данные региона, которые не удалось обновить, остаются в кэше
+        store = await CountryCollector.read_store()
+        assert [country.alpha2code for country in store.countries] == [
+            "AX",
+            "FR",
+            "DE",
+            "CH",
+        ]
+        assert store.get("FR").blocs == ["eu"]
+        assert collector.manifest.get("country/eu").error == "HTTP 500"
+
+    async def test_collect_bloc_readded(self, collector, monkeypatch):
+        self.respond(
+            collector,
+            {
+                "eu": [ResponseDTO(url="", status=200, data=COUNTRIES[:3])],
+                "efta": [
+                    ResponseDTO(url="", status=200, data=[COUNTRIES[3]]),
+                    ResponseDTO(url="", status=200, data=[COUNTRIES[3]]),
+                ],
+            },
+        )
+        await collector.collect()
+
+        # регион исключен из списка: его страны удаляются из кэша при обновлении
+        monkeypatch.setattr("collectors.collector.COUNTRY_BLOCS", ["efta"])
+        collector.manifest.entries["country/efta"].fetched_at = 0
+        await collector.collect()
+        assert collector.manifest.get("country/eu") is None
+
+        # после возвращения региона в список его данные запрашиваются заново
+        collector.client.get_countries.side_effect = None
+        collector.client.get_countries.return_value = ResponseDTO(
+            url="", status=200, data=COUNTRIES[:3]
+        )
+        monkeypatch.setattr("collectors.collector.COUNTRY_BLOCS", ["eu", "efta"])
+        await collector.collect()
+
+        assert collector.client.get_countries.call_args.args == ("eu",)
+        store = await CountryCollector.read_store()
+        assert {country.alpha2code for country in store.countries} == {
+            "AX",
+            "FR",
+            "DE",
+            "CH",
+        }
+
+    async def test_collect_not_modified_missing(self, collector):
+        for bloc in ("eu", "efta"):
+            collector.manifest.record_success(
+                f"country/{bloc}", ResponseDTO(url="", status=200, etag='"1"')
+            )
+        self.respond(
+            collector,
+            {
+                "eu": [
+                    ResponseDTO(url="", status=304),
+                    ResponseDTO(url="", status=200, data=COUNTRIES[:3]),
+                ],
+                "efta": [
+                    ResponseDTO(url="", status=304),
+                    ResponseDTO(url="", status=200, data=[COUNTRIES[3]]),
+                ],
+            },
+        )
+
+        # файла кэша нет, поэтому ответы 304 приводят к повторным безусловным запросам
+        locations = await collector.collect()
+
+        assert len(locations) == 4
+        assert collector.client.get_countries.call_count == 4
+        assert all(
+            call.kwargs == {} for call in collector.client.get_countries.call_args_list
+        )
@@ -1,3 +1,40 @@
 """
 Тестирование функций сбора информации о курсах валют.
 """
+
+import pytest
+
+from clients.models import ResponseDTO
+from collectors.collector import CurrencyRatesCollector
+from collectors.manifest import Manifest
+from tests.conftest import CURRENCY_RATES
+
+
+@pytest.mark.asyncio
+class TestCurrencyRatesCollector:
+    """
+    Тестирование сборщика информации о курсах валют.
+    """
+
+    async def test_collect_invalid(self, media_path, mocker):
+        manifest = Manifest(str(media_path / "manifest.json"))
+        collector = CurrencyRatesCollector(manifest)
+        mocker.patch.object(
+            collector.client,
+            "get_rates",
+            side_effect=[
+                ResponseDTO(url="", status=200, data=CURRENCY_RATES),
+                ResponseDTO(
+                    url="", status=200, data={**CURRENCY_RATES, "rates": {"EUR": "n/a"}}
+                ),
+            ],
+        )
+        await collector.collect()
+        manifest.entries["currency_rates.json"].fetched_at = 0
+        await collector.collect()
+
+        # некорректные данные не попадают в кэш, неудача фиксируется в манифесте
+        assert (await CurrencyRatesCollector.read()).rates == CURRENCY_RATES["rates"]
+        assert (
+            "Некорректные данные" in collector.manifest.get("currency_rates.json").error
+        )
@@ -0,0 +1,210 @@
+"""
+Тестирование манифеста сбора данных.
+"""
+
+import asyncio
+import os
+import time
+
+import aiofiles.os
+import pytest
+
+from clients.models import ResponseDTO
+from collectors.collector import Collectors, CurrencyRatesCollector, WeatherCollector
+from collectors.manifest import Manifest
+from collectors.models import LocationDTO
+from tests.conftest import CURRENCY_RATES
+
+
+@pytest.mark.asyncio
+class TestManifest:
+    """
+    Тестирование манифеста сбора данных.
+    """
+
+    response = ResponseDTO(
+        url="https://api.apilayer.com/fixer/latest?base=rub",
+        status=200,
+        data=CURRENCY_RATES,
+        size=87,
+        etag='"5f3b1c"',
+    )
+
+    @pytest.fixture
+    def manifest(self, tmp_path):
+        return Manifest(str(tmp_path / "manifest.json"))
+
+    async def test_stale(self, manifest):
+        assert manifest.stale("currency_rates.json", 60) is None
+
+        manifest.record_success("currency_rates.json", self.response)
+        fetched_at = manifest.get("currency_rates.json").fetched_at
+        assert manifest.stale("currency_rates.json", 60, now=fetched_at + 30) is False
+        assert manifest.stale("currency_rates.json", 60, now=fetched_at + 61) is True
+
+    async def test_failure_backoff(self, manifest, monkeypatch):
+        monkeypatch.setattr("collectors.manifest.FETCH_RETRY_BACKOFF", 10)
+        monkeypatch.setattr("collectors.manifest.FETCH_RETRY_BACKOFF_MAX", 25)
+
+        manifest.record_failure("country.json", "HTTP 500")
+        entry = manifest.get("country.json")
+        assert manifest.stale("country.json", 60, now=entry.failed_at + 5) is False
+        assert manifest.stale("country.json", 60, now=entry.failed_at + 11) is True
+
+        # задержка удваивается после каждой неудачи, но не превышает максимальную
+        manifest.record_failure("country.json", "HTTP 500")
+        manifest.record_failure("country.json", "HTTP 500")
+        entry = manifest.get("country.json")
+        assert entry.failures == 3
+        assert Manifest.retry_at(entry) == entry.failed_at + 25
+
+        # успешный запрос сбрасывает счетчик неудач
+        manifest.record_success("country.json", self.response)
+        assert manifest.get("country.json").failures == 0
+
+    async def test_save_load(self, manifest):
+        manifest.record_success("currency_rates.json", self.response)
+        manifest.record_failure("weather/paris_fr", "HTTP 500")
+        await manifest.save()
+
+        loaded = await Manifest.load(manifest.path)
+        assert loaded.entries == manifest.entries
+        assert "appid" not in loaded.get("currency_rates.json").url
+
+    async def test_save_merge(self, manifest):
+        other = await Manifest.load(manifest.path)
+        manifest.record_success("currency_rates.json", self.response)
+        await manifest.save()
+
+        # каждый процесс сохраняет только свои изменения
+        other.record_failure("weather/paris_fr", "HTTP 500")
+        await other.save()
+        await manifest.reload()
+
+        assert set(manifest.entries) == {"currency_rates.json", "weather/paris_fr"}
+        assert (await Manifest.load(manifest.path)).entries == manifest.entries
+
+    async def test_collector_uses_manifest(self, media_path, manifest, mocker):
+        collector = CurrencyRatesCollector(manifest)
+        mocker.patch.object(collector.client, "get_rates", return_value=self.response)
+
+        await collector.collect()
+        assert collector.client.get_rates.call_count == 1
+        assert manifest.get("currency_rates.json").etag == '"5f3b1c"'
+        # матрица кросс-курсов строится при сборе
+        assert (media_path / "currency_rates.bin").is_file()
+
+        # срок актуальности определяется по манифесту, а не по времени изменения файла
+        os.utime(media_path / "currency_rates.json", (0, 0))
+        await collector.collect()
+        assert collector.client.get_rates.call_count == 1
+        # для актуального по манифесту ресурса файл кэша не проверяется
+        isfile = mocker.spy(aiofiles.os.path, "isfile")
+        assert not await collector.cache_invalid()
+        isfile.assert_not_called()
+
+        # удаленный файл кэша получается заново до истечения срока актуальности
+        (media_path / "currency_rates.json").unlink()
+        await collector.collect()
+        assert collector.client.get_rates.call_count == 2
+        assert (media_path / "currency_rates.json").is_file()
+
+    async def test_collector_records_failure(self, media_path, manifest, mocker):
+        collector = CurrencyRatesCollector(manifest)
+        mocker.patch.object(
+            collector.client, "get_rates", side_effect=OSError("network")
+        )
+
+        await collector.collect()
+        await collector.collect()
+
+        # повторный запрос к недоступному сервису откладывается
+        assert collector.client.get_rates.call_count == 1
+        assert "network" in manifest.get("currency_rates.json").error
+
+    async def test_collector_not_modified(self, media_path, manifest, mocker):
+        collector = CurrencyRatesCollector(manifest)
+        mocker.patch.object(
+            collector.client,
+            "get_rates",
+            side_effect=[self.response, ResponseDTO(url="", status=304)],
+        )
+        await collector.collect()
+        mtime = (media_path / "currency_rates.json").stat().st_mtime_ns
+
+        # срок актуальности истек, выполняется условный запрос
+        entry = manifest.get("currency_rates.json")
+        manifest.entries["currency_rates.json"] = entry.copy(update={"fetched_at": 0})
+        await collector.collect()
+
+        collector.client.get_rates.assert_called_with(etag='"5f3b1c"')
+        assert (media_path / "currency_rates.json").stat().st_mtime_ns == mtime
+        assert manifest.get("currency_rates.json").fetched_at > 0
+        assert manifest.get("currency_rates.json").size == self.response.size
+
+    async def test_collector_not_modified_missing(self, media_path, manifest, mocker):
+        collector = CurrencyRatesCollector(manifest)
+        mocker.patch.object(
+            collector.client,
+            "get_rates",
+            side_effect=[ResponseDTO(url="", status=304), self.response],
+        )
+        manifest.record_success("currency_rates.json", self.response)
+        manifest.entries["currency_rates.json"].fetched_at = 0
+
+        # файл кэша пустой, поэтому условный запрос не выполняется,
+        # а ответ 304 приводит к повторному безусловному запросу
+        (media_path / "currency_rates.json").write_bytes(b"")
+        await collector.collect()
+
+        assert collector.client.get_rates.call_args_list[0].kwargs == {}
+        assert collector.client.get_rates.call_count == 2
+        assert (await CurrencyRatesCollector.read()).base == CURRENCY_RATES["base"]
+
+    async def test_next_run(self, manifest, monkeypatch):
+        locations = [LocationDTO(capital="Paris", alpha2code="FR")]
+        monkeypatch.setattr("collectors.collector.COUNTRY_BLOCS", ["eu"])
+        for resource in ("country/eu", "currency_rates.json", "weather/paris_fr"):
+            manifest.record_success(resource, self.response)
+        fetched_at = manifest.get("weather/paris_fr").fetched_at
+
+        # первым истекает срок актуальности данных о погоде
+        assert (
+            await Collectors.get_next_run(manifest, locations)
+            == fetched_at + await WeatherCollector.get_cache_ttl()
+        )
+
+        # данные о погоде для новой локации нужно получить сразу
+        locations.append(LocationDTO(capital="Rome", alpha2code="IT"))
+        assert await Collectors.get_next_run(manifest, locations) <= time.time()
+
+    async def test_serve(self, media_path, monkeypatch, mocker):
+        monkeypatch.setattr(
+            "collectors.collector.MANIFEST_PATH", str(media_path / "manifest.json")
+        )
+        # ошибка в первом цикле не останавливает службу
+        cycle = mocker.patch.object(
+            Collectors, "cycle", side_effect=[OSError("disk full"), frozenset()]
+        )
+        mocker.patch.object(
+            Collectors, "get_next_run", side_effect=lambda *args: time.time() + 3600
+        )
+        close_session = mocker.patch("clients.base.BaseClient.close_session")
+        monkeypatch.setattr("collectors.collector.COLLECT_MIN_INTERVAL", 60)
+        delays = []
+
+        async def sleep(delay):
+            delays.append(delay)
+            if len(delays) == 2:
+                raise asyncio.CancelledError
+
+        mocker.patch("collectors.collector.asyncio.sleep", side_effect=sleep)
+
+        with pytest.raises(asyncio.CancelledError):
+            await Collectors.serve()
+
+        # сборщики ожидают истечения срока актуальности, а не запускаются каждую минуту
+        assert cycle.call_count == 2
+        assert delays[0] == 60
+        assert delays[1] == pytest.approx(3600, abs=1)
+        close_session.assert_called_once()
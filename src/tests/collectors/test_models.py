@@ -0,0 +1,62 @@
+"""
+Тестирование моделей данных.
+"""
+
+import pytest
+
+from collectors.collector import CountryCollector
+from collectors.models import (
+    INTERN_CACHE_SIZE,
+    CurrencyInfoDTO,
+    LanguagesInfoDTO,
+    LocationDTO,
+    _intern,
+)
+
+
+class TestHashableBaseModel:
+    """
+    Тестирование хэшируемых моделей.
+    """
+
+    def test_immutable(self):
+        location = LocationDTO(capital="Paris", alpha2code="FR")
+
+        with pytest.raises(TypeError):
+            location.capital = "Lyon"
+
+    def test_hash(self):
+        location = LocationDTO(capital="Paris", alpha2code="FR")
+
+        assert hash(location) == hash(LocationDTO(capital="Paris", alpha2code="FR"))
+        assert location._hash == hash(location)
+        assert LocationDTO.construct(capital="Paris", alpha2code="FR") in {location}
+        # модели разных классов с одинаковыми значениями не равны
+        assert CurrencyInfoDTO(code="FR") != LanguagesInfoDTO(
+            name="FR", native_name="FR"
+        )
+
+    def test_copy_hash(self):
+        location = LocationDTO(capital="Paris", alpha2code="FR")
+        hash(location)
+        copy = location.copy(update={"capital": "Lyon"})
+
+        # хэш копии соответствует ее значениям, а не значениям исходной модели
+        assert copy == LocationDTO(capital="Lyon", alpha2code="FR")
+        assert copy in {LocationDTO(capital="Lyon", alpha2code="FR")}
+
+    def test_intern(self):
+        currency = CurrencyInfoDTO.intern(code="EUR")
+
+        assert CurrencyInfoDTO.intern(code="EUR") is currency
+        assert CurrencyInfoDTO.intern(code="CHF") is not currency
+        assert currency == CurrencyInfoDTO(code="EUR")
+        # количество общих экземпляров ограничено
+        assert _intern.cache_info().maxsize == INTERN_CACHE_SIZE
+
+    async def test_countries_share_currencies(self, media_cache):
+        countries = {item.alpha2code: item for item in await CountryCollector.read()}
+        (france,) = countries["FR"].currencies
+        (germany,) = countries["DE"].currencies
+
+        assert france is germany
@@ -0,0 +1,38 @@
+"""
+Тестирование сериализации данных кэша.
+"""
+
+import pytest
+
+from benchmarks.serialization import run
+from collectors import serialization
+from tests.conftest import COUNTRIES
+
+
+class TestSerialization:
+    """
+    Тестирование библиотек сериализации.
+    """
+
+    @pytest.mark.parametrize("name", list(serialization.get_backends()))
+    def test_round_trip(self, name):
+        backend = serialization.get_backend(name)
+        content = backend.dumps(COUNTRIES)
+
+        assert isinstance(content, bytes)
+        assert backend.loads(content) == COUNTRIES
+        assert backend.loads(content.decode()) == COUNTRIES
+        # содержимое, записанное другой библиотекой, читается без изменений
+        assert serialization.JSONBackend.loads(content) == COUNTRIES
+
+    def test_get_backend(self):
+        assert serialization.get_backend("json") is serialization.JSONBackend
+        with pytest.raises(ValueError):
+            serialization.get_backend("unknown")
+
+    def test_benchmark(self):
+        result = run(repeat=1, sizes=[5])
+
+        assert {item["backend"] for item in result["results"]} == set(
+            serialization.get_backends()
+        )
@@ -1,3 +1,258 @@
 """
 Тестирование функций сбора информации о погоде.
 """
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from tests.conftest import WEATHER
+
+from clients.models import ResponseDTO
+from collectors.base import RateLimiter
+from collectors.manifest import Manifest
+from collectors.collector import WeatherCollector
+from collectors.models import CollectStatus, LocationDTO
+from collectors.storage import SQLiteWeatherStorage
+
+
+@pytest.mark.asyncio
+class TestWeatherCollector:
+    """
+    Тестирование сборщика информации о погоде.
+    """
+
+    locations = frozenset(
+        LocationDTO(capital=capital, alpha2code=code)
+        for capital, code in (("Mariehamn", "AX"), ("Paris", "FR"), ("Rome", "IT"))
+    )
+
+    @pytest.fixture(params=["files", "sqlite"])
+    def collector(self, request, media_path, monkeypatch):
+        monkeypatch.setattr("collectors.collector.WEATHER_STORAGE", request.param)
+        monkeypatch.setattr("collectors.collector.WEATHER_CONCURRENCY", 2)
+        collector = WeatherCollector()
+        collector.limiter = RateLimiter(0)
+        return collector
+
+    async def test_collect_concurrently(self, collector, mocker):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def get_weather(location):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if location.startswith("Rome"):
+                return ResponseDTO(url=location, status=404)
+
+            return ResponseDTO(
+                url=location, status=200, data={**WEATHER, "name": location}
+            )
+
+        mocker.patch.object(collector.client, "get_weather", side_effect=get_weather)
+        results = await collector.collect(self.locations)
+
+        assert max_in_flight == 2
+        statuses = {item.location.capital: item.status for item in results}
+        assert statuses == {
+            "Mariehamn": CollectStatus.FETCHED,
+            "Paris": CollectStatus.FETCHED,
+            "Rome": CollectStatus.FAILED,
+        }
+
+        # повторный сбор использует кэш для успешно обновленных локаций
+        results = await collector.collect(self.locations)
+        statuses = {item.location.capital: item.status for item in results}
+        assert statuses["Paris"] == CollectStatus.CACHED
+        assert statuses["Rome"] == CollectStatus.FAILED
+
+    async def test_read(self, collector, mocker):
+        mocker.patch.object(
+            collector.client,
+            "get_weather",
+            return_value=ResponseDTO(url="", status=200, data=WEATHER),
+        )
+        await collector.collect(self.locations)
+
+        weather = await WeatherCollector.read(
+            LocationDTO(capital="Paris", alpha2code="FR")
+        )
+        assert weather.temp == WEATHER["main"]["temp"]
+        assert (
+            await WeatherCollector.read(LocationDTO(capital="Oslo", alpha2code="NO"))
+            is None
+        )
+
+    async def test_collect_error_isolated(self, collector, mocker):
+        mocker.patch.object(
+            collector.client, "get_weather", side_effect=OSError("network")
+        )
+        results = await collector.collect(self.locations)
+
+        assert {item.status for item in results} == {CollectStatus.FAILED}
+        assert all("network" in item.error for item in results)
+
+    async def test_rate_limiter(self):
+        limiter = RateLimiter(100)
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+
+        assert time.monotonic() - start >= 0.04
+
+    async def test_collect_not_modified_missing(self, collector, mocker, tmp_path):
+        collector.manifest = Manifest(str(tmp_path / "manifest.json"))
+        location = LocationDTO(capital="Paris", alpha2code="FR")
+        collector.manifest.record_success(
+            "weather/paris_fr", ResponseDTO(url="", status=200, etag='"1"')
+        )
+        collector.manifest.entries["weather/paris_fr"].fetched_at = 0
+        mocker.patch.object(
+            collector.client,
+            "get_weather",
+            side_effect=[
+                ResponseDTO(url="", status=304),
+                ResponseDTO(url="", status=200, data=WEATHER),
+            ],
+        )
+
+        # данных в хранилище нет, поэтому ответ 304 приводит к безусловному запросу
+        (result,) = await collector.collect(frozenset({location}))
+
+        assert result.status == CollectStatus.FETCHED
+        assert collector.client.get_weather.call_args_list[0].kwargs == {"etag": '"1"'}
+        assert collector.client.get_weather.call_args_list[1].kwargs == {}
+        assert (await WeatherCollector.read(location)).temp == WEATHER["main"]["temp"]
+
+    async def test_collect_missing_fresh(self, collector, mocker, tmp_path):
+        collector.manifest = Manifest(str(tmp_path / "manifest.json"))
+        location = LocationDTO(capital="Paris", alpha2code="FR")
+        collector.manifest.record_success(
+            "weather/paris_fr", ResponseDTO(url="", status=200)
+        )
+        collector.manifest.record_success(
+            "weather/rome_it", ResponseDTO(url="", status=200)
+        )
+        collector.manifest.record_failure("weather/rome_it", "HTTP 500")
+        mocker.patch.object(
+            collector.client,
+            "get_weather",
+            return_value=ResponseDTO(url="", status=200, data=WEATHER),
+        )
+
+        # по манифесту данные актуальны, но в хранилище их нет
+        results = await collector.collect(
+            frozenset({location, LocationDTO(capital="Rome", alpha2code="IT")})
+        )
+
+        # повтор запроса после ошибки откладывается, даже если данных нет
+        assert {item.location.capital: item.status for item in results} == {
+            "Paris": CollectStatus.FETCHED,
+            "Rome": CollectStatus.CACHED,
+        }
+        assert (await WeatherCollector.read(location)).temp == WEATHER["main"]["temp"]
+
+    async def test_collect_groups(self, collector, mocker, tmp_path, monkeypatch):
+        monkeypatch.setattr("collectors.collector.WEATHER_GROUP_SIZE", 2)
+        collector.manifest = Manifest(str(tmp_path / "manifest.json"))
+        locations = {
+            LocationDTO(capital=capital, alpha2code=code, latitude=lat, longitude=lon)
+            for capital, code, lat, lon in (
+                ("Mariehamn", "AX", 60.1, 19.9),
+                ("Paris", "FR", 46.0, 2.0),
+                ("Berlin", "DE", 51.0, 9.0),
+                ("Rome", "IT", 41.9, 12.5),
+            )
+        }
+        # идентификаторы городов известны после первого сбора
+        for key, city_id in (("mariehamn_ax", 1), ("paris_fr", 2), ("berlin_de", 3)):
+            collector.manifest.record_success(
+                f"weather/{key}", ResponseDTO(url="", status=200), city_id=city_id
+            )
+            collector.manifest.entries[f"weather/{key}"].fetched_at = 0
+
+        # в ответе группового запроса часовой пояс передается в разделе sys
+        group_item = {key: value for key, value in WEATHER.items() if key != "timezone"}
+
+        async def get_weather_group(city_ids):
+            # сервис не вернул данные для города с идентификатором 3,
+            # а данные для города с идентификатором 2 некорректны
+            return ResponseDTO(
+                url="",
+                status=200,
+                data={
+                    "list": [
+                        {**group_item, "id": city_id, "sys": {"timezone": 3600}}
+                        if city_id != 2
+                        else {"id": city_id}
+                        for city_id in city_ids
+                        if city_id != 3
+                    ]
+                },
+            )
+
+        mocker.patch.object(
+            collector.client, "get_weather_group", side_effect=get_weather_group
+        )
+        mocker.patch.object(
+            collector.client,
+            "get_weather_by_coordinates",
+            return_value=ResponseDTO(url="", status=200, data={**WEATHER, "id": 4}),
+        )
+        mocker.patch.object(collector.client, "get_weather")
+
+        results = await collector.collect(frozenset(locations))
+
+        assert {item.status for item in results} == {CollectStatus.FETCHED}
+        assert collector.client.get_weather_group.call_count == 2
+        # по одному запрашиваются только город без идентификатора,
+        # а также пропущенный в группе и полученный в группе с ошибкой
+        assert sorted(
+            call.args for call in collector.client.get_weather_by_coordinates.mock_calls
+        ) == [(41.9, 12.5), (46.0, 2.0), (51.0, 9.0)]
+        collector.client.get_weather.assert_not_called()
+        assert collector.manifest.get("weather/rome_it").city_id == 4
+        weather = await WeatherCollector.read(
+            LocationDTO(capital="Mariehamn", alpha2code="AX")
+        )
+        assert weather.offset_seconds == 3600
+        assert collector.manifest.get("weather/paris_fr").failures == 0
+
+
+@pytest.mark.asyncio
+class TestSQLiteWeatherStorage:
+    """
+    Тестирование хранилища данных о погоде в SQLite.
+    """
+
+    async def test_read_missing(self, tmp_path):
+        path = tmp_path / "weather.db"
+        storage = SQLiteWeatherStorage(str(path))
+
+        assert await storage.read("paris_fr", bytes) is None
+        assert await storage.stale(["paris_fr"], 60) == {"paris_fr"}
+        # чтение не создает базу данных
+        assert not path.exists()
+
+        await storage.save({"paris_fr": b"{}"})
+        assert await storage.read("paris_fr", bytes) == b"{}"
+        assert await storage.stale(["paris_fr"], 60) == set()
+
+    async def test_read_cached(self, tmp_path):
+        storage = SQLiteWeatherStorage(str(tmp_path / "weather.db"))
+        await storage.save({"paris_fr": b'{"temp": 1}'})
+
+        # пока база данных не изменилась, данные разбираются один раз,
+        # а для чтения используется одно подключение
+        first = await storage.read("paris_fr", json.loads)
+        connection = storage._reader
+        assert await storage.read("paris_fr", json.loads) is first
+        assert await storage.stale(["paris_fr"], 60) == set()
+        assert storage._reader is connection
+
+        await storage.save({"paris_fr": b'{"temp": 20}'})
+        assert await storage.read("paris_fr", json.loads) == {"temp": 20}
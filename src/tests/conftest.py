@@ -1,3 +1,186 @@
 """
 Фикстуры для моделей объектов.
 """
+
+import json
+
+import pytest
+
+from collectors.models import CountryDTO, CurrencyInfoDTO, LanguagesInfoDTO
+
+# данные о странах в формате ответа внешнего сервиса
+COUNTRIES = [
+    {
+        "capital": "Mariehamn",
+        "latitude": 60.116667,
+        "longitude": 19.9,
+        "alpha2code": "AX",
+        "alt_spellings": ["AX", "Aaland", "Aland", "Ahvenanmaa"],
+        "currencies": [{"code": "EUR", "name": "Euro", "symbol": "€"}],
+        "flag": "http://assets.promptapi.com/flags/AX.svg",
+        "languages": [{"name": "Swedish", "native_name": "svenska"}],
+        "name": "Åland Islands",
+        "area": 1580.0,
+        "population": 28875,
+        "subregion": "Northern Europe",
+        "timezones": ["UTC+02:00"],
+    },
+    {
+        "capital": "Paris",
+        "latitude": 46.0,
+        "longitude": 2.0,
+        "alpha2code": "FR",
+        "alt_spellings": ["FR", "French Republic", "République française"],
+        "currencies": [{"code": "EUR", "name": "Euro", "symbol": "€"}],
+        "flag": "http://assets.promptapi.com/flags/FR.svg",
+        "languages": [{"name": "French", "native_name": "français"}],
+        "name": "France",
+        "area": 640679.0,
+        "population": 66710000,
+        "subregion": "Western Europe",
+        "timezones": ["UTC-10:00", "UTC+01:00"],
+    },
+    {
+        "capital": "Berlin",
+        "latitude": 51.0,
+        "longitude": 9.0,
+        "alpha2code": "DE",
+        "alt_spellings": [
+            "DE",
+            "Federal Republic of Germany",
+            "Bundesrepublik Deutschland",
+        ],
+        "currencies": [{"code": "EUR", "name": "Euro", "symbol": "€"}],
+        "flag": "http://assets.promptapi.com/flags/DE.svg",
+        "languages": [{"name": "German", "native_name": "Deutsch"}],
+        "name": "Germany",
+        "area": 357114.0,
+        "population": 81770900,
+        "subregion": "Western Europe",
+        "timezones": ["UTC+01:00"],
+    },
+    {
+        "capital": "Bern",
+        "latitude": 47.0,
+        "longitude": 8.0,
+        "alpha2code": "CH",
+        "alt_spellings": ["CH", "Swiss Confederation", "Schweiz", "Suisse", "Svizzera"],
+        "currencies": [{"code": "CHF", "name": "Swiss franc", "symbol": "Fr"}],
+        "flag": "http://assets.promptapi.com/flags/CH.svg",
+        "languages": [
+            {"name": "German", "native_name": "Deutsch"},
+            {"name": "French", "native_name": "français"},
+            {"name": "Italian", "native_name": "Italiano"},
+        ],
+        "name": "Switzerland",
+        "area": 41284.0,
+        "population": 8341600,
+        "subregion": "Western Europe",
+        "timezones": ["UTC+01:00"],
+    },
+    {
+        "capital": "London",
+        "latitude": 54.0,
+        "longitude": -2.0,
+        "alpha2code": "GB",
+        "alt_spellings": ["GB", "UK", "Great Britain"],
+        "currencies": [{"code": "GBP", "name": "British pound", "symbol": "£"}],
+        "flag": "http://assets.promptapi.com/flags/GB.svg",
+        "languages": [{"name": "English", "native_name": "English"}],
+        "name": "United Kingdom of Great Britain and Northern Ireland",
+        "area": None,
+        "population": 65110000,
+        "subregion": "Northern Europe",
+        "timezones": ["UTC-08:00", "UTC+00:00"],
+    },
+]
+
+# данные о курсах валют в формате ответа внешнего сервиса
+CURRENCY_RATES = {
+    "success": True,
+    "base": "RUB",
+    "date": "2022-09-14",
+    "rates": {"EUR": 0.016503, "CHF": 0.015849, "GBP": 0.014316, "RUB": 1.0},
+}
+
+# данные о погоде в формате ответа внешнего сервиса
+WEATHER = {
+    "id": 2988507,
+    "main": {"temp": 13.92, "pressure": 1023, "humidity": 54},
+    "visibility": 10000,
+    "wind": {"speed": 4.63},
+    "weather": [{"description": "scattered clouds"}],
+    "timezone": 7200,
+}
+
+
+@pytest.fixture(autouse=True)
+def logging_path(tmp_path, monkeypatch):
+    """
+    Временная директория для выгрузки метрик вместо LOGGING_PATH.
+    """
+
+    path = tmp_path / "logs"
+    monkeypatch.setattr("metrics.LOGGING_PATH", str(path))
+
+    return path
+
+
+@pytest.fixture
+def media_path(tmp_path, monkeypatch):
+    """
+    Временная директория для сохранения файлов вместо MEDIA_PATH.
+    """
+
+    monkeypatch.setattr("collectors.collector.MEDIA_PATH", str(tmp_path))
+    monkeypatch.setattr("search.MEDIA_PATH", str(tmp_path))
+    monkeypatch.setattr("rates.MEDIA_PATH", str(tmp_path))
+    for module in ("collectors.collector", "reader"):
+        monkeypatch.setattr(f"{module}.MANIFEST_PATH", str(tmp_path / "manifest.json"))
+
+    return tmp_path
+
+
+@pytest.fixture
+def media_cache(media_path):
+    """
+    Заполненный кэш собранных данных.
+    """
+
+    (media_path / "country.json").write_text(json.dumps(COUNTRIES))
+    (media_path / "currency_rates.json").write_text(json.dumps(CURRENCY_RATES))
+    (media_path / "weather").mkdir()
+    for item in COUNTRIES:
+        filename = f"{item['capital']}_{item['alpha2code']}".lower()
+        (media_path / "weather" / f"{filename}.json").write_text(json.dumps(WEATHER))
+
+    return media_path
+
+
+@pytest.fixture
+def countries():
+    """
+    Данные о странах.
+    """
+
+    return [
+        CountryDTO(
+            capital=item["capital"],
+            capital_latitude=item["latitude"],
+            capital_longitude=item["longitude"],
+            alpha2code=item["alpha2code"],
+            alt_spellings=item["alt_spellings"],
+            currencies={
+                CurrencyInfoDTO(code=currency["code"])
+                for currency in item["currencies"]
+            },
+            flag=item["flag"],
+            languages={LanguagesInfoDTO(**language) for language in item["languages"]},
+            name=item["name"],
+            area=item["area"],
+            population=item["population"],
+            subregion=item["subregion"],
+            timezones=item["timezones"],
+        )
+        for item in COUNTRIES
+    ]
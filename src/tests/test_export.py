@@ -0,0 +1,88 @@
+"""
+Тестирование выгрузки собранной информации.
+"""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.startup import SRC_PATH
+from export import BaseExportWriter, XLSXWriter, export
+from reader import Reader
+
+
+@pytest.mark.asyncio
+class TestExport:
+    """
+    Тестирование выгрузки в разных форматах.
+    """
+
+    async def test_jsonl(self, media_cache, tmp_path):
+        path = tmp_path / "countries.jsonl"
+
+        assert await export(str(path), "jsonl", "EUR") == 5
+
+        items = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [item["location"]["alpha2code"] for item in items][:2] == ["AX", "FR"]
+        assert {item["currency"] for item in items} == {"EUR"}
+
+    async def test_csv(self, media_cache, tmp_path):
+        (media_cache / "weather" / "paris_fr.json").unlink()
+        path = tmp_path / "countries.csv"
+
+        assert await export(str(path), "csv") == 4
+
+        with open(path, encoding="utf-8", newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert "FR" not in {row["alpha2code"] for row in rows}
+        assert rows[0]["languages"] == "Swedish"
+        assert rows[0]["utc_offset"] == "UTC+2:00"
+
+    async def test_xlsx(self, media_cache, tmp_path):
+        openpyxl = pytest.importorskip("openpyxl")
+        path = tmp_path / "countries.xlsx"
+
+        assert await export(str(path), "xlsx") == 5
+
+        rows = list(openpyxl.load_workbook(path, read_only=True).active.values)
+        assert rows[0][0] == "alpha2code"
+        assert len(rows) == 6
+
+    async def test_xlsx_rows(self, media_cache, tmp_path):
+        writer = XLSXWriter(str(tmp_path / "countries.xlsx"))
+        items = [item async for batch in Reader().iter_all() for item in batch]
+
+        # заголовок добавляется только перед первой порцией строк
+        first, second = await writer.format(items[:2]), await writer.format(items[2:])
+        assert first[0][0] == "alpha2code"
+        assert len(first) == 3
+        assert len(second) == len(items) - 2
+
+    async def test_read_only(self, media_cache, tmp_path, mocker):
+        reader = mocker.patch("export.Reader", wraps=Reader)
+
+        await export(str(tmp_path / "countries.jsonl"), "jsonl")
+
+        # выгрузка не обращается к внешним сервисам даже при READ_THROUGH=1
+        assert reader.call_args.kwargs == {"read_through": False}
+
+    async def test_writer_abstract(self, tmp_path):
+        with pytest.raises(TypeError):
+            BaseExportWriter(str(tmp_path / "countries.txt"))  # type: ignore[abstract]
+
+    async def test_cli_logging(self, media_cache, tmp_path):
+        result = subprocess.run(
+            [sys.executable, "export.py", "--output", str(tmp_path / "out.jsonl")],
+            cwd=SRC_PATH,
+            env={**os.environ, "MEDIA_PATH": str(media_cache), "LOGGING_LEVEL": "INFO"},
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+        # уровень логирования задается точкой входа, а не импортом модулей клиентов
+        assert "Выгружено стран: 5" in result.stderr
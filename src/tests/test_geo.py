@@ -0,0 +1,91 @@
+"""
+Тестирование пространственного индекса столиц.
+"""
+
+import math
+import random
+
+import pytest
+
+from geo import EARTH_RADIUS_KM, GeoIndex
+
+
+def haversine(first, second):
+    """
+    Расстояние между точками по формуле гаверсинусов (в километрах).
+    """
+
+    (lat1, lon1), (lat2, lon2) = (map(math.radians, item) for item in (first, second))
+    value = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(value))
+
+
+class TestGeoIndex:
+    """
+    Тестирование поиска по координатам (результаты совпадают с перебором).
+    """
+
+    @pytest.fixture
+    def points(self):
+        generator = random.Random(1)
+        return [
+            (generator.uniform(-90, 90), generator.uniform(-180, 180))
+            for _ in range(500)
+        ]
+
+    @pytest.fixture
+    def targets(self):
+        generator = random.Random(2)
+        return [(0.0, 179.9), (89.9, 0.0)] + [
+            (generator.uniform(-90, 90), generator.uniform(-180, 180))
+            for _ in range(50)
+        ]
+
+    def test_nearest(self, points, targets):
+        index = GeoIndex.build(points)
+
+        for target in targets:
+            position, distance = index.nearest(*target)
+            expected = min(
+                range(len(points)), key=lambda i: haversine(target, points[i])
+            )
+            assert position == expected
+            assert distance == pytest.approx(haversine(target, points[expected]))
+
+    def test_iter_nearest(self, points, targets):
+        index = GeoIndex.build(points)
+
+        for target in targets[:10]:
+            found = list(index.iter_nearest(*target))
+            expected = sorted(
+                range(len(points)), key=lambda i: haversine(target, points[i])
+            )
+            assert [position for position, _ in found] == expected
+            assert found[0] == index.nearest(*target)
+
+    def test_within(self, points, targets):
+        index = GeoIndex.build(points)
+
+        for target in targets:
+            found = index.within(*target, 1500)
+            expected = sorted(
+                (haversine(target, point), position)
+                for position, point in enumerate(points)
+                if haversine(target, point) <= 1500
+            )
+            assert [position for position, _ in found] == [
+                position for _, position in expected
+            ]
+        # радиус больше половины окружности Земли включает все точки
+        assert len(index.within(0, 0, 30000)) == len(points)
+
+    def test_empty(self):
+        index = GeoIndex.build([])
+
+        assert index.nearest(0, 0) is None
+        assert not list(index.iter_nearest(0, 0))
+        assert index.within(0, 0, 100) == []
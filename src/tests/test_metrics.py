@@ -0,0 +1,126 @@
+"""
+Тестирование метрик и их выгрузки.
+"""
+
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from clients.base import BaseClient
+from clients.weather import WeatherClient
+from metrics import Registry, registry
+
+
+@pytest.mark.asyncio
+class TestMetrics:
+    """
+    Тестирование метрик.
+    """
+
+    async def test_histogram(self, logging_path):
+        metrics = Registry("test")
+        histogram = metrics.histogram("test_seconds", "Время", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value, {"client": "test"})
+        metrics.counter("test_total", "Количество").inc({"client": '"test"'})
+
+        await metrics.export()
+
+        content = (logging_path / "metrics.test.prom").read_text()
+        assert 'test_seconds_bucket{client="test",process="test",le="1.0"} 2' in content
+        assert (
+            'test_seconds_bucket{client="test",process="test",le="+Inf"} 3' in content
+        )
+        assert 'test_seconds_count{client="test",process="test"} 3' in content
+        assert 'test_total{client="\\"test\\"",process="test"} 1' in content
+        snapshot = json.loads((logging_path / "metrics.test.json").read_text())
+        assert snapshot["metrics"]["test_seconds"]["series"][0]["p50"] == 1
+
+    async def test_export_processes(self, logging_path):
+        for process in ("collect", "server"):
+            metrics = Registry(process)
+            metrics.counter("test_total", "Количество").inc({"value": process}, 2)
+            await metrics.export()
+
+        # процессы выгружают метрики в разные файлы и не перезаписывают их
+        assert sorted(path.name for path in logging_path.iterdir()) == [
+            "metrics.collect.json",
+            "metrics.collect.prom",
+            "metrics.server.json",
+            "metrics.server.prom",
+        ]
+        assert (
+            'test_total{value="server",process="server"} 2'
+            in (logging_path / "metrics.server.prom").read_text()
+        )
+
+    async def test_export_empty(self, logging_path):
+        await Registry().export()
+
+        assert not logging_path.exists()
+
+    async def test_http_timings(self, aiohttp_server):
+        async def handler(request):
+            return web.json_response({"status": "ok"})
+
+        app = web.Application()
+        app.router.add_get("/data", handler)
+        server = await aiohttp_server(app)
+        registry.clear()
+        try:
+            client = WeatherClient()
+            for _ in range(2):
+                await client._get(str(server.make_url("/data?appid=secret")))
+        finally:
+            await BaseClient.close_session()
+
+        labels = {"client": "WeatherClient", "endpoint": "127.0.0.1/data"}
+        snapshot = registry.snapshot()["metrics"]
+        assert snapshot["http_client_requests_total"]["series"] == [
+            {"labels": {**labels, "status": "200"}, "value": 2}
+        ]
+        # второй запрос выполняется в уже установленном соединении
+        assert {
+            item["labels"]["reused"]: item["value"]
+            for item in snapshot["http_client_connections_total"]["series"]
+        } == {"false": 1, "true": 1}
+        for name in ("ttfb_seconds", "request_seconds", "response_bytes"):
+            assert snapshot[f"http_client_{name}"]["series"][0]["count"] == 2
+        assert snapshot["http_client_connect_seconds"]["series"][0]["count"] == 1
+        assert "secret" not in registry.prometheus()
+
+    async def test_http_body_timeout(self, aiohttp_server, monkeypatch):
+        monkeypatch.setattr("clients.base.HTTP_RETRIES", 0)
+        monkeypatch.setattr("clients.base.HTTP_READ_TIMEOUT", 0.05)
+
+        async def handler(request):
+            # заголовки отправляются сразу, а тело ответа – с задержкой
+            response = web.StreamResponse()
+            await response.prepare(request)
+            await asyncio.sleep(0.5)
+            await response.write(b"{}")
+            return response
+
+        app = web.Application()
+        app.router.add_get("/data", handler)
+        server = await aiohttp_server(app)
+        registry.clear()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await WeatherClient()._get(str(server.make_url("/data")))
+        finally:
+            await BaseClient.close_session()
+
+        snapshot = registry.snapshot()["metrics"]
+        assert snapshot["http_client_requests_total"]["series"] == [
+            {
+                "labels": {
+                    "client": "WeatherClient",
+                    "endpoint": "127.0.0.1/data",
+                    "status": "error",
+                },
+                "value": 1,
+            }
+        ]
@@ -0,0 +1,45 @@
+"""
+Тестирование замеров времени основных операций.
+"""
+
+import pytest
+
+from benchmarks.data import generate_countries
+from benchmarks.operations import compare, run
+from collectors import serialization
+from collectors.collector import CountryCollector
+
+
+@pytest.mark.asyncio
+class TestOperations:
+    """
+    Тестирование набора замеров на синтетических данных.
+    """
+
+    async def test_run(self):
+        result = await run(repeat=1, sizes=[5, 30], number=1)
+
+        assert [item["size"] for item in result["results"]] == [5, 30]
+        assert result["results"][0]["find_hit"]["median_ms"] > 0
+
+    async def test_compare(self):
+        baseline = {"results": [{"size": 5, "find_hit": {"median_ms": 1.0}}]}
+        result = {
+            "results": [
+                {"size": 5, "find_hit": {"median_ms": 1.5}},
+                {"size": 30, "find_hit": {"median_ms": 9.0}},
+            ]
+        }
+
+        assert len(compare(result, baseline, threshold=1.25)) == 1
+        assert not compare(result, baseline, threshold=2)
+
+    async def test_generated_codes(self):
+        countries = generate_countries(1000)
+
+        # кэш хранится по коду страны, поэтому в большом кэше коды не повторяются
+        store = CountryCollector._parse(serialization.dumps(countries))
+        assert len(store.countries) == 1000
+        assert (
+            store.get(countries[-1]["alpha2code"].lower()).name == countries[-1]["name"]
+        )
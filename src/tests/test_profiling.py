@@ -0,0 +1,73 @@
+"""
+Тестирование профилирования точек входа.
+"""
+
+import json
+import pstats
+
+import pytest
+
+import profiling
+from collectors.base import BaseCollector
+from profiling import profile, span, trace_memory
+from reader import Reader
+from renderer import Renderer
+
+
+@pytest.mark.asyncio
+class TestProfiling:
+    """
+    Тестирование профилирования и замера времени этапов.
+    """
+
+    async def test_profile(self, media_cache, tmp_path):
+        BaseCollector.read_cache.clear()
+        path = tmp_path / "profile"
+
+        with profile(str(path), "main"):
+            location_info = await Reader().find("Paris")
+            await Renderer(location_info).render()
+
+        result = json.loads(path.with_suffix(".json").read_text())
+        assert result["command"] == "main"
+        assert {
+            "imports",
+            "cache.read",
+            "json.parse",
+            "dto.build.country",
+            "dto.build.weather",
+            "match",
+            "render",
+        } <= set(result["stages"])
+        assert result["stages"]["match"]["count"] == 1
+        assert any(
+            item["function"].startswith("reader.py:") for item in result["functions"]
+        )
+        assert pstats.Stats(str(path.with_suffix(".pstats"))).total_calls > 0
+
+    async def test_disabled(self):
+        with profile(None, "main"):
+            with span("render"):
+                pass
+
+        assert profiling._stages is None
+
+    async def test_trace_memory(self, media_cache, tmp_path):
+        BaseCollector.read_cache.clear()
+        path = tmp_path / "memory"
+
+        with trace_memory(str(path), "main"):
+            location_info = await Reader().find("Paris")
+
+        result = json.loads(path.with_suffix(".memory.json").read_text())
+        assert result["command"] == "main"
+        stages = result["stages"]
+        assert {"find", "cache.read", "dto.build.country"} <= set(stages)
+        assert stages["find"]["count"] == 1
+        # пик этапа не меньше пиков вложенных этапов
+        assert stages["find"]["peak_bytes"] >= stages["dto.build.country"]["peak_bytes"]
+        assert result["peak_bytes"] >= stages["find"]["peak_bytes"] > 0
+        assert result["allocations"]
+        assert result["models"]["CountryDTO"]["count"] >= 1
+        assert location_info is not None
+        assert profiling._memory is None
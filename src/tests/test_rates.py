@@ -0,0 +1,66 @@
+"""
+Тестирование матрицы кросс-курсов.
+"""
+
+import pytest
+
+from collectors.models import CurrencyRatesDTO
+from rates import RateMatrix
+from tests.conftest import CURRENCY_RATES
+
+
+@pytest.mark.asyncio
+class TestRateMatrix:
+    """
+    Тестирование матрицы кросс-курсов.
+    """
+
+    @pytest.fixture
+    def matrix(self):
+        return RateMatrix.build(
+            CurrencyRatesDTO(
+                base="RUB",
+                date="2022-09-14",
+                rates={**CURRENCY_RATES["rates"], "XXX": 0.0},
+            )
+        )
+
+    async def test_rate(self, matrix):
+        assert matrix.rate("EUR", "RUB") == pytest.approx(1 / 0.016503)
+        assert matrix.rate("RUB", "EUR") == pytest.approx(0.016503)
+        assert matrix.rate("EUR", "CHF") == pytest.approx(0.015849 / 0.016503)
+        assert matrix.rate("CHF", "CHF") == 1.0
+        # валюты без курса в матрицу не попадают
+        assert matrix.rate("XXX", "RUB") is None
+        assert matrix.rate("EUR", "USD") is None
+
+    async def test_row_column(self, matrix):
+        assert matrix.column("RUB") == pytest.approx(
+            {code: 1 / rate for code, rate in CURRENCY_RATES["rates"].items()}
+        )
+        assert matrix.row("RUB") == pytest.approx(CURRENCY_RATES["rates"])
+        assert matrix.column("USD") == {}
+
+    async def test_serialization(self, matrix):
+        matrix.source = {"mtime_ns": 1, "size": 2}
+        restored = RateMatrix.from_bytes(matrix.to_bytes())
+
+        assert restored.base == "RUB"
+        assert restored.codes == matrix.codes
+        assert restored.values == matrix.values
+        assert restored.source == matrix.source
+        assert RateMatrix._parse(b"broken") is None
+
+    async def test_load_stale(self, media_cache):
+        source_path = str(media_cache / "currency_rates.json")
+        matrix = RateMatrix.build(
+            CurrencyRatesDTO(**CURRENCY_RATES),
+            source=await RateMatrix.get_source(source_path),
+        )
+        await matrix.save()
+
+        assert (await RateMatrix.load(source_path)).codes == matrix.codes
+
+        # после обновления кэша курсов валют матрица считается устаревшей
+        (media_cache / "currency_rates.json").write_text("{}")
+        assert await RateMatrix.load(source_path) is None
@@ -1,3 +1,191 @@
 """
 Тестирование функций поиска (чтения) собранной информации в файлах.
 """
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from clients.models import ResponseDTO
+from collectors.collector import CountryCollector
+from collectors.manifest import Manifest
+from reader import Reader
+from tests.conftest import WEATHER
+
+# обновленные данные о погоде
+FRESH_WEATHER = {**WEATHER, "main": {**WEATHER["main"], "temp": 20.5}}
+
+
+@pytest.mark.asyncio
+class TestReader:
+    """
+    Тестирование чтения собранной информации.
+    """
+
+    async def test_find(self, media_cache):
+        location_info = await Reader().find("Bern")
+
+        assert location_info.location.alpha2code == "DE"
+        assert location_info.weather.temp == 13.92
+        assert location_info.currency_rates["EUR"] == pytest.approx(1 / 0.016503)
+        # поисковый индекс сохраняется рядом с кэшем
+        assert (media_cache / "country_index.json").is_file()
+
+    async def test_find_currency(self, media_cache):
+        location_info = await Reader().find("Bern", currency="chf")
+
+        assert location_info.currency == "CHF"
+        assert location_info.currency_rates["EUR"] == pytest.approx(0.015849 / 0.016503)
+        # матрица кросс-курсов сохраняется рядом с кэшем
+        assert (media_cache / "currency_rates.bin").is_file()
+
+    async def test_find_missing(self, media_cache):
+        assert await Reader().find("Atlantis") is None
+
+    async def test_get_country(self, media_cache):
+        assert (await Reader.get_country("fr")).capital == "Paris"
+        assert await Reader.get_country("IT") is None
+
+    async def test_find_many(self, media_cache):
+        (media_cache / "weather" / "london_gb.json").unlink()
+        results = await Reader().find_many(["Paris", "Atlantis", "London", "paris"])
+
+        assert [item.location.alpha2code if item else None for item in results] == [
+            "FR",
+            None,
+            None,
+            "FR",
+        ]
+        assert results[0].currency_rates == await Reader.get_currency_rates(
+            results[0].location.currencies
+        )
+
+    async def test_iter_all(self, media_cache):
+        (media_cache / "weather" / "london_gb.json").unlink()
+        chunks = [chunk async for chunk in Reader().iter_all("chf", chunk_size=2)]
+
+        assert [len(chunk) for chunk in chunks] == [2, 2, 0]
+        assert [item.location.alpha2code for item in chunks[0]] == ["AX", "FR"]
+        assert chunks[0][0].currency == "CHF"
+
+    async def test_find_nearest(self, media_cache):
+        # Женева: ближайшая столица – Берн (в кэше – координаты центра страны)
+        distance, location_info = await Reader().find_nearest(46.2, 6.15, "EUR")
+
+        assert location_info.location.capital == "Bern"
+        assert distance == pytest.approx(167, abs=1)
+        assert location_info.currency == "EUR"
+
+    async def test_find_nearest_without_weather(self, media_cache):
+        (media_cache / "weather" / "bern_ch.json").unlink()
+
+        # для Берна данные о погоде не собраны – выбирается следующая столица
+        distance, location_info = await Reader().find_nearest(46.2, 6.15)
+
+        assert location_info.location.capital == "Paris"
+        assert distance > 167
+
+    async def test_find_within(self, media_cache):
+        (media_cache / "weather" / "paris_fr.json").unlink()
+        reader = Reader()
+        results = await reader.find_within(47.0, 8.0, 500)
+
+        # Париж в радиусе, но данные о погоде для него не собраны
+        assert [item.location.capital for _, item in results] == ["Bern", "Berlin"]
+        assert results[0][0] == pytest.approx(0)
+        assert reader.get_geo_index(
+            await CountryCollector.read()
+        ) is reader.get_geo_index(await CountryCollector.read())
+
+
+@pytest.mark.asyncio
+class TestReaderReadThrough:
+    """
+    Тестирование чтения с обращением к внешнему сервису.
+    """
+
+    @pytest.fixture
+    def get_weather(self, mocker):
+        return mocker.patch(
+            "clients.weather.WeatherClient.get_weather_by_coordinates",
+            return_value=ResponseDTO(url="", status=200, data=FRESH_WEATHER),
+        )
+
+    async def test_miss(self, media_cache, get_weather):
+        (media_cache / "weather" / "paris_fr.json").unlink()
+        reader = Reader(read_through=True, deadline=1)
+
+        location_info = await reader.find("Paris")
+        await reader.close()
+
+        assert location_info.weather.temp == 20.5
+        assert get_weather.call_args.args == (46.0, 2.0)
+
+    @staticmethod
+    async def slow(*args, **kwargs):
+        await asyncio.sleep(0.2)
+        return ResponseDTO(url="", status=200, data=FRESH_WEATHER)
+
+    async def test_miss_deadline(self, media_cache, get_weather):
+        (media_cache / "weather" / "paris_fr.json").unlink()
+        get_weather.side_effect = self.slow
+        reader = Reader(read_through=True, deadline=0.01)
+
+        start = time.perf_counter()
+        assert await reader.find("Paris") is None
+        assert time.perf_counter() - start < 0.15
+
+        # запрос завершается в фоне, и данные доступны для следующих поисков
+        await asyncio.gather(*reader._refreshing.values())
+        assert (await reader.find("Paris")).weather.temp == 20.5
+        await reader.close()
+
+    async def test_stale_while_revalidate(self, media_cache, get_weather):
+        os.utime(media_cache / "weather" / "paris_fr.json", (0, 0))
+        get_weather.side_effect = self.slow
+        reader = Reader(read_through=True)
+
+        # устаревшие данные возвращаются сразу, а обновление выполняется в фоне
+        assert (await reader.find("Paris")).weather.temp == WEATHER["main"]["temp"]
+        assert len(reader._refreshing) == 1
+
+        await asyncio.gather(*reader._refreshing.values())
+        assert (await reader.find("Paris")).weather.temp == 20.5
+        assert not reader._refreshing
+        assert get_weather.call_count == 1
+        await reader.close()
+
+    async def test_refresh_manifest(self, media_cache, get_weather):
+        reader = Reader(read_through=True)
+        manifest = await reader.get_manifest()
+        manifest.record_failure("weather/paris_fr", "HTTP 500")
+        await manifest.save()
+
+        # пока действует задержка после неудачного запроса, обновления нет
+        os.utime(media_cache / "weather" / "paris_fr.json", (0, 0))
+        assert await reader.find("Paris")
+        assert not reader._refreshing
+
+        # устаревание определяется по манифесту, а не по времени изменения файла
+        manifest.entries["weather/paris_fr"].failed_at = 0
+        await reader.find("Paris")
+        await reader.close()
+
+        assert get_weather.call_count == 1
+        saved = await Manifest.load(manifest.path)
+        assert saved.get("weather/paris_fr").failures == 0
+        assert saved.get("weather/paris_fr").fetched_at is not None
+
+    async def test_close_waits(self, media_cache, get_weather):
+        os.utime(media_cache / "weather" / "paris_fr.json", (0, 0))
+        get_weather.side_effect = self.slow
+        reader = Reader(read_through=True, deadline=1)
+
+        await reader.find("Paris")
+        await reader.close()
+
+        # выполняемое обновление завершается при закрытии
+        assert get_weather.call_count == 1
+        assert (await Reader().find("Paris")).weather.temp == 20.5
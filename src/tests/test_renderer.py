@@ -1,3 +1,52 @@
 """
 Тестирование функций генерации выходных данных.
 """
+
+import json
+
+import pytest
+
+from collectors.models import LocationInfoDTO, WeatherInfoDTO
+from renderer import Renderer
+
+
+@pytest.mark.asyncio
+class TestRenderer:
+    """
+    Тестирование генерации выходных данных.
+    """
+
+    @pytest.fixture
+    def location_info(self, countries):
+        return LocationInfoDTO(
+            location=countries[3],
+            weather=WeatherInfoDTO(
+                temp=13.92,
+                pressure=1023,
+                humidity=54,
+                visibility=10000,
+                wind_speed=4.63,
+                description="scattered clouds",
+                offset_seconds=7200,
+            ),
+            currency_rates={"CHF": 63.094},
+        )
+
+    async def test_render(self, location_info):
+        lines = await Renderer(location_info).render()
+
+        assert "Страна: Switzerland" in lines
+        assert "Площадь: 41.284 км²" in lines
+        assert "Курсы валют: CHF = 63.09 руб." in lines
+        assert "Видимость: 10.0 км" in lines
+
+    async def test_serialize(self, location_info):
+        result = await Renderer(location_info).serialize()
+
+        assert json.loads(json.dumps(result)) == result
+        assert [item["name"] for item in result["location"]["languages"]] == [
+            "French",
+            "German",
+            "Italian",
+        ]
+        assert result["weather"]["temp"] == 13.92
@@ -0,0 +1,77 @@
+"""
+Тестирование поискового индекса.
+"""
+
+import pytest
+
+from reader import Reader
+from search import SearchIndex
+
+
+@pytest.mark.asyncio
+class TestSearchIndex:
+    """
+    Тестирование поискового индекса.
+    """
+
+    queries = (
+        "Paris",
+        "paris",
+        "PARIS",
+        "Pari",
+        "Parsi",
+        "Berlin",
+        "Bern",
+        "ber",
+        "Bren",
+        "Mariehamn",
+        "Marihamn",
+        "åland",
+        "Aland Islands",
+        "uk",
+        "u",
+        "Great",
+        "britain",
+        "London Paris",
+        "Лондон",
+        "Suisse",
+        "schweiz",
+        "Deutschland",
+        "ch",
+        "xyz",
+        "   ",
+        "",
+    )
+
+    @pytest.fixture
+    def index(self, countries):
+        return SearchIndex.build(
+            (country.capital, *country.alt_spellings) for country in countries
+        )
+
+    async def test_search_same_as_match(self, index, countries):
+        for query in self.queries:
+            expected = None
+            for position, country in enumerate(countries):
+                if await Reader._match(query, country):
+                    expected = position
+                    break
+
+            assert index.search(query) == expected, query
+
+    async def test_serialization(self, index):
+        restored = SearchIndex.from_dict(index.to_dict())
+
+        for query in self.queries:
+            assert restored.search(query) == index.search(query)
+
+    async def test_load_stale(self, media_cache, index):
+        source_path = str(media_cache / "country.json")
+        index.source = await SearchIndex.get_source(source_path)
+        await index.save()
+        assert (await SearchIndex.load(source_path)).entries == index.entries
+
+        # изменение кэша делает сохраненный индекс неактуальным
+        with open(source_path, "a", encoding="utf-8") as file:
+            file.write(" ")
+        assert await SearchIndex.load(source_path) is None
@@ -0,0 +1,61 @@
+"""
+Тестирование HTTP-сервиса для поиска собранной информации.
+"""
+
+import json
+
+import pytest
+
+from server import create_app
+from tests.conftest import COUNTRIES
+
+
+class TestServer:
+    """
+    Тестирование HTTP-сервиса.
+    """
+
+    @pytest.fixture
+    async def client(self, aiohttp_client, media_cache):
+        return await aiohttp_client(create_app())
+
+    async def test_find_location(self, client):
+        response = await client.get("/api/location", params={"location": "Paris"})
+        data = await response.json()
+
+        assert response.status == 200
+        assert data["result"]["location"]["alpha2code"] == "FR"
+        assert "Страна: France" in data["lines"]
+
+    async def test_find_location_missing(self, client):
+        response = await client.get("/api/location", params={"location": "Atlantis"})
+        assert response.status == 404
+
+        response = await client.get("/api/location")
+        assert response.status == 400
+
+    async def test_find_locations(self, client):
+        response = await client.post(
+            "/api/locations", json={"locations": ["London", "Atlantis"]}
+        )
+        results = (await response.json())["results"]
+
+        assert results[0]["result"]["location"]["alpha2code"] == "GB"
+        assert results[1]["result"] is None
+
+    async def test_picks_up_new_files(self, client, media_cache):
+        response = await client.get("/api/location", params={"location": "Paris"})
+        assert response.status == 200
+
+        # обновление кэша сборщиком без перезапуска сервиса
+        (media_cache / "country.json").write_text(json.dumps(COUNTRIES[:1]))
+        response = await client.get("/api/location", params={"location": "Paris"})
+        assert response.status == 404
+
+    async def test_close_reader(self, aiohttp_client, media_cache, mocker):
+        app = create_app()
+        close = mocker.patch.object(app["reader"], "close", mocker.AsyncMock())
+        client = await aiohttp_client(app)
+        await client.close()
+
+        close.assert_awaited_once()
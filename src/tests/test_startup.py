@@ -0,0 +1,54 @@
+"""
+Тестирование запуска точек входа.
+
+Время запуска зависит от машины, поэтому бюджет проверяется командой
+``python -m benchmarks.startup --check``, а тесты проверяют только поведение.
+"""
+
+import os
+import subprocess
+import sys
+
+from benchmarks.startup import (
+    FIRST_QUERY_BUDGET,
+    IMPORT_BUDGET,
+    NETWORK_MODULES,
+    SRC_PATH,
+    imported_modules,
+    over_budget,
+)
+
+
+class TestStartup:
+    """
+    Проверка запуска точек входа.
+    """
+
+    def test_read_path_imports(self):
+        modules = imported_modules("main")
+
+        assert not {
+            module for module in modules if module.split(".")[0] in NETWORK_MODULES
+        }
+
+    def test_first_query(self, media_cache):
+        result = subprocess.run(
+            [sys.executable, "main.py", "--location", "Paris", "--format", "jsonl"],
+            cwd=SRC_PATH,
+            env={**os.environ, "MEDIA_PATH": str(media_cache)},
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+        assert "Paris" in result.stdout
+
+    def test_over_budget(self):
+        result = {
+            "import_python": {"median": 1.0},
+            "import_main": {"median": 1.0 + IMPORT_BUDGET / 2},
+            "first_query": {"median": 1.0 + FIRST_QUERY_BUDGET * 2},
+        }
+
+        # бюджет задан сверх времени запуска интерпретатора
+        assert over_budget(result) == ["first_query"]